@@ -39,6 +39,7 @@ class AiderGeniusCLI:
             # Initialize Jac Bridge
             bridge_root = os.path.dirname(os.path.abspath(__file__))
             self.jac_bridge = JacBridge(bridge_root)
+            self._load_project_repo()
             
             # Initialize Auto Editor
             self.auto_editor = AutoEditor(self.jac_bridge)
@@ -50,6 +51,16 @@ class AiderGeniusCLI:
         except Exception as e:
             console.print(f"Warning: Component initialization issue - {e}")
     
+    def _load_project_repo(self):
+        """Point the bridge at the git repo of the project being worked on"""
+        from aider.io import InputOutput
+        from aider.repo import GitRepo
+
+        try:
+            self.jac_bridge.load_repo(GitRepo(InputOutput(pretty=False, yes=True), None, self.project_root))
+        except FileNotFoundError:
+            console.print(f"Warning: {self.project_root} is not in a git repository")
+
     def analyze_project(self, target_dir: str = None) -> Dict[str, Any]:
         """Analyze project using OSP ranking algorithms"""
         if not target_dir:
@@ -127,6 +138,19 @@ class AiderGeniusCLI:
             console.print(f"✗ Autonomous editing failed: {e}")
             return {"error": str(e)}
     
+    def warmup(self) -> Dict[str, str]:
+        """Precompile all Jac modules into the compiled module cache"""
+        console.print("Precompiling Jac modules...")
+
+        bridge = JacBridge(os.path.join(os.path.dirname(os.path.abspath(__file__)), "jac"))
+        try:
+            return bridge.warm_cache()
+        except Exception as e:
+            console.print(f"✗ Warm-up failed: {e}")
+            return {"error": str(e)}
+        finally:
+            bridge.close()
+
     def setup_config(self) -> bool:
         """Initialize system configuration"""
         console.print("Setting up Aider-Genius configuration...")
@@ -180,13 +204,16 @@ def create_parser():
 │  ⚙️  aider-genius setup                            │
 │      → Configure API keys and system settings     │
 │                                                    │
+│  🔥 aider-genius warmup                            │
+│      → Precompile Jac modules into the cache      │
+│                                                    │
 ╰────────────────────────────────────────────────────╯
         """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
     parser.add_argument('command', 
-                       choices=['analyze', 'optimize', 'edit', 'setup'],
+                       choices=['analyze', 'optimize', 'edit', 'setup', 'warmup'],
                        help='🎯 Command to execute')
     
     parser.add_argument('target', nargs='?',
@@ -225,6 +252,18 @@ def main():
     # Execute commands
     if args.command == 'setup':
         cli.setup_config()
+
+    elif args.command == 'warmup':
+        result = cli.warmup()
+
+        if "error" not in result:
+            console.print("\n🔥 [bold cyan]JAC MODULE CACHE[/bold cyan]")
+            console.print("─" * 50)
+            for jac_file, state in result.items():
+                color = "green" if state in ("cached", "compiled") else "red"
+                console.print(f"  [{color}]{state:>8}[/{color}]  {os.path.basename(jac_file)}")
+        else:
+            console.print(f"❌ [red]Warm-up failed: {result['error']}[/red]")
         
     elif args.command == 'analyze':
         target_dir = args.dir or args.target or os.getcwd()
@@ -0,0 +1,323 @@
+"""
+code_compressor.py
+Tiered, syntax-aware compression of Python source.
+
+Each level removes more than the one before it:
+
+    ORIGINAL    the source as given
+    COMMENTS    comments and blank lines removed
+    DOCSTRINGS  bare string statements (docstrings) removed as well
+    BODIES      function bodies collapsed to their signatures
+    OUTLINE     only imports, classes and function signatures
+    TRUNCATE    the head of the outline, cut to fit
+
+Comments and docstrings are found with `tokenize`, so `#` inside string
+literals and URLs is never touched. Those two levels work on a stream of
+lines and never hold the raw file in memory. Bodies and outlines use `ast`.
+Source that does not tokenize or parse is passed through unchanged at that
+level, so prose and other languages only ever get truncated.
+"""
+
+import ast
+import functools
+import io
+import itertools
+import tokenize
+
+from .token_counter import TokenCounter
+
+ORIGINAL = 0
+COMMENTS = 1
+DOCSTRINGS = 2
+BODIES = 3
+OUTLINE = 4
+TRUNCATE = 5
+
+LEVEL_NAMES = ('original', 'comments', 'docstrings', 'bodies', 'outline', 'truncate')
+
+_STATEMENT_START = (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING)
+_BLOCK_END = (tokenize.DEDENT, tokenize.ENDMARKER)
+_OUTLINE_NODES = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def iter_stripped_lines(readline, docstrings=True):
+    """
+    Yield the lines of Python source with comments and blank lines removed.
+
+    Lines are emitted as soon as tokenization has moved past them, so
+    arbitrarily large files are processed with bounded memory.
+
+    Args:
+        readline: A text readline callable, e.g. an open file's readline
+        docstrings: Also remove bare string statements (docstrings). A string
+            that is the only statement of a block is replaced with `...`.
+
+    Raises:
+        tokenize.TokenError, SyntaxError: If the source does not tokenize
+    """
+    pending = {}
+    # row -> [(start col, end col or None for end of line, replacement)]
+    cuts = {}
+    verbatim = set()
+    # Next row to emit; rows below it have been released from `pending`
+    emitted = [1]
+
+    def record():
+        line = readline()
+        pending[len(pending) + emitted[0]] = line
+        return line
+
+    def cut(start, end, replacement=''):
+        (srow, scol), (erow, ecol) = start, end
+        if srow == erow:
+            cuts.setdefault(srow, []).append((scol, ecol, replacement))
+            return
+        cuts.setdefault(srow, []).append((scol, None, replacement))
+        for row in range(srow + 1, erow):
+            cuts.setdefault(row, []).append((0, None, ''))
+        cuts.setdefault(erow, []).append((0, ecol, ''))
+
+    def render(row):
+        line = pending.pop(row)
+        if row in verbatim:
+            verbatim.discard(row)
+            return line
+        for scol, ecol, replacement in sorted(cuts.pop(row, ()), reverse=True):
+            line = line[:scol] + replacement + (line[ecol:] if ecol is not None else '')
+        text = line.rstrip()
+        if not text.strip():
+            return None
+        return text + '\n'
+
+    def flush(limit):
+        while emitted[0] < limit and emitted[0] in pending:
+            text = render(emitted[0])
+            emitted[0] += 1
+            if text is not None:
+                yield text
+
+    # Tokens of a statement made only of strings so far, and the token before it
+    held = []
+    held_after = None
+    # A finished bare-string statement waiting on the next token to decide
+    # whether it leaves its block empty
+    dropped = None
+    previous = tokenize.ENCODING
+
+    for tok in tokenize.generate_tokens(record):
+        kind = tok.type
+
+        if dropped is not None and kind not in (tokenize.COMMENT, tokenize.NL):
+            start, end, after_indent = dropped
+            cut(start, end, '...' if after_indent and kind in _BLOCK_END else '')
+            dropped = None
+
+        if kind == tokenize.COMMENT:
+            cut(tok.start, (tok.start[0], None))
+        elif kind == tokenize.STRING and (held or previous in _STATEMENT_START) and docstrings:
+            if not held:
+                held_after = previous
+            held.append(tok)
+        elif held and kind == tokenize.NEWLINE:
+            dropped = (held[0].start, held[-1].end, held_after == tokenize.INDENT)
+            held = []
+        elif held and kind != tokenize.NL:
+            for string in held:
+                verbatim.update(range(string.start[0], string.end[0]))
+            held = []
+
+        if tok.start[0] != tok.end[0] and kind not in (tokenize.NEWLINE, tokenize.NL):
+            if not held or tok is not held[-1]:
+                verbatim.update(range(tok.start[0], tok.end[0]))
+        if kind not in (tokenize.COMMENT, tokenize.NL):
+            previous = kind
+
+        limit = tok.start[0]
+        if held:
+            limit = held[0].start[0]
+        if dropped is not None:
+            limit = min(limit, dropped[0][0])
+        yield from flush(limit)
+
+    yield from flush(len(pending) + emitted[0])
+
+
+def strip_source(source, docstrings=True):
+    """
+    Remove comments and blank lines (and docstrings) from Python source.
+
+    Returns the source unchanged if it does not tokenize.
+    """
+    try:
+        return ''.join(iter_stripped_lines(io.StringIO(source).readline, docstrings))
+    except (tokenize.TokenError, SyntaxError):
+        return source
+
+
+def _first_line(node):
+    # Decorators come before the def/class line itself
+    return min([node.lineno] + [dec.lineno for dec in getattr(node, 'decorator_list', ())])
+
+
+def _body_indent(lines, node):
+    line = lines[_first_line(node) - 1]
+    return line[: len(line) - len(line.lstrip())]
+
+
+def collapse_bodies(source, outline=False):
+    """
+    Replace every function body with `...`, keeping decorators and signatures.
+
+    Args:
+        source: Python source
+        outline: Also drop module- and class-level statements that are not
+            imports, classes or functions
+
+    Returns:
+        The compressed source, or `source` unchanged if it does not parse
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return source
+
+    lines = source.splitlines(keepends=True)
+    # (first line, last line, replacement), 1-based and inclusive
+    edits = []
+
+    def visit(body):
+        kept = 0
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                kept += 1
+                first = node.body[0]
+                if _first_line(first) > node.lineno:
+                    edits.append((_first_line(first), node.end_lineno, _body_indent(lines, first) + '...\n'))
+            elif isinstance(node, ast.ClassDef):
+                kept += 1
+                mark = len(edits)
+                if not visit(node.body) and _first_line(node.body[0]) > node.lineno:
+                    # Nothing left inside: collapse the class body as a whole
+                    del edits[mark:]
+                    edits.append((
+                        _first_line(node.body[0]),
+                        node.end_lineno,
+                        _body_indent(lines, node.body[0]) + '...\n',
+                    ))
+            elif not outline or isinstance(node, _OUTLINE_NODES):
+                kept += 1
+            else:
+                edits.append((node.lineno, node.end_lineno, ''))
+        return kept
+
+    visit(tree.body)
+
+    for first, last, replacement in reversed(edits):
+        lines[first - 1:last] = [replacement] if replacement else []
+    return ''.join(lines)
+
+
+def compress_source(source, level):
+    """Compress `source` to the given level (ORIGINAL through OUTLINE)."""
+    if level >= COMMENTS:
+        source = strip_source(source, docstrings=level >= DOCSTRINGS)
+    if level >= BODIES:
+        source = collapse_bodies(source, outline=level >= OUTLINE)
+    return source
+
+
+def truncate_to_tokens(text, target_tokens, count_tokens):
+    """
+    Keep as many leading lines of `text` as fit in `target_tokens`.
+
+    Binary search over the line count, so only O(log n) counts are taken.
+    """
+    lines = text.splitlines(keepends=True)
+    low, high = 0, len(lines)
+    while low < high:
+        mid = (low + high + 1) // 2
+        kept = ''.join(lines[:mid]) + f'... ({len(lines) - mid} lines omitted) ...\n'
+        if count_tokens(kept) <= target_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    if low == len(lines):
+        return text
+    kept = ''.join(lines[:low]) + f'... ({len(lines) - low} lines omitted) ...\n'
+    if count_tokens(kept) <= target_tokens:
+        return kept
+    return ''
+
+
+def _compress_tiers(text, target_tokens, count_tokens, max_level, first_level):
+    tokens = count_tokens(text)
+    level = first_level
+    while tokens > target_tokens and level < max_level:
+        level += 1
+        if level == TRUNCATE:
+            text = truncate_to_tokens(text, target_tokens, count_tokens)
+        elif level == DOCSTRINGS:
+            text = strip_source(text, docstrings=True)
+        else:
+            text = collapse_bodies(text, outline=level == OUTLINE)
+        tokens = count_tokens(text)
+    return text, level
+
+
+def compress_to_budget(source, target_tokens, count_tokens=None, max_level=TRUNCATE):
+    """
+    Compress `source` one level at a time until it fits in `target_tokens`.
+
+    Each level is applied to the previous level's (smaller) output, and
+    compression stops at the first level that fits.
+
+    Args:
+        source: Source text
+        target_tokens: Token budget
+        count_tokens: Callable text -> token count (default: TokenCounter())
+        max_level: Highest level to apply
+
+    Returns:
+        tuple: (compressed text, level applied)
+    """
+    if count_tokens is None:
+        count_tokens = TokenCounter().count
+    if count_tokens(source) <= target_tokens or max_level == ORIGINAL:
+        return source, ORIGINAL
+    text = strip_source(source, docstrings=False)
+    return _compress_tiers(text, target_tokens, count_tokens, max_level, COMMENTS)
+
+
+def compress_file(path, target_tokens, count_tokens=None, max_level=TRUNCATE):
+    """
+    Compress a Python file to fit in `target_tokens`, streaming the first level.
+
+    The file is read in full only if it is small enough to fit as is;
+    otherwise comments are stripped while reading, line by line.
+
+    Returns:
+        tuple: (compressed text, level applied)
+    """
+    if count_tokens is None:
+        count_tokens = TokenCounter().count
+
+    with open(path, encoding='utf-8', errors='replace') as f:
+        head = f.read(max(target_tokens, 0) * 8 + 1)
+        if len(head) <= target_tokens * 8 and count_tokens(head) <= target_tokens:
+            return head, ORIGINAL
+        if max_level == ORIGINAL:
+            return head + f.read(), ORIGINAL
+
+        # Continue the partial last line of `head`, then stream the rest
+        lines = head.splitlines(keepends=True)
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += f.readline()
+        readline = functools.partial(next, itertools.chain(lines, f), '')
+
+        try:
+            text = ''.join(iter_stripped_lines(readline, docstrings=False))
+        except (tokenize.TokenError, SyntaxError):
+            f.seek(0)
+            text = f.read()
+
+    return _compress_tiers(text, target_tokens, count_tokens, max_level, COMMENTS)
@@ -0,0 +1,251 @@
+"""
+code_validator.py
+Syntax, import and structure validation of edited Python files.
+
+Checks that depend only on a file's bytes (compiling it, collecting its
+imports, finding duplicate definitions) are cached by git blob OID, so
+re-validating a large edit only re-checks files whose content changed.
+Uncached files are checked in a process pool when there are enough of
+them. Import resolution depends on the rest of the repo, so it is redone
+on every call, against the import graph's module index plus the files
+being validated, which is a few dict lookups per import. Without an import
+graph the rest of the repo is unknown, so repo imports are not checked.
+Imports outside the repo are not checked unless asked for.
+"""
+
+import ast
+import importlib.util
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .import_graph import module_names_for_path, package_parts
+from .repo_index import git_blob_oid
+
+# Below this many uncached files, checking in-process beats starting workers
+POOL_MIN_FILES = 16
+
+_IMPORT_ERRORS = ('ImportError', 'ModuleNotFoundError', 'Exception', 'BaseException')
+
+
+def _guards_imports(handler):
+    """True if an except clause catches import failures."""
+    if handler.type is None:
+        return True
+    types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+    return any(isinstance(t, ast.Name) and t.id in _IMPORT_ERRORS for t in types)
+
+
+def _duplicate_definitions(body, errors):
+    """Report functions/classes redefined in the same scope, recursing into classes."""
+    seen = {}
+    for node in body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        # Decorated redefinitions (@overload, @x.setter, ...) are intentional
+        if node.name in seen and not node.decorator_list:
+            errors.append(
+                (node.lineno, f"duplicate definition of '{node.name}' (first at line {seen[node.name]})")
+            )
+        seen.setdefault(node.name, node.lineno)
+        if isinstance(node, ast.ClassDef):
+            _duplicate_definitions(node.body, errors)
+
+
+def check_source(content):
+    """
+    Run the content-only checks on Python source.
+
+    Runs in worker processes, so it takes and returns plain data.
+
+    Returns:
+        dict with 'syntax' and 'structure' lists of (line, message), and
+        'imports', a list of (module, names, level, line, guarded) where
+        `guarded` marks imports inside a try that handles ImportError.
+    """
+    result = {'syntax': [], 'structure': [], 'imports': []}
+    try:
+        tree = compile(content, '<edit>', 'exec', ast.PyCF_ONLY_AST, dont_inherit=True)
+        # Compiling the tree catches what parsing alone does not, e.g. a
+        # `return` outside a function or a misplaced `nonlocal`
+        compile(tree, '<edit>', 'exec', dont_inherit=True)
+    except SyntaxError as err:
+        result['syntax'].append((err.lineno or 0, f'{type(err).__name__}: {err.msg}'))
+        return result
+    except ValueError as err:
+        result['syntax'].append((0, f'ValueError: {err}'))
+        return result
+
+    _duplicate_definitions(tree.body, result['structure'])
+
+    guarded = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and any(_guards_imports(h) for h in node.handlers):
+            for stmt in node.body:
+                guarded.update(id(child) for child in ast.walk(stmt))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                result['imports'].append((alias.name, (), 0, node.lineno, id(node) in guarded))
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != '*')
+            result['imports'].append(
+                (node.module or '', names, node.level or 0, node.lineno, id(node) in guarded)
+            )
+    result['imports'].sort(key=lambda spec: spec[3])
+    return result
+
+
+class CodeValidator:
+    """
+    Validate edited files, caching content-only checks by blob OID.
+    """
+
+    def __init__(self, import_graph=None, max_workers=None, cache_size=4096, check_external=False):
+        """
+        Initialize a validator.
+
+        Args:
+            import_graph: Optional ImportGraph whose module index repo imports resolve
+                against (None skips checking repo imports)
+            max_workers: Process pool size (None for one per CPU; 1 never uses a pool)
+            cache_size: Number of per-blob check results to keep
+            check_external: Also require non-repo imports to be importable in this
+                interpreter. Off by default: a project's dependencies need not be
+                installed where aider runs.
+        """
+        self.import_graph = import_graph
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.check_external = check_external
+        self.checks = OrderedDict()
+        self.checked_count = 0
+        self._installed = {}
+
+    def validate(self, files):
+        """
+        Validate files by content.
+
+        Args:
+            files: Mapping of repo path -> new file content
+
+        Returns:
+            dict: path -> {'valid', 'errors', 'syntax', 'imports', 'structure'};
+            the last three are booleans per check. Non-Python files always pass.
+        """
+        oids = {
+            path: git_blob_oid(content.encode('utf-8'))
+            for path, content in files.items()
+            if str(path).endswith('.py')
+        }
+
+        checks = {}
+        missing = {}
+        for path, oid in oids.items():
+            if oid in self.checks:
+                self.checks.move_to_end(oid)
+                checks[oid] = self.checks[oid]
+            elif oid not in missing:
+                missing[oid] = files[path]
+        if missing:
+            fresh = self._run_checks(missing)
+            checks.update(fresh)
+            self.checks.update(fresh)
+            self.checked_count += len(fresh)
+            while len(self.checks) > self.cache_size:
+                self.checks.popitem(last=False)
+
+        known = self._known_modules(files)
+        results = {}
+        for path in files:
+            if path not in oids:
+                results[path] = self._result(path, [], [], [])
+                continue
+            check = checks[oids[path]]
+            results[path] = self._result(
+                path, check['syntax'], self._unresolved_imports(path, check['imports'], known),
+                check['structure'],
+            )
+        return results
+
+    def _run_checks(self, contents):
+        """Check {oid: content}, in a process pool when there are enough files."""
+        oids = list(contents)
+        workers = self.max_workers or os.cpu_count() or 1
+        if len(oids) >= POOL_MIN_FILES and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    chunksize = max(1, len(oids) // (4 * workers))
+                    checked = pool.map(check_source, [contents[oid] for oid in oids], chunksize=chunksize)
+                    return dict(zip(oids, checked))
+            except (OSError, BrokenProcessPool):
+                # No usable worker processes here; check in-process instead
+                pass
+        return {oid: check_source(contents[oid]) for oid in oids}
+
+    def _known_modules(self, files):
+        """Module names in the repo and the edit, including namespace package prefixes."""
+        names = set(self.import_graph.modules) if self.import_graph is not None else set()
+        for path in files:
+            names.update(module_names_for_path(path))
+        for name in list(names):
+            parts = name.split('.')
+            for i in range(1, len(parts)):
+                names.add('.'.join(parts[:i]))
+        return names
+
+    def _is_installed(self, root):
+        installed = self._installed.get(root)
+        if installed is None:
+            installed = root in sys.builtin_module_names or root in getattr(
+                sys, 'stdlib_module_names', ()
+            )
+            if not installed:
+                try:
+                    installed = importlib.util.find_spec(root) is not None
+                except (ImportError, ValueError):
+                    installed = False
+            self._installed[root] = installed
+        return installed
+
+    def _unresolved_imports(self, path, imports, known):
+        roots = {name.split('.')[0] for name in known}
+        errors = []
+        for module, names, level, lineno, guarded in imports:
+            if guarded:
+                continue
+            if level:
+                package = package_parts(path)
+                if level - 1 >= len(package):
+                    errors.append((lineno, f"relative import '{'.' * level}{module}' beyond top-level package"))
+                    continue
+                base = package[: len(package) - (level - 1)]
+                full = '.'.join(base + ([module] if module else []))
+                shown = '.' * level + module
+            else:
+                full = shown = module
+
+            if full.split('.')[0] in roots or level:
+                # Other repo modules can only be judged against the module index
+                if self.import_graph is not None and full not in known:
+                    errors.append((lineno, f"unresolved import '{shown}'"))
+            elif self.check_external and not self._is_installed(full.split('.')[0]):
+                errors.append((lineno, f"unresolved import '{shown}'"))
+        return errors
+
+    @staticmethod
+    def _result(path, syntax, imports, structure):
+        errors = [
+            f'{path}:{line}: {message}' if line else f'{path}: {message}'
+            for line, message in sorted(syntax + imports + structure)
+        ]
+        return {
+            'valid': not errors,
+            'errors': errors,
+            'syntax': not syntax,
+            'imports': not imports,
+            'structure': not structure,
+        }
@@ -508,28 +508,51 @@ class Commands:
 
         fence = "`" * 3
 
+        # Tokenize all repo files in one batch; counts are cached by blob
+        repo_token_counts = {}
+        if self.coder.repo:
+            self.coder.repo.set_token_model(self.coder.main_model)
+            rel_fnames = [
+                self.coder.get_rel_fname(fname)
+                for fname in list(self.coder.abs_fnames) + list(self.coder.abs_read_only_fnames)
+            ]
+            repo_token_counts = self.coder.repo.count_file_tokens(
+                fname for fname in rel_fnames if not is_image_file(fname)
+            )
+
+        def file_tokens(relative_fname, content):
+            if relative_fname in repo_token_counts:
+                wrapper = f"{relative_fname}\n{fence}\n{fence}\n"
+                return repo_token_counts[relative_fname] + self.coder.main_model.token_count(wrapper)
+            # approximate
+            content = f"{relative_fname}\n{fence}\n" + content + "{fence}\n"
+            return self.coder.main_model.token_count(content)
+
         file_res = []
         # files
         for fname in self.coder.abs_fnames:
             relative_fname = self.coder.get_rel_fname(fname)
-            content = self.io.read_text(fname)
             if is_image_file(relative_fname):
                 tokens = self.coder.main_model.token_count_for_image(fname)
             else:
-                # approximate
-                content = f"{relative_fname}\n{fence}\n" + content + "{fence}\n"
-                tokens = self.coder.main_model.token_count(content)
+                content = None
+                if relative_fname not in repo_token_counts:
+                    content = self.io.read_text(fname)
+                tokens = file_tokens(relative_fname, content)
             file_res.append((tokens, f"{relative_fname}", "/drop to remove"))
 
         # read-only files
         for fname in self.coder.abs_read_only_fnames:
             relative_fname = self.coder.get_rel_fname(fname)
-            content = self.io.read_text(fname)
-            if content is not None and not is_image_file(relative_fname):
-                # approximate
-                content = f"{relative_fname}\n{fence}\n" + content + "{fence}\n"
-                tokens = self.coder.main_model.token_count(content)
-                file_res.append((tokens, f"{relative_fname} (read-only)", "/drop to remove"))
+            if is_image_file(relative_fname):
+                continue
+            content = None
+            if relative_fname not in repo_token_counts:
+                content = self.io.read_text(fname)
+                if content is None:
+                    continue
+            tokens = file_tokens(relative_fname, content)
+            file_res.append((tokens, f"{relative_fname} (read-only)", "/drop to remove"))
 
         file_res.sort()
         res.extend(file_res)
@@ -819,7 +842,7 @@ class Commands:
 
         # if repo, filter against it
         if self.coder.repo:
-            git_files = self.coder.repo.get_tracked_files()
+            git_files = self.coder.repo.get_tracked_file_set()
             matched_files = [fn for fn in matched_files if str(fn) in git_files]
 
         res = list(map(str, matched_files))
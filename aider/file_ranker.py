@@ -0,0 +1,126 @@
+"""
+file_ranker.py
+Concept relevance ranking of repo files, cached by blob OID.
+
+Each file's lowercased word set (plus its line count and size) is computed
+once per git blob OID. Ranking the whole repo for another concept is then set
+lookups over cached entries, with no file reads. Blobs not in the cache yet
+are read concurrently on a thread pool. A structural score (e.g. import
+graph PageRank) can be blended in, so files the rest of the repo depends on
+rank above equally matching leaves.
+"""
+
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Relevance is the sum of these, capped at 1.0
+PATH_WEIGHT = 0.5
+CONTENT_WEIGHT = 0.3
+STRUCTURE_WEIGHT = 0.2
+
+WORD_RE = re.compile(r'[A-Za-z0-9_]+')
+# Parts of camelCase / snake_case words: "getOSPRanking" -> get, OSP, Ranking
+WORD_PART_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+
+
+def word_tokens(text):
+    """Lowercased words in text, plus the parts of compound identifiers."""
+    words = set()
+    for word in set(WORD_RE.findall(text)):
+        words.add(word.lower())
+        if '_' in word or not (word.islower() or word.isupper()):
+            words.update(part.lower() for part in WORD_PART_RE.findall(word))
+    return frozenset(words)
+
+
+class FileRanker:
+    """
+    Rank files against a concept, caching per-blob word sets.
+    """
+
+    def __init__(self, max_workers=8, cache_size=65536):
+        """
+        Initialize a ranker.
+
+        Args:
+            max_workers: Threads reading uncached files
+            cache_size: Number of per-blob entries to keep
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.entries = OrderedDict()
+        self.read_count = 0
+
+    @staticmethod
+    def _entry(content):
+        # Unreadable and binary files (None) have no words
+        if content is None:
+            return frozenset(), 0, 0
+        return word_tokens(content), content.count('\n') + 1, len(content)
+
+    def _load(self, file_oids, read_file):
+        """Entries for {path: oid}, reading cache misses concurrently."""
+        entries = {}
+        missing = {}
+        for path, oid in file_oids.items():
+            if oid in self.entries:
+                self.entries.move_to_end(oid)
+                entries[oid] = self.entries[oid]
+            elif oid not in missing:
+                missing[oid] = path
+
+        if missing:
+            oids = list(missing)
+            workers = max(1, min(self.max_workers, len(oids)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                fresh = dict(zip(oids, executor.map(lambda oid: self._entry(read_file(missing[oid])), oids)))
+            self.read_count += len(fresh)
+            entries.update(fresh)
+            self.entries.update(fresh)
+            while len(self.entries) > self.cache_size:
+                self.entries.popitem(last=False)
+        return entries
+
+    def rank(self, concept, file_oids, read_file, structure=None):
+        """
+        Score every file's relevance to a concept.
+
+        Args:
+            concept: Word or identifier to rank against
+            file_oids: Mapping of repo path -> blob OID of its current content
+            read_file: Function returning a path's text content, or None if
+                it is unreadable (e.g. GitRepo.get_file_text)
+            structure: Optional {path: structural importance}, scaled so the
+                top file gets the full STRUCTURE_WEIGHT
+
+        Returns:
+            list: {'path', 'relevance', 'lines', 'size'} for every file, most
+            relevant first (ties by path)
+        """
+        entries = self._load(file_oids, read_file)
+        concept_lower = concept.lower()
+        concept_words = word_tokens(concept)
+        structure = structure or {}
+        top = max(structure.values(), default=0)
+
+        ranked = []
+        for path, oid in file_oids.items():
+            words, lines, size = entries[oid]
+            path_lower = path.lower()
+            relevance = 0.0
+            if concept_lower in path_lower:
+                relevance += PATH_WEIGHT
+            if concept_words <= words and size:
+                relevance += CONTENT_WEIGHT
+            if top > 0:
+                relevance += STRUCTURE_WEIGHT * structure.get(path, 0) / top
+            ranked.append({
+                'path': path,
+                'relevance': min(round(relevance, 4), 1.0),
+                'lines': lines,
+                'size': size,
+            })
+
+        ranked.sort(key=lambda entry: (-entry['relevance'], entry['path']))
+        return ranked
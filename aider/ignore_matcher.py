@@ -0,0 +1,138 @@
+"""
+ignore_matcher.py
+Compiled matcher for .aiderignore patterns and --subtree-only.
+
+The pathspec and the subtree prefix are computed once, so checking a path is
+a string prefix test plus a cached pathspec lookup. `filter_paths()` filters a
+whole listing in a single pass.
+"""
+
+import os
+
+import pathspec
+
+# Subtree marker for a cwd outside the repo: every path is ignored
+OUTSIDE_REPO = object()
+
+
+def to_posix(path):
+    path = str(path)
+    if os.sep != '/':
+        path = path.replace(os.sep, '/')
+    return path
+
+
+class IgnoreMatcher:
+    """
+    Decide which repo-relative paths aider should ignore.
+
+    Pathspec results are cached per path. Pattern changes keep every cached
+    result they cannot affect. Appending plain (non-negated) patterns can
+    only ignore more paths, so ignored results survive it. Subtree changes
+    never touch the pathspec cache.
+    """
+
+    def __init__(self, patterns=(), subtree=None):
+        """
+        Initialize a matcher.
+
+        Args:
+            patterns: Lines of a .aiderignore file
+            subtree: Posix path of the subtree to restrict to ('' or None for
+                the whole repo, OUTSIDE_REPO to ignore everything)
+        """
+        self.patterns = ()
+        self.spec = None
+        self.subtree = ''
+        self._prefix = None
+        self._cache = {}
+        # Bumped whenever a result could change, for callers caching filtered sets
+        self.version = 0
+        self.set_patterns(patterns)
+        self.set_subtree(subtree)
+
+    def set_patterns(self, patterns):
+        """Recompile for new ignore lines, keeping cached results they cannot change."""
+        patterns = tuple(patterns)
+        if patterns == self.patterns:
+            return
+
+        old = self.patterns
+        appended = patterns[len(old):]
+        only_added = (
+            patterns[:len(old)] == old
+            and not any(line.strip().startswith('!') for line in appended)
+        )
+
+        self.patterns = patterns
+        self.spec = (
+            pathspec.PathSpec.from_lines(pathspec.patterns.GitWildMatchPattern, patterns)
+            if patterns
+            else None
+        )
+
+        if only_added:
+            self._cache = {path: True for path, ignored in self._cache.items() if ignored}
+        else:
+            self._cache = {}
+        self.version += 1
+
+    def set_subtree(self, subtree):
+        """Restrict matching to `subtree` (see __init__)."""
+        if subtree is not OUTSIDE_REPO:
+            subtree = to_posix(subtree or '').strip('/')
+            if subtree == '.':
+                subtree = ''
+        if subtree == self.subtree:
+            return
+        self.subtree = subtree
+        self._prefix = subtree + '/' if subtree and subtree is not OUTSIDE_REPO else None
+        self.version += 1
+
+    def _spec_match(self, path):
+        ignored = self._cache.get(path)
+        if ignored is None:
+            ignored = self._cache[path] = self.spec.match_file(path)
+        return ignored
+
+    def is_ignored(self, path):
+        """Return True if the repo-relative `path` should be ignored."""
+        if self.subtree is OUTSIDE_REPO:
+            return True
+
+        path = to_posix(path)
+        prefix = self._prefix
+        if prefix and path != self.subtree and not path.startswith(prefix):
+            return True
+
+        if self.spec is None:
+            return False
+        return self._spec_match(path)
+
+    def filter_paths(self, paths):
+        """
+        Return the paths in `paths` that are not ignored, in input order.
+
+        Args:
+            paths: Iterable of repo-relative path strings (native or posix separators)
+
+        Returns:
+            list: The kept paths, unchanged
+        """
+        if self.subtree is OUTSIDE_REPO:
+            return []
+
+        prefix = self._prefix
+        subtree = self.subtree
+        spec_match = self._spec_match if self.spec is not None else None
+        convert = os.sep != '/'
+
+        kept = []
+        for path in paths:
+            posix = path.replace(os.sep, '/') if convert else path
+            if prefix and posix != subtree and not posix.startswith(prefix):
+                continue
+            if spec_match and spec_match(posix):
+                continue
+            kept.append(path)
+        return kept
@@ -0,0 +1,414 @@
+"""
+import_graph.py
+Module-resolution index and import adjacency for Python sources.
+
+Imports are extracted with `ast` and cached per git blob, so only files whose
+content changed are parsed again. Resolution maps dotted module names to
+repo paths exactly, avoiding the false positives of substring matching.
+"""
+
+import ast
+import posixpath
+from collections import deque
+
+SOURCE_ROOTS = ('src', 'lib', 'python')
+
+
+def parse_import_specs(source):
+    """
+    Extract raw import specs from Python source.
+
+    Returns a list of (module, names, level) tuples, where `module` is the
+    dotted name after `import`/`from` ('' for `from . import x`), `names` are
+    the imported names for `from` imports and `level` counts leading dots.
+    The specs do not depend on the file's location, so they can be cached by
+    content alone.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    specs = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                specs.append((alias.name, (), 0))
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != '*')
+            specs.append((node.module or '', names, node.level or 0))
+    return specs
+
+
+def module_names_for_path(path):
+    """Return the dotted module names a repo-relative .py path can be imported as."""
+    path = str(path).replace('\\', '/')
+    if not path.endswith('.py'):
+        return []
+
+    parts = path[:-3].split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    if not parts:
+        return []
+
+    names = ['.'.join(parts)]
+    if len(parts) > 1 and parts[0] in SOURCE_ROOTS:
+        names.append('.'.join(parts[1:]))
+    return names
+
+
+def package_parts(path):
+    """Return the package a .py path belongs to, as a list of name parts."""
+    names = module_names_for_path(path)
+    if not names:
+        return []
+    parts = names[0].split('.')
+    if posixpath.basename(path) == '__init__.py':
+        return parts
+    return parts[:-1]
+
+
+class ImportGraph:
+    """
+    Forward and reverse import adjacency over a set of Python files.
+
+    Call `update()` with the current {path: blob_oid} mapping, or `set_file()`
+    and `remove_file()` to patch one file; only files whose blob changed are
+    re-parsed. Adding or deleting a file only re-resolves the files whose
+    imports looked up its module name, and edges are patched in place. Closure queries are memoized, and an update only drops the
+    closures that touch a node whose edges changed.
+    """
+
+    def __init__(self):
+        self.modules = {}
+        self.forward = {}
+        self.reverse = {}
+        self.file_oids = {}
+        self.specs_by_oid = {}
+        self._specs_by_path = {}
+        # Every path a module name could refer to; `modules` holds the first
+        self._module_paths = {}
+        # Module names each file's import resolution looked up, and the
+        # inverse: a module appearing or disappearing only affects its probers
+        self._probes_by_path = {}
+        self._importers_by_name = {}
+        self._closure_cache = {}
+        # Last PageRank vector per (seeds, damping); `_pagerank_current` holds
+        # the keys computed since the last edge change
+        self._pagerank_vectors = {}
+        self._pagerank_current = set()
+        self.pagerank_iterations = 0
+
+    def update(self, file_oids, load_specs):
+        """
+        Bring the graph up to date.
+
+        Args:
+            file_oids: Mapping of posix repo path -> blob OID for every Python file
+            load_specs: Callable taking a list of (path, oid) pairs that need
+                specs and returning {oid: specs}
+
+        Returns:
+            int: Number of files whose imports were (re)resolved
+        """
+        file_oids = {path.replace('\\', '/'): oid for path, oid in file_oids.items()}
+
+        removed = set(self.file_oids) - set(file_oids)
+        changed = {path: oid for path, oid in file_oids.items() if self.file_oids.get(path) != oid}
+        return self._apply(changed, removed, load_specs)
+
+    def set_file(self, path, oid, load_specs):
+        """
+        Add or change a single file, without diffing the whole file mapping.
+
+        Args:
+            path: Posix repo path of a Python file
+            oid: Its blob OID
+            load_specs: As for update()
+
+        Returns:
+            int: Number of files whose imports were (re)resolved
+        """
+        path = path.replace('\\', '/')
+        if self.file_oids.get(path) == oid:
+            return 0
+        return self._apply({path: oid}, set(), load_specs)
+
+    def remove_file(self, path):
+        """Drop a single file; returns the number of files re-resolved."""
+        path = path.replace('\\', '/')
+        if path not in self.file_oids:
+            return 0
+        return self._apply({}, {path}, None)
+
+    def _apply(self, changed, removed, load_specs):
+        """Patch the graph for `changed` ({path: new oid}) and `removed` paths."""
+        if not removed and not changed:
+            return 0
+
+        missing = [(path, oid) for path, oid in changed.items() if oid not in self.specs_by_oid]
+        if missing:
+            self.specs_by_oid.update(load_specs(missing))
+
+        added = [path for path in changed if path not in self.file_oids]
+        for path in removed:
+            del self.file_oids[path]
+            self._specs_by_path.pop(path, None)
+        for path, oid in changed.items():
+            self.file_oids[path] = oid
+            self._specs_by_path[path] = self.specs_by_oid.get(oid, [])
+
+        to_resolve = set(changed)
+        if removed or added:
+            # A new or deleted module only changes how imports that looked
+            # up its name resolve
+            for name in self._update_modules(added, removed):
+                to_resolve |= self._importers_by_name.get(name, set())
+            to_resolve -= removed
+
+        changed_nodes = set()
+        for path in removed:
+            self._set_probes(path, set())
+            changed_nodes |= self._set_edges(path, set())
+        for path in sorted(to_resolve):
+            targets, probes = self._resolve_imports(path)
+            self._set_probes(path, probes)
+            changed_nodes |= self._set_edges(path, targets)
+
+        self._invalidate(changed_nodes)
+        if changed_nodes:
+            self._pagerank_current = set()
+        return len(to_resolve)
+
+    def _update_modules(self, added, removed):
+        """Patch the module index; returns the names whose resolution changed."""
+        changed_names = set()
+        for path, present in [(path, False) for path in removed] + [(path, True) for path in added]:
+            for name in module_names_for_path(path):
+                paths = self._module_paths.setdefault(name, set())
+                if present:
+                    paths.add(path)
+                else:
+                    paths.discard(path)
+
+                # The first path in sorted order wins, as in a full rebuild
+                winner = min(paths) if paths else None
+                if winner is None:
+                    del self._module_paths[name]
+                    self.modules.pop(name, None)
+                elif self.modules.get(name) != winner:
+                    self.modules[name] = winner
+                else:
+                    continue
+                changed_names.add(name)
+        return changed_names
+
+    def _set_probes(self, path, probes):
+        for name in self._probes_by_path.get(path, set()) - probes:
+            importers = self._importers_by_name.get(name)
+            if importers is not None:
+                importers.discard(path)
+                if not importers:
+                    del self._importers_by_name[name]
+        for name in probes:
+            self._importers_by_name.setdefault(name, set()).add(path)
+        if probes:
+            self._probes_by_path[path] = probes
+        else:
+            self._probes_by_path.pop(path, None)
+
+    def _invalidate(self, changed_nodes):
+        """Drop memoized closures that start at or pass through a node whose edges changed."""
+        if not changed_nodes:
+            return
+        self._closure_cache = {
+            key: distances
+            for key, distances in self._closure_cache.items()
+            if key[0] not in changed_nodes and changed_nodes.isdisjoint(distances)
+        }
+
+    def _set_edges(self, path, targets):
+        """Replace `path`'s import edges; returns the nodes whose adjacency changed."""
+        old_targets = self.forward.get(path, set())
+        if path in self.file_oids and path in self.forward and old_targets == targets:
+            return set()
+
+        for old in old_targets:
+            importers = self.reverse.get(old)
+            if importers is not None:
+                importers.discard(path)
+                if not importers:
+                    del self.reverse[old]
+
+        if path not in self.file_oids:
+            self.forward.pop(path, None)
+            return {path} | old_targets
+
+        self.forward[path] = targets
+        for target in targets:
+            self.reverse.setdefault(target, set()).add(path)
+        return {path} | (old_targets ^ targets)
+
+    def _lookup(self, dotted, probes):
+        """Resolve the longest importable prefix of a dotted name, recording each name tried."""
+        parts = dotted.split('.')
+        while parts:
+            name = '.'.join(parts)
+            probes.add(name)
+            path = self.modules.get(name)
+            if path:
+                return path
+            parts = parts[:-1]
+        return None
+
+    def _resolve_imports(self, path):
+        """Returns (target paths, module names whose presence decided the result)."""
+        targets = set()
+        probes = set()
+        for module, names, level in self._specs_by_path.get(path, ()):
+            if level:
+                package = package_parts(path)
+                if level - 1 > len(package):
+                    continue
+                base = package[: len(package) - (level - 1)]
+                module = '.'.join(base + ([module] if module else []))
+                if not module:
+                    continue
+
+            resolved = []
+            for name in names:
+                # `from pkg import submodule` targets the submodule itself
+                probes.add(f'{module}.{name}')
+                submodule = self.modules.get(f'{module}.{name}')
+                if submodule:
+                    resolved.append(submodule)
+            if len(resolved) < len(names) or not names:
+                target = self._lookup(module, probes)
+                if target:
+                    resolved.append(target)
+
+            targets.update(target for target in resolved if target != path)
+        return targets, probes
+
+    def resolve_module(self, dotted):
+        """Return the repo path for a dotted module name, or None."""
+        return self.modules.get(dotted)
+
+    def imports_of(self, path):
+        """Files directly imported by `path`."""
+        return set(self.forward.get(str(path).replace('\\', '/'), ()))
+
+    def importers_of(self, path):
+        """Files that directly import `path`."""
+        return set(self.reverse.get(str(path).replace('\\', '/'), ()))
+
+    def closure(self, path, max_depth=None, direction='forward'):
+        """
+        Transitive closure from `path`, memoized per (path, depth, direction).
+
+        Args:
+            path: Repo-relative file path
+            max_depth: Maximum number of hops (None for unbounded)
+            direction: 'forward' (imports), 'reverse' (importers) or 'both'
+
+        Returns:
+            dict: path -> hop distance for every reachable file (excluding `path`)
+        """
+        path = str(path).replace('\\', '/')
+        key = (path, max_depth, direction)
+        cached = self._closure_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        adjacency = []
+        if direction in ('forward', 'both'):
+            adjacency.append(self.forward)
+        if direction in ('reverse', 'both'):
+            adjacency.append(self.reverse)
+
+        distances = {path: 0}
+        queue = deque([path])
+        while queue:
+            current = queue.popleft()
+            depth = distances[current]
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for edges in adjacency:
+                for neighbor in edges.get(current, ()):
+                    if neighbor not in distances:
+                        distances[neighbor] = depth + 1
+                        queue.append(neighbor)
+
+        del distances[path]
+        self._closure_cache[key] = distances
+        return dict(distances)
+
+    def pagerank(self, seeds=(), damping=0.85, tol=1e-6, max_iter=100):
+        """
+        Personalized PageRank over import edges (importers pass rank to what they import).
+
+        Power iteration runs over the sparse forward adjacency. The previous
+        vector for the same seeds is returned while the graph is unchanged,
+        and warm-starts the iteration after edits, so small edits converge in
+        a few sweeps.
+
+        Args:
+            seeds: Paths the random walk restarts from (all files if empty)
+            damping: Probability of following an import instead of restarting
+            tol: L1 change between sweeps at which iteration stops
+            max_iter: Maximum number of sweeps
+
+        Returns:
+            dict: path -> score for every file, summing to 1
+        """
+        nodes = list(self.file_oids)
+        if not nodes:
+            return {}
+
+        seeds = sorted({str(seed).replace('\\', '/') for seed in seeds} & self.file_oids.keys())
+        key = (tuple(seeds), damping)
+        if key in self._pagerank_current:
+            return dict(self._pagerank_vectors[key])
+
+        if seeds:
+            restart = {seed: 1.0 / len(seeds) for seed in seeds}
+        else:
+            restart = {node: 1.0 / len(nodes) for node in nodes}
+
+        rank = None
+        previous = self._pagerank_vectors.get(key)
+        if previous:
+            rank = {node: previous.get(node, 0.0) for node in nodes}
+            total = sum(rank.values())
+            rank = {node: value / total for node, value in rank.items()} if total > 0 else None
+        if rank is None:
+            rank = {node: restart.get(node, 0.0) for node in nodes}
+
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            dangling = 0.0
+            new_rank = dict.fromkeys(nodes, 0.0)
+            for node in nodes:
+                targets = self.forward.get(node)
+                if targets:
+                    share = damping * rank[node] / len(targets)
+                    for target in targets:
+                        new_rank[target] += share
+                else:
+                    dangling += rank[node]
+
+            # Restarts and dangling files both jump back to the seeds
+            base = (1.0 - damping) + damping * dangling
+            for node, weight in restart.items():
+                new_rank[node] += base * weight
+
+            delta = sum(abs(new_rank[node] - rank[node]) for node in nodes)
+            rank = new_rank
+            if delta < tol:
+                break
+
+        self.pagerank_iterations = iterations
+        self._pagerank_vectors[key] = rank
+        self._pagerank_current.add(key)
+        return dict(rank)
@@ -4,6 +4,22 @@ Python ↔ Jac bridge
 Handles interaction between Python code and Jac walkers/functions.
 Allows Python to execute Jac walkers, retrieve outputs, and pass data.
 """
+
+import asyncio
+import functools
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..code_compressor import strip_source
+from ..file_ranker import FileRanker
+from ..jac_worker import DEFAULT_CACHE_DIR, JacWorkerError, JacWorkerPool
+
+JAC_RUNTIME = shutil.which("jac") or "jac"
+
+
+class JacBridgeError(Exception):
     """Custom exception for Jac bridge errors."""
     pass
 
@@ -13,14 +29,61 @@ class JacBridge:
     Bridge class to interact with Jac scripts from Python.
     """
 
-    def __init__(self, jac_workspace: Optional[str] = None):
+    def __init__(self, jac_workspace: Optional[str] = None, cache_dir: Optional[str] = None):
         """
         Initialize Jac bridge.
 
         Args:
             jac_workspace: Path to the Jac project folder containing Jac files.
+            cache_dir: Directory for compiled Jac modules (default: the per-user cache directory)
         """
         self.jac_workspace = jac_workspace or os.getcwd()
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self._worker_pool = None
+        self.repo = None
+        self.file_ranker = FileRanker()
+
+    def load_repo(self, repo):
+        """
+        Work on the session's GitRepo: rank its tracked-file index (shared
+        with its repo map), and hand it to Jac walkers' load_repo hooks.
+        """
+        self.repo = repo
+        if self._worker_pool is not None:
+            self._worker_pool.repo_root = repo.root
+
+    def get_repo(self):
+        """The GitRepo passed to load_repo (None if none was loaded)."""
+        return self.repo
+
+    @property
+    def worker_pool(self) -> JacWorkerPool:
+        """Persistent Jac workers, started on first use."""
+        if self._worker_pool is None:
+            self._worker_pool = JacWorkerPool(
+                self.jac_workspace,
+                cache_dir=self.cache_dir,
+                repo_root=self.repo.root if self.repo is not None else None,
+            )
+        return self._worker_pool
+
+    def warm_cache(self) -> Dict[str, str]:
+        """
+        Precompile every Jac module in the workspace into the compiled cache.
+
+        Returns:
+            Dict of Jac file -> "cached", "compiled" or the compile error
+        """
+        try:
+            return self.worker_pool.warm()
+        except (JacWorkerError, OSError) as e:
+            raise JacBridgeError(f"Jac warm-up failed: {e}") from e
+
+    def close(self):
+        """Stop the Jac worker processes."""
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+            self._worker_pool = None
 
     def _run_jac_command(self, jac_file: str, args: Optional[Dict[str, Any]] = None) -> Any:
         """
@@ -28,12 +91,31 @@ class JacBridge:
 
         Args:
             jac_file: Name of the Jac file (with or without .jac extension)
-            args: Dictionary of arguments to pass (optional)
+            args: Globals to set in the file before it runs (optional)
 
         Returns:
             The parsed output from Jac (JSON-compatible)
         """
-    # Ensure .jac extension
+        try:
+            return self.worker_pool.run(self._resolve_jac_file(jac_file), args)
+        except (JacWorkerError, OSError) as e:
+            raise JacBridgeError(f"Jac execution failed: {e}") from e
+
+    def _resolve_jac_file(self, jac_file: str) -> str:
+        """Absolute path of a Jac file given relative to the cwd or by name in the workspace."""
+        # Ensure .jac extension
+        if not jac_file.endswith(".jac"):
+            jac_file += ".jac"
+        if not os.path.isabs(jac_file) and not os.path.exists(jac_file):
+            jac_file = os.path.join(self.jac_workspace, os.path.basename(jac_file))
+        if not os.path.exists(jac_file):
+            raise JacBridgeError(f"Jac file {jac_file} not found")
+        return os.path.abspath(jac_file)
+
+    def _has_jac_walker(self, walker_name: str) -> bool:
+        return os.path.exists(os.path.join(self.jac_workspace, f"{walker_name}.jac"))
+
+    def execute_walker(self, walker_name: str, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """
         Execute a Jac walker method with parameters.
         Alias for call_walker for compatibility.
@@ -54,7 +136,7 @@ class JacBridge:
 
         Args:
             jac_file: Name of the Jac file to execute
-            args: Optional dictionary of arguments
+            args: Optional globals for the script, set before it runs
 
         Returns:
             Result of the Jac script execution
@@ -68,71 +150,50 @@ class JacBridge:
         if args is None:
             args = {}
 
+        local_call = self._local_call(walker_name, function_name, args)
+        if local_call is not None:
+            return local_call()
+
+        # Fallback: try to execute actual Jac file
+        return self._execute_jac_walker(walker_name, function_name, args)
+
+    def _local_call(self, walker_name: str, function_name: str, args: Dict[str, Any]) -> Optional[Callable[[], Any]]:
+        """The Python implementation of a walker function, or None if it runs in Jac."""
         # Implement core Jac walker functionality in Python for reliability
         if walker_name == "file_analysis" and function_name == "get_osp_ranking":
-            return self._real_osp_ranking(args.get("concept", "main"))
+            return lambda: self._real_osp_ranking(args.get("concept", "main"), args.get("limit", 5))
 
         elif walker_name == "planning" and function_name == "autonomous_plan":
-            return self._real_autonomous_planning(args.get("objective", ""), args.get("files", []))
+            return lambda: self._real_autonomous_planning(args.get("objective", ""), args.get("files", []))
 
         elif walker_name == "token_optimizer" and function_name == "optimize_prompt":
-            return self._real_token_optimization(args.get("code", ""))
+            return lambda: self._real_token_optimization(args.get("code", ""))
 
         elif walker_name == "genius_agent" and function_name == "autonomous_edit":
-            return self._real_genius_execution(args.get("task", ""), args.get("files", []))
-
-        else:
-            # Fallback: try to execute actual Jac file
-            return self._execute_jac_walker(walker_name, function_name, args)
-
-    def _real_osp_ranking(self, concept: str) -> Dict[str, Any]:
-        """Real OSP file ranking implementation"""
-        # Analyze actual project files
-        project_files = []
-        aider_dir = os.path.join(os.path.dirname(self.jac_workspace), "..")
-
-        for root, dirs, files in os.walk(aider_dir):
-            for file in files:
-                if file.endswith('.py') and not file.startswith('.'):
-                    file_path = os.path.relpath(os.path.join(root, file), aider_dir)
-                    if not file_path.startswith('.venv/') and len(file_path.split('/')) <= 3:
-                        project_files.append(file_path)
-
-        # Calculate real relevance scores
-        ranked_files = []
-        for file_path in project_files[:10]:  # Top 10 files
-            try:
-                full_path = os.path.join(aider_dir, file_path)
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Calculate spatial relevance
-                relevance = 0.0
-                if concept.lower() in file_path.lower():
-                    relevance += 0.5
-                if concept.lower() in content.lower():
-                    relevance += 0.3
-                if 'main' in file_path and 'main' in concept:
-                    relevance += 0.2
-                if file_path.startswith('aider/'):
-                    relevance += 0.1
-
-                ranked_files.append({
-                    "path": file_path,
-                    "relevance": min(relevance, 1.0),
-                    "lines": len(content.split('\n')),
-                    "size": len(content)
-                })
-            except:
-                continue
-
-        # Sort by relevance
-        ranked_files.sort(key=lambda x: x['relevance'], reverse=True)
+            return lambda: self._real_genius_execution(args.get("task", ""), args.get("files", []))
+
+        return None
+
+    def _real_osp_ranking(self, concept: str, limit: int = 5) -> Dict[str, Any]:
+        """Real OSP file ranking over every tracked file in the repo"""
+        repo = self.get_repo()
+        if repo is None:
+            return {"concept": concept, "total_files_analyzed": 0, "ranked_files": [],
+                    "error": "No git repository loaded"}
+
+        # Word sets are cached by blob OID, so only new or changed files are read
+        file_oids = repo.get_file_oids()
+        # Structural importance: PageRank over the repo's import graph
+        structure = {
+            repo.normalize_path(path): score
+            for path, score in repo.get_import_graph().pagerank().items()
+        }
+        ranked_files = self.file_ranker.rank(concept, file_oids, repo.get_file_text, structure)
 
         return {
             "concept": concept,
-            "total_files_analyzed": len(project_files),
-            "ranked_files": ranked_files[:5],  # Top 5
+            "total_files_analyzed": len(file_oids),
+            "ranked_files": ranked_files[:limit],
             "analysis_type": "OSP_spatial_ranking"
         }
 
@@ -195,21 +256,9 @@ class JacBridge:
 
         original_size = len(code)
 
-        # Smart optimization: remove comments and extra whitespace
-        lines = code.split('\n')
-        optimized_lines = []
-
-        for line in lines:
-            stripped = line.strip()
-            # Keep non-comment, non-empty lines
-            if stripped and not stripped.startswith('#'):
-                # Remove inline comments
-                if '#' in stripped:
-                    stripped = stripped.split('#')[0].strip()
-                if stripped:
-                    optimized_lines.append(stripped)
-
-        optimized_code = '\n'.join(optimized_lines)
+        # Remove comments, docstrings and blank lines. Tokenizer-based, so a
+        # "#" inside a string literal or URL is kept; indentation is untouched.
+        optimized_code = strip_source(code)
         optimized_size = len(optimized_code)
 
         savings = ((original_size - optimized_size) / original_size) * 100 if original_size > 0 else 0
@@ -220,6 +269,7 @@ class JacBridge:
             "savings_percent": round(savings, 1),
             "original_size": original_size,
             "optimized_size": optimized_size,
+            "optimized_code": optimized_code,
             "optimization_successful": True
         }
 
@@ -239,22 +289,21 @@ class JacBridge:
         }
 
     def _execute_jac_walker(self, walker_name: str, function_name: str, args: Dict[str, Any]) -> Any:
-        """Fallback: try to execute actual Jac file"""
+        """Fallback: call the walker function in a persistent Jac worker"""
+        if not self._has_jac_walker(walker_name):
+            return {"error": f"Jac file {walker_name}.jac not found", "success": False}
         try:
-            jac_file = os.path.join(self.jac_workspace, f"{walker_name}.jac")
-            if os.path.exists(jac_file):
-                # Simple Jac execution
-                result = subprocess.run([JAC_RUNTIME, "run", jac_file],
-                                      capture_output=True, text=True, timeout=10)
-                if result.returncode == 0:
-                    return {"jac_output": result.stdout, "success": True}
-                else:
-                    return {"error": result.stderr, "success": False}
-            else:
-                return {"error": f"Jac file {walker_name}.jac not found", "success": False}
-        except Exception as e:
+            result = self.worker_pool.call(walker_name, function_name, args)
+            return {"result": result, "success": True}
+        except (JacWorkerError, OSError) as e:
             return {"error": str(e), "success": False}
 
+    @staticmethod
+    def _batch_result(entry: Dict[str, Any]) -> Dict[str, Any]:
+        if entry["ok"]:
+            return {"result": entry["result"], "success": True}
+        return {"error": entry["error"], "success": False}
+
     def test_connection(self) -> Dict[str, Any]:
         """
         Test the Jac bridge connection.
@@ -262,14 +311,169 @@ class JacBridge:
         Returns:
             Dict with success status and connection info
         """
-    try:
+        try:
+            info = self.worker_pool.ping()
+            return {
+                "success": True,
+                "workspace": self.jac_workspace,
+                "runtime": JAC_RUNTIME,
+                "worker_pid": info["pid"],
+                "modules": info["modules"],
+            }
+        except (JacWorkerError, OSError) as e:
+            return {"success": False, "workspace": self.jac_workspace, "error": str(e)}
+
+    def call_many(self, calls: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Any]:
         """
-        Call multiple Jac functions in sequence.
+        Call multiple Jac functions in one batch.
+
+        Jac calls are shipped to the workers in a single round trip per
+        worker and run concurrently there; calls with a Python
+        implementation run on threads at the same time.
 
         Args:
             calls: List of dicts, each with keys: walker, func, args
+            timeout: Seconds to wait for the Jac calls (default: the pool's timeout)
 
         Returns:
-            List of results in the same order
+            List of results in the same order. Each is what call_walker would
+            return; a call that failed gets {"error": ..., "success": False}.
+        """
+        results, local_calls, jac_calls = self._split_calls(calls)
+
+        def run_local(local_call):
+            try:
+                return local_call()
+            except Exception as e:
+                return {"error": str(e), "success": False}
+
+        with ThreadPoolExecutor(max_workers=len(local_calls) + 1) as executor:
+            batch = None
+            if jac_calls:
+                batch = executor.submit(self.worker_pool.call_many, [call for _, call in jac_calls], timeout)
+            local_results = executor.map(run_local, [local_call for _, local_call in local_calls])
+            for (i, _), result in zip(local_calls, local_results):
+                results[i] = result
+            if batch is not None:
+                try:
+                    entries = batch.result()
+                except (JacWorkerError, OSError) as e:
+                    entries = [{"ok": False, "error": str(e)}] * len(jac_calls)
+                for (i, _), entry in zip(jac_calls, entries):
+                    results[i] = self._batch_result(entry)
+        return results
+
+    def _split_calls(self, calls: List[Dict[str, Any]]):
+        """Sort a batch into (results with missing walkers filled in, local calls, Jac calls)."""
+        results: List[Any] = [None] * len(calls)
+        local_calls = []
+        jac_calls = []
+        for i, call in enumerate(calls):
+            args = call.get("args") or {}
+            local_call = self._local_call(call["walker"], call["func"], args)
+            if local_call is not None:
+                local_calls.append((i, local_call))
+            elif self._has_jac_walker(call["walker"]):
+                jac_calls.append((i, {"walker": call["walker"], "func": call["func"], "args": args}))
+            else:
+                results[i] = {"error": f"Jac file {call['walker']}.jac not found", "success": False}
+        return results, local_calls, jac_calls
+
+    # asyncio API. Jac calls await the worker's response on the event loop;
+    # Python implementations run on the loop's default executor. A deadline
+    # (`timeout`) raises asyncio.TimeoutError, and a Jac worker stuck past it
+    # is replaced. Cancelling a call abandons its result.
+
+    async def arun(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
         """
-    results = []
+        Run a blocking function on the default executor, under a deadline.
+
+        The thread itself cannot be interrupted: on timeout or cancellation
+        it finishes in the background and its result is dropped.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments for func
+            timeout: Deadline in seconds (None for no deadline)
+
+        Returns:
+            The function's result
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(loop.run_in_executor(None, functools.partial(func, *args)), timeout)
+
+    async def acall_walker(self, walker_name: str, function_name: str, args: Optional[Dict[str, Any]] = None,
+                           timeout: Optional[float] = None) -> Any:
+        """
+        Async call_walker().
+
+        Args:
+            walker_name: Name of the walker
+            function_name: Function or walker method to call
+            args: Keyword arguments for the function
+            timeout: Deadline in seconds (default: the pool's timeout for Jac calls, none otherwise)
+
+        Returns:
+            The same result as call_walker
+        """
+        if args is None:
+            args = {}
+
+        local_call = self._local_call(walker_name, function_name, args)
+        if local_call is not None:
+            return await self.arun(local_call, timeout=timeout)
+
+        if not self._has_jac_walker(walker_name):
+            return {"error": f"Jac file {walker_name}.jac not found", "success": False}
+        try:
+            result = await self.worker_pool.acall(walker_name, function_name, args, timeout)
+            return {"result": result, "success": True}
+        except (JacWorkerError, OSError) as e:
+            return {"error": str(e), "success": False}
+
+    async def acall_many(self, calls: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Any]:
+        """
+        Async call_many(): one round trip per worker for the Jac calls, with
+        the Python ones running on the executor meanwhile.
+
+        Args:
+            calls: List of dicts, each with keys: walker, func, args
+            timeout: Deadline in seconds for every call in the batch
+
+        Returns:
+            List of results in the same order, as call_many returns them
+        """
+        results, local_calls, jac_calls = self._split_calls(calls)
+
+        async def run_local(local_call):
+            try:
+                return await self.arun(local_call, timeout=timeout)
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                return {"error": str(e), "success": False}
+
+        async def run_jac():
+            try:
+                return await self.worker_pool.acall_many([call for _, call in jac_calls], timeout)
+            except (JacWorkerError, OSError) as e:
+                return [{"ok": False, "error": str(e)}] * len(jac_calls)
+
+        outcomes = await asyncio.gather(
+            *(run_local(local_call) for _, local_call in local_calls),
+            *([run_jac()] if jac_calls else []),
+        )
+        for (i, _), result in zip(local_calls, outcomes):
+            results[i] = result
+        if jac_calls:
+            for (i, _), entry in zip(jac_calls, outcomes[-1]):
+                results[i] = self._batch_result(entry)
+        return results
+
+    async def aexecute_jac_file(self, jac_file: str, args: Optional[Dict[str, Any]] = None,
+                                timeout: Optional[float] = None) -> Any:
+        """Async execute_jac_file(): the Jac file's entry block output."""
+        try:
+            return await self.worker_pool.arun(self._resolve_jac_file(jac_file), args, timeout)
+        except (JacWorkerError, OSError) as e:
+            raise JacBridgeError(f"Jac execution failed: {e}") from e
@@ -4,8 +4,12 @@ High-level interface for Genius/MTP autonomous agent.
 Provides Python-friendly API to interact with Jac-based MTP agent.
 """
 
+import asyncio
+import os
+import threading
 from typing import Any, Dict, List, Optional
 from .jac_bridge import JacBridge, JacBridgeError
+from ..code_validator import CodeValidator
 
 class MTPInterfaceError(Exception):
     """Custom exception for MTP interface errors."""
@@ -14,16 +18,33 @@ class MTPInterfaceError(Exception):
 class MTPInterface:
     """
     High-level interface for Genius/MTP agent operations.
+
+    Every method has an asyncio counterpart (aplan_task, avalidate_changes,
+    ...) taking an optional `timeout` deadline in seconds.
     """
 
-    def __init__(self, jac_workspace: Optional[str] = None):
+    def __init__(self, jac_workspace: Optional[str] = None, bridge: Optional[JacBridge] = None):
         """
         Initialize MTP interface with optional Jac workspace.
 
         Args:
             jac_workspace: Path to Jac project containing MTP modules
+            bridge: Existing JacBridge to share (its Jac workers and repo)
         """
-        self.bridge = JacBridge(jac_workspace=jac_workspace)
+        self.bridge = bridge or JacBridge(jac_workspace=jac_workspace)
+        self.validator = CodeValidator()
+        self._validate_lock = threading.Lock()
+
+    def _abs_path(self, file_path: str) -> str:
+        repo = self.bridge.get_repo()
+        return repo.abs_root_path(file_path) if repo is not None else os.path.abspath(file_path)
+
+    def _read(self, file_path: str) -> str:
+        try:
+            with open(self._abs_path(file_path), "r", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            raise MTPInterfaceError(f"Failed to read {file_path}: {e}")
 
     def plan_task(self, task_description: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -36,7 +57,23 @@ class MTPInterface:
         Returns:
             Plan dictionary with ordered steps and metadata
         """
-    try:
+        try:
+            plan = self.bridge.call_walker("planning", "autonomous_plan", self._plan_args(task_description))
+        except JacBridgeError as e:
+            raise MTPInterfaceError(f"Failed to plan task: {e}")
+        return self._with_context(plan, context)
+
+    @staticmethod
+    def _plan_args(task_description: str) -> Dict[str, Any]:
+        return {"objective": task_description, "files": []}
+
+    @staticmethod
+    def _with_context(plan: Dict[str, Any], context: Optional[str]) -> Dict[str, Any]:
+        if context:
+            plan["context"] = context
+        return plan
+
+    def edit_file(self, file_path: str, instructions: str) -> str:
         """
         Apply edits to a file according to MTP instructions.
 
@@ -47,7 +84,17 @@ class MTPInterface:
         Returns:
             Updated file content
         """
-    try:
+        try:
+            result = self.bridge.call_walker(
+                "genius_agent", "autonomous_edit", {"task": instructions, "files": [file_path]}
+            )
+        except JacBridgeError as e:
+            raise MTPInterfaceError(f"Failed to edit {file_path}: {e}")
+        if isinstance(result, dict) and result.get("success") is False:
+            raise MTPInterfaceError(f"Failed to edit {file_path}: {result.get('error')}")
+        return self._read(file_path)
+
+    def validate_file(self, file_path: str) -> Dict[str, Any]:
         """
         Run MTP validation on a file.
 
@@ -57,7 +104,9 @@ class MTPInterface:
         Returns:
             Validation results including warnings, errors, and recommendations
         """
-    try:
+        return self._validate([file_path])["files"][file_path]
+
+    def validate_changes(self, files: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Validate recent changes using MTP validation walker.
 
@@ -67,7 +116,30 @@ class MTPInterface:
         Returns:
             Dict containing validation results
         """
-    try:
+        if files is None:
+            repo = self.bridge.get_repo()
+            files = repo.get_dirty_files() if repo is not None else []
+            # Deleted files have nothing left to validate
+            files = [path for path in files if os.path.isfile(self._abs_path(path))]
+        return self._validate(files)
+
+    def _validate(self, files: List[str]) -> Dict[str, Any]:
+        # Same checks as the validation walker, resolving imports against
+        # the repo's incrementally updated import graph
+        contents = {path: self._read(path) for path in files}
+        repo = self.bridge.get_repo()
+        # Async callers validate from executor threads; the validator's cache is not thread-safe
+        with self._validate_lock:
+            if repo is not None:
+                self.validator.import_graph = repo.get_import_graph()
+            results = self.validator.validate(contents)
+        return {
+            "valid": all(result["valid"] for result in results.values()),
+            "files": {path: dict(result, file=path) for path, result in results.items()},
+            "errors": [error for result in results.values() for error in result["errors"]],
+        }
+
+    def run_workflow(self, task_description: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute the full Genius/MTP workflow: planning, editing, validation.
 
@@ -78,4 +150,57 @@ class MTPInterface:
         Returns:
             Dictionary containing plan, edits, and validation results
         """
-    result = {}
+        result = {}
+        result["plan"] = self.plan_task(task_description, context)
+        files = self._plan_files(result["plan"])
+        result["edits"] = {path: self.edit_file(path, task_description) for path in files}
+        result["validation"] = self.validate_changes(files or None)
+        result["success"] = result["validation"]["valid"]
+        return result
+
+    @staticmethod
+    def _plan_files(plan: Dict[str, Any]) -> List[str]:
+        return sorted({path for step in plan.get("execution_plan", []) for path in step.get("target_files", [])})
+
+    # asyncio variants. Jac calls await the worker without blocking the event
+    # loop; file reads and validation run on the default executor. Past
+    # `timeout` seconds, asyncio.TimeoutError is raised.
+
+    async def aplan_task(self, task_description: str, context: Optional[str] = None,
+                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async plan_task()."""
+        try:
+            plan = await self.bridge.acall_walker(
+                "planning", "autonomous_plan", self._plan_args(task_description), timeout=timeout
+            )
+        except JacBridgeError as e:
+            raise MTPInterfaceError(f"Failed to plan task: {e}")
+        return self._with_context(plan, context)
+
+    async def aedit_file(self, file_path: str, instructions: str, timeout: Optional[float] = None) -> str:
+        """Async edit_file()."""
+        return await self.bridge.arun(self.edit_file, file_path, instructions, timeout=timeout)
+
+    async def avalidate_file(self, file_path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async validate_file()."""
+        return await self.bridge.arun(self.validate_file, file_path, timeout=timeout)
+
+    async def avalidate_changes(self, files: Optional[List[str]] = None,
+                                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async validate_changes()."""
+        return await self.bridge.arun(self.validate_changes, files, timeout=timeout)
+
+    async def arun_workflow(self, task_description: str, context: Optional[str] = None,
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Async run_workflow(); the deadline covers the whole workflow, and edits run concurrently."""
+        async def workflow():
+            result = {}
+            result["plan"] = await self.aplan_task(task_description, context)
+            files = self._plan_files(result["plan"])
+            edits = await asyncio.gather(*(self.aedit_file(path, task_description) for path in files))
+            result["edits"] = dict(zip(files, edits))
+            result["validation"] = await self.avalidate_changes(files or None)
+            result["success"] = result["validation"]["valid"]
+            return result
+
+        return await asyncio.wait_for(workflow(), timeout)
@@ -4,8 +4,10 @@ High-level OSP (Optimal Software Planning) interface.
 Provides Python-friendly API to interact with Jac-based RepoMap.
 """
 
+import ast
 from typing import Any, Dict, List, Optional
 from .jac_bridge import JacBridge, JacBridgeError
+from ..repo_index import extract_symbols
 
 class OSPInterfaceError(Exception):
     """Custom exception for OSP interface errors."""
@@ -14,16 +16,36 @@ class OSPInterfaceError(Exception):
 class OSPInterface:
     """
     High-level interface for OSP RepoMap operations.
+
+    Every method has an asyncio counterpart (alist_files, arank_files, ...)
+    taking an optional `timeout` deadline in seconds.
     """
 
-    def __init__(self, jac_workspace: Optional[str] = None):
+    def __init__(self, jac_workspace: Optional[str] = None, bridge: Optional[JacBridge] = None):
         """
         Initialize OSP interface with optional Jac workspace.
 
         Args:
             jac_workspace: Path to the Jac project containing OSP modules
+            bridge: Existing JacBridge to share (its Jac workers and repo)
         """
-        self.bridge = JacBridge(jac_workspace=jac_workspace)
+        self.bridge = bridge or JacBridge(jac_workspace=jac_workspace)
+        self._nodes_by_oid = {}
+
+    def _repo(self):
+        repo = self.bridge.get_repo()
+        if repo is None:
+            raise OSPInterfaceError("No git repository loaded")
+        return repo
+
+    @staticmethod
+    def _walker_result(result: Any, action: str) -> Any:
+        """Unwrap a Jac walker call's result, raising if it failed."""
+        if isinstance(result, dict) and result.get("success") is False:
+            raise OSPInterfaceError(f"Failed to {action}: {result.get('error')}")
+        if isinstance(result, dict) and "result" in result:
+            return result["result"]
+        return result
 
     def list_files(self) -> List[str]:
         """
@@ -34,7 +56,7 @@ class OSPInterface:
         """
         try:
             files = self.bridge.call_walker("repomap_osp", "list_all_files")
-            return files or []
+            return self._walker_result(files, "list files") or []
         except JacBridgeError as e:
             raise OSPInterfaceError(f"Failed to list files: {e}")
 
@@ -48,7 +70,12 @@ class OSPInterface:
         Returns:
             List of function names
         """
-    try:
+        content = self._repo().get_file_text(file_path)
+        if content is None:
+            raise OSPInterfaceError(f"Failed to read {file_path}")
+        return extract_symbols(content, file_path)
+
+    def rank_files(self, files: Optional[List[str]] = None, context: Optional[str] = None) -> Dict[str, float]:
         """
         Rank files in the repository based on OSP algorithms.
 
@@ -59,7 +86,26 @@ class OSPInterface:
         Returns:
             Dict mapping file paths to ranking scores
         """
-    try:
+        try:
+            result = self.bridge.call_walker("file_analysis", "get_osp_ranking", self._ranking_args(context))
+        except JacBridgeError as e:
+            raise OSPInterfaceError(f"Failed to rank files: {e}")
+        return self._scores(result, files)
+
+    @staticmethod
+    def _ranking_args(context: Optional[str]) -> Dict[str, Any]:
+        return {"concept": context or "main", "limit": None}
+
+    @staticmethod
+    def _scores(result: Dict[str, Any], files: Optional[List[str]]) -> Dict[str, float]:
+        if "error" in result:
+            raise OSPInterfaceError(f"Failed to rank files: {result['error']}")
+        scores = {entry["path"]: entry["relevance"] for entry in result["ranked_files"]}
+        if files is None:
+            return scores
+        return {path: scores.get(path, 0.0) for path in files}
+
+    def get_dependencies(self, file_path: str) -> List[str]:
         """
         Get direct dependencies of a file.
 
@@ -69,7 +115,9 @@ class OSPInterface:
         Returns:
             List of dependent file paths
         """
-    try:
+        return sorted(self._repo().get_import_graph().imports_of(file_path))
+
+    def search_nodes(self, query: str, node_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Search nodes in the RepoMap using query.
 
@@ -80,4 +128,69 @@ class OSPInterface:
         Returns:
             List of nodes with relevant metadata
         """
-    try:
+        repo = self._repo()
+        query = query.lower()
+        matches = []
+        for path, oid in sorted(repo.get_file_oids().items()):
+            if not path.endswith(".py"):
+                continue
+            # Top-level definitions are parsed once per blob
+            nodes = self._nodes_by_oid.get(oid)
+            if nodes is None:
+                nodes = self._nodes_by_oid[oid] = self._python_nodes(repo.get_file_text(path))
+            for kind, name, line in nodes:
+                if query in name.lower() and (node_type is None or kind == node_type):
+                    matches.append({"type": kind, "name": name, "file": path, "line": line})
+        return matches
+
+    @staticmethod
+    def _python_nodes(content: Optional[str]) -> List[tuple]:
+        if content is None:
+            return []
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return []
+        nodes = []
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                nodes.append(("ClassNode", node.name, node.lineno))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                nodes.append(("FunctionNode", node.name, node.lineno))
+        return nodes
+
+    # asyncio variants. Jac calls await the worker without blocking the event
+    # loop; repo-side work runs on the default executor. Past `timeout`
+    # seconds, asyncio.TimeoutError is raised.
+
+    async def alist_files(self, timeout: Optional[float] = None) -> List[str]:
+        """Async list_files()."""
+        try:
+            files = await self.bridge.acall_walker("repomap_osp", "list_all_files", timeout=timeout)
+            return self._walker_result(files, "list files") or []
+        except JacBridgeError as e:
+            raise OSPInterfaceError(f"Failed to list files: {e}")
+
+    async def alist_functions(self, file_path: str, timeout: Optional[float] = None) -> List[str]:
+        """Async list_functions()."""
+        return await self.bridge.arun(self.list_functions, file_path, timeout=timeout)
+
+    async def arank_files(self, files: Optional[List[str]] = None, context: Optional[str] = None,
+                          timeout: Optional[float] = None) -> Dict[str, float]:
+        """Async rank_files()."""
+        try:
+            result = await self.bridge.acall_walker(
+                "file_analysis", "get_osp_ranking", self._ranking_args(context), timeout=timeout
+            )
+        except JacBridgeError as e:
+            raise OSPInterfaceError(f"Failed to rank files: {e}")
+        return self._scores(result, files)
+
+    async def aget_dependencies(self, file_path: str, timeout: Optional[float] = None) -> List[str]:
+        """Async get_dependencies()."""
+        return await self.bridge.arun(self.get_dependencies, file_path, timeout=timeout)
+
+    async def asearch_nodes(self, query: str, node_type: Optional[str] = None,
+                            timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Async search_nodes()."""
+        return await self.bridge.arun(self.search_nodes, query, node_type, timeout=timeout)
@@ -0,0 +1,220 @@
+"""
+jac_cache.py
+Compiled Jac module cache keyed by source hash and runtime version.
+
+Compiling a .jac module takes about half a second, and the Jac runtime
+recompiles every module in every new process. JacModuleCache keeps each
+module's bytecode on disk under the SHA-256 of its source and a runtime tag
+(jaclang version and Python bytecode tag). A module is therefore compiled
+once per edit, and every later process just unmarshals it. Editing a module
+changes its key, so only that module is recompiled; the stale artifact is
+removed when the new one is written.
+
+CachedJacFinder plugs the cache into the import system, so walker modules
+(and their imports of each other) load through it.
+"""
+
+import hashlib
+import importlib.abc
+import importlib.metadata
+import importlib.util
+import marshal
+import os
+import sys
+
+try:
+    import jaclang
+    from jaclang.runtimelib.machine import JacMachine, JacMachineInterface
+except ImportError:
+    jaclang = None
+
+ARTIFACT_SUFFIX = '.jbc'
+
+
+def runtime_tag():
+    """Compiler and bytecode format the artifacts belong to, e.g. 'jaclang-0.8.10-cpython-312'."""
+    if jaclang is None:
+        version = 'none'
+    else:
+        try:
+            version = importlib.metadata.version('jaclang')
+        except importlib.metadata.PackageNotFoundError:
+            version = getattr(jaclang, '__version__', 'unknown')
+    return f'jaclang-{version}-{sys.implementation.cache_tag}'
+
+
+def compile_module(path, source):
+    """
+    Compile module source to marshalled bytecode.
+
+    .jac files go through the Jac compiler, anything else is compiled as Python.
+
+    Raises:
+        SyntaxError: If the module does not compile
+    """
+    if not path.endswith('.jac'):
+        return marshal.dumps(compile(source, path, 'exec', dont_inherit=True))
+
+    if jaclang is None:
+        raise ImportError('jaclang is not installed')
+    program = JacMachine.program
+    seen_errors = len(program.errors_had)
+    module = program.compile(file_path=path, use_str=source)
+    if module.has_syntax_errors or not module.gen.py_bytecode:
+        errors = '; '.join(str(err) for err in program.errors_had[seen_errors:])
+        raise SyntaxError(f'{path}: {errors or "compilation failed"}')
+    return module.gen.py_bytecode
+
+
+class JacModuleCache:
+    """
+    On-disk cache of compiled modules.
+
+    Artifacts are named <module>-<path hash>.<source hash>.<runtime tag>.jbc
+    and written atomically, so several worker processes can share a cache
+    directory.
+    """
+
+    def __init__(self, cache_dir, tag=None):
+        """
+        Initialize a cache.
+
+        Args:
+            cache_dir: Directory holding the compiled artifacts (created on first write)
+            tag: Runtime tag (default: runtime_tag())
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.tag = tag or runtime_tag()
+        self.compiled = []
+
+    def _prefix(self, path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        location = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:8]
+        return f'{stem}-{location}.'
+
+    def artifact_path(self, path, digest):
+        """Where the artifact for `path` with source hash `digest` lives."""
+        return os.path.join(self.cache_dir, f'{self._prefix(path)}{digest}.{self.tag}{ARTIFACT_SUFFIX}')
+
+    def _artifact_for(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        return data, self.artifact_path(path, hashlib.sha256(data).hexdigest())
+
+    def is_fresh(self, path):
+        """True if an artifact matches the module's current source."""
+        return os.path.exists(self._artifact_for(path)[1])
+
+    def load(self, path):
+        """
+        Code object for a module, compiling it only if no artifact matches
+        its current source.
+        """
+        data, artifact = self._artifact_for(path)
+        try:
+            with open(artifact, 'rb') as f:
+                return marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            # Missing or unreadable: compile it
+            pass
+
+        bytecode = self._compile(path, data)
+        try:
+            self._store(path, artifact, bytecode)
+        except OSError:
+            # Unwritable cache directory: use the module compiled in memory
+            pass
+        return marshal.loads(bytecode)
+
+    def _compile(self, path, data):
+        bytecode = compile_module(path, data.decode('utf-8'))
+        self.compiled.append(path)
+        return bytecode
+
+    def _store(self, path, artifact, bytecode):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{artifact}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(bytecode)
+            os.replace(tmp_path, artifact)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        # Drop artifacts of earlier versions of this module
+        prefix = self._prefix(path)
+        suffix = f'.{self.tag}{ARTIFACT_SUFFIX}'
+        keep = os.path.basename(artifact)
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(suffix) and name != keep:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def warm(self, paths):
+        """
+        Make sure every module has a current artifact.
+
+        Returns:
+            dict: path -> 'cached', 'compiled', or the compile or write error
+        """
+        status = {}
+        for path in paths:
+            try:
+                data, artifact = self._artifact_for(path)
+                if os.path.exists(artifact):
+                    status[path] = 'cached'
+                else:
+                    self._store(path, artifact, self._compile(path, data))
+                    status[path] = 'compiled'
+            except (OSError, SyntaxError, ImportError, UnicodeDecodeError) as err:
+                status[path] = f'{type(err).__name__}: {err}'
+        return status
+
+
+def workspace_modules(workspace):
+    """Paths of the .jac modules directly inside a workspace."""
+    if not os.path.isdir(workspace):
+        return []
+    return sorted(
+        os.path.join(workspace, name) for name in os.listdir(workspace) if name.endswith('.jac')
+    )
+
+
+class _CachedJacLoader(importlib.abc.Loader):
+    def __init__(self, cache):
+        self.cache = cache
+
+    def create_module(self, spec):
+        return None
+
+    def exec_module(self, module):
+        # Same steps as the Jac importer, with the code coming from the cache
+        JacMachineInterface.load_module(module.__name__, module)
+        exec(self.cache.load(module.__spec__.origin), module.__dict__)
+
+
+class CachedJacFinder(importlib.abc.MetaPathFinder):
+    """Import top-level .jac modules from a workspace through a JacModuleCache."""
+
+    def __init__(self, workspace, cache):
+        self.workspace = os.path.abspath(workspace)
+        self.loader = _CachedJacLoader(cache)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if '.' in fullname:
+            return None
+        candidate = os.path.join(self.workspace, fullname + '.jac')
+        if not os.path.isfile(candidate):
+            return None
+        return importlib.util.spec_from_file_location(fullname, candidate, loader=self.loader)
+
+    def install(self):
+        """Put the finder ahead of the Jac importer (needs jaclang)."""
+        if jaclang is None:
+            raise ImportError('jaclang is not installed')
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
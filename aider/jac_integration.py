@@ -6,6 +6,9 @@ Main Jac integration class that bridges Python Aider with Jac OSP/MTP components
 import os
 from typing import Any, Dict, List, Optional
 from .integration import OSPInterface, MTPInterface, JacBridge
+from .jac_worker import DEFAULT_CACHE_DIR
+from .code_compressor import LEVEL_NAMES, compress_to_budget
+from .token_counter import TokenCounter
 
 class JacIntegrationError(Exception):
     """Exception raised for Jac integration errors."""
@@ -17,21 +20,28 @@ class JacIntegration:
     Provides high-level interface for all Jac-based functionality.
     """
 
-    def __init__(self, jac_workspace: Optional[str] = None, cache_dir: Optional[str] = None):
+    def __init__(self, jac_workspace: Optional[str] = None, cache_dir: Optional[str] = None, repo=None):
         """
         Initialize Jac integration.
 
         Args:
             jac_workspace: Path to Jac modules directory
-            cache_dir: Cache directory for Jac operations
+            cache_dir: Cache directory for compiled Jac modules (default: the per-user cache directory)
+            repo: The session's GitRepo, which ranking and validation work on
         """
         self.jac_workspace = jac_workspace or os.path.join(os.path.dirname(__file__), 'jac')
-        self.cache_dir = cache_dir or os.path.join(os.path.dirname(__file__), '..', '.jac_cache')
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
 
-        # Initialize interfaces
-        self.osp = OSPInterface(jac_workspace=self.jac_workspace)
-        self.mtp = MTPInterface(jac_workspace=self.jac_workspace)
-        self.bridge = JacBridge(jac_workspace=self.jac_workspace)
+        # Initialize interfaces; they share one bridge and its Jac workers
+        self.bridge = JacBridge(jac_workspace=self.jac_workspace, cache_dir=self.cache_dir)
+        self.osp = OSPInterface(bridge=self.bridge)
+        self.mtp = MTPInterface(bridge=self.bridge)
+        if repo is not None:
+            self.load_repo(repo)
+
+    def load_repo(self, repo):
+        """Rank, validate and analyze the given GitRepo (the user's project)."""
+        self.bridge.load_repo(repo)
 
     def handle_command(self, command: str) -> Dict[str, Any]:
         """
@@ -43,10 +53,32 @@ class JacIntegration:
         Returns:
             Dict containing command result
         """
-    parts = command.strip().split()
-        """Handle /jac rank command."""
+        parts = command.strip().split()
+        if not parts or parts[0] != "/jac":
+            return {"error": f"Not a Jac command: {command}"}
+        if len(parts) < 2:
+            return {"error": "Usage: /jac rank|plan|validate|optimize|status [args]"}
+
+        handlers = {
+            "rank": self._handle_rank_command,
+            "plan": self._handle_plan_command,
+            "validate": self._handle_validate_command,
+            "optimize": self._handle_optimize_command,
+            "status": self._handle_status_command,
+        }
+        handler = handlers.get(parts[1])
+        if handler is None:
+            return {"error": f"Unknown Jac command: {parts[1]}"}
+        return handler(parts[2:])
+
+    def _handle_rank_command(self, args: List[str]) -> Dict[str, Any]:
+        """Handle /jac rank [files...] [--context words...] command."""
+        files, context = args, None
+        if "--context" in args:
+            split = args.index("--context")
+            files, context = args[:split], " ".join(args[split + 1:]) or None
         try:
-            rankings = self.osp.rank_files()
+            rankings = self.osp.rank_files(files or None, context)
             return {
                 "success": True,
                 "command": "rank",
@@ -85,17 +117,32 @@ class JacIntegration:
             return {"error": f"Validation failed: {str(e)}"}
 
     def _handle_optimize_command(self, args: List[str]) -> Dict[str, Any]:
-        """Handle /jac optimize command."""
+        """Handle /jac optimize <file> <target_tokens> command."""
+        if len(args) != 2 or not args[1].isdigit():
+            return {"error": "Usage: /jac optimize <file> <target_tokens>"}
+
+        file_path, target_tokens = args[0], int(args[1])
         try:
-            optimization_result = self.bridge.execute_script("token_optimizer.jac")
+            with open(file_path, encoding="utf-8") as f:
+                content = f.read()
+            optimization_result = self.optimize_token_usage(content, target_tokens)
             return {
                 "success": True,
                 "command": "optimize",
+                "file": file_path,
                 "result": optimization_result
             }
         except Exception as e:
             return {"error": f"Optimization failed: {str(e)}"}
 
+    def _handle_status_command(self, args: List[str]) -> Dict[str, Any]:
+        """Handle /jac status command."""
+        return {
+            "success": True,
+            "command": "status",
+            "result": self.get_status()
+        }
+
     def get_repo_ranking(self, files: List[str], context: Optional[str] = None) -> Dict[str, float]:
         """
         Get OSP-based ranking of repository files.
@@ -155,10 +202,17 @@ class JacIntegration:
             Dict containing optimized content and metrics
         """
         try:
-            return self.bridge.execute_script("token_optimizer.jac", {
-                "content": content,
-                "target_tokens": target_tokens
-            })
+            counter = TokenCounter()
+            optimized, level = compress_to_budget(content, target_tokens, counter.count)
+            optimized_tokens = counter.count(optimized)
+            return {
+                "optimized_content": optimized,
+                "original_tokens": counter.count(content),
+                "optimized_tokens": optimized_tokens,
+                "target_tokens": target_tokens,
+                "compression_level": LEVEL_NAMES[level],
+                "within_target": optimized_tokens <= target_tokens
+            }
         except Exception as e:
             raise JacIntegrationError(f"Failed to optimize token usage: {str(e)}")
 
@@ -169,16 +223,39 @@ class JacIntegration:
         Returns:
             Dict containing status information
         """
-    try:
+        try:
+            jac_files = sorted(name for name in os.listdir(self.jac_workspace) if name.endswith(".jac"))
+        except OSError:
+            jac_files = []
+        return {
+            "jac_workspace": self.jac_workspace,
+            "cache_dir": self.cache_dir,
+            "jac_files": jac_files,
+            "bridge": self.bridge.test_connection()
+        }
+
+    def close(self):
+        """Stop the Jac worker processes."""
+        self.bridge.close()
+
+
+def process_with_jac(content: str, mode: str = "preprocess", target_tokens: Optional[int] = None) -> str:
     """
     Utility function for processing content with Jac.
     Used by llm.py for integration.
 
     Args:
         content: Content to process
-        operation: Type of operation to perform
+        mode: "preprocess" for prompts, "postprocess" for responses
+        target_tokens: Token budget for preprocessed prompts (None leaves them unchanged)
 
     Returns:
         Processing result
     """
+    if mode not in ("preprocess", "postprocess"):
+        raise JacIntegrationError(f"Unknown Jac processing mode: {mode}")
+    if mode == "postprocess" or target_tokens is None:
+        return content
+
     integration = JacIntegration()
+    return integration.optimize_token_usage(content, target_tokens)["optimized_content"]
@@ -0,0 +1,762 @@
+"""
+jac_worker.py
+Long-lived Jac worker processes speaking a JSON-lines protocol.
+
+Running `jac run` for every walker call pays for interpreter startup and Jac
+compilation each time. A JacWorkerPool instead keeps a few worker processes
+alive with the walker modules already imported. Every request and response
+is one JSON line tagged with a request id. A worker handles one request at a
+time; the pool sends each request to an idle worker and queues the rest, so
+a call that times out only ever takes its own worker down with it.
+
+Requests:
+    {"id": 1, "op": "call", "walker": "planning_walker", "func": "generate_plan", "args": {...}, "repo": "/path"}
+    {"id": 2, "op": "run", "file": "token_optimizer.jac", "args": {...}}
+    {"id": 3, "op": "batch", "calls": [{"walker": ..., "func": ..., "args": {...}}, ...]}
+    {"id": 4, "op": "warm"}
+    {"id": 5, "op": "ping"}
+
+Responses:
+    {"id": 1, "ok": true, "result": ..., "stdout": "..."}
+    {"id": 1, "ok": false, "error": "..."}
+
+A batch's result is a list with one {"ok", "result"} or {"ok", "error"} entry
+per call, in order; the calls run concurrently on threads in the worker.
+A run's args become globals of the file before it executes. With "repo" (a
+git root), each walker instance that defines load_repo(repo) gets that
+repo's GitRepo before the call, so it works on the repo-wide file index,
+import graph and history. The worker opens each repo once and keeps it.
+
+This file is also the worker's entry point:
+
+    python aider/jac_worker.py --workspace aider/jac
+
+The worker itself only needs the standard library (and jaclang for .jac
+modules), so it can run under whichever interpreter has jaclang installed.
+Walker modules that import aider.*, and the repo hook (which opens a
+GitRepo), also need aider's dependencies in that interpreter. Workers load
+.jac modules through the compiled module cache in jac_cache.py. Add `--warm`
+to precompile every workspace module into the cache and exit.
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import importlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import types
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+try:
+    import jaclang
+    from jaclang.runtimelib.machine import JacMachine, JacMachineInterface
+except ImportError:
+    jaclang = None
+
+WORKER_SCRIPT = os.path.abspath(__file__)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(WORKER_SCRIPT))
+
+
+def user_cache_dir():
+    """
+    Per-user compiled module cache: $XDG_CACHE_HOME/aider/jac, else the
+    platform's user cache directory. The install directory may be read-only.
+    """
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        if sys.platform == 'win32':
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+        else:
+            base = os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'aider', 'jac')
+
+
+DEFAULT_CACHE_DIR = user_cache_dir()
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_TIMEOUT = 30.0
+# Threads a worker runs one batch's calls on
+BATCH_THREADS = 8
+# Lines of a worker's stderr kept for error messages
+STDERR_TAIL_LINES = 20
+
+
+class JacWorkerError(Exception):
+    """A worker call failed, timed out, or the worker process died."""
+    pass
+
+
+def default_worker_command():
+    """
+    Interpreter command for workers: $AIDER_JAC_PYTHON, else the interpreter
+    the `jac` executable runs under, else this one.
+    """
+    configured = os.environ.get('AIDER_JAC_PYTHON')
+    if configured:
+        return [configured]
+
+    jac = shutil.which('jac')
+    if jac:
+        try:
+            with open(jac, encoding='utf-8', errors='replace') as f:
+                first_line = f.readline()
+        except OSError:
+            first_line = ''
+        if first_line.startswith('#!') and 'python' in first_line:
+            return first_line[2:].split()
+
+    return [sys.executable]
+
+
+def _jac_cache():
+    """
+    aider.jac_cache, loaded straight from its file when the aider package
+    itself can't be imported (aider/__init__ needs packaging; the cache
+    module only needs the standard library).
+    """
+    try:
+        from aider import jac_cache
+    except ImportError:
+        name = '_aider_jac_cache'
+        jac_cache = sys.modules.get(name)
+        if jac_cache is None:
+            path = os.path.join(os.path.dirname(WORKER_SCRIPT), 'jac_cache.py')
+            spec = importlib.util.spec_from_file_location(name, path)
+            jac_cache = importlib.util.module_from_spec(spec)
+            sys.modules[name] = jac_cache
+            spec.loader.exec_module(jac_cache)
+    return jac_cache
+
+
+def _json_default(value):
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:
+            return list(value)
+    return str(value)
+
+
+# ==========================================
+# Worker side
+# ==========================================
+
+
+class JacWorker:
+    """
+    Executes requests inside a worker process.
+
+    Modules are imported once and kept until their source changes. With a
+    cache directory, .jac modules are compiled at most once per edit across
+    all workers and restarts.
+    """
+
+    def __init__(self, workspace, cache_dir=None):
+        self.workspace = os.path.abspath(workspace)
+        self.modules = {}
+        self.signatures = {}
+        self.repos = {}
+        self._repo_lock = threading.Lock()
+        # Walker modules import aider.* and each other
+        for path in (PROJECT_ROOT, self.workspace):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+
+        jac_cache = _jac_cache()
+        self.cache = jac_cache.JacModuleCache(cache_dir) if cache_dir else None
+        if self.cache is not None and jaclang is not None:
+            jac_cache.CachedJacFinder(self.workspace, self.cache).install()
+
+    @staticmethod
+    def _signature(module):
+        try:
+            stat = os.stat(module.__file__)
+        except (AttributeError, TypeError, OSError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, name):
+        """
+        Import a walker module by name (its entry block output is discarded),
+        re-importing it if its source changed since it was loaded.
+        """
+        module = self.modules.get(name)
+        if module is not None and self._signature(module) != self.signatures[name]:
+            sys.modules.pop(name, None)
+            module = None
+        if module is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                module = importlib.import_module(name)
+            self.modules[name] = module
+            self.signatures[name] = self._signature(module)
+        return module
+
+    def open_repo(self, root):
+        """The GitRepo at `root`, opened on first use and kept for later calls."""
+        with self._repo_lock:
+            repo = self.repos.get(root)
+            if repo is None:
+                # Needs aider's own dependencies, unlike the rest of the worker
+                from aider.io import InputOutput
+                from aider.repo import GitRepo
+
+                repo = GitRepo(InputOutput(pretty=False, yes=True), None, root)
+                self.repos[root] = repo
+            return repo
+
+    def call(self, walker, func, args, repo=None):
+        """
+        Call `func` in module `walker`: a module-level function, or a method
+        of a fresh instance of the first walker/class defining it. With
+        `repo` (a git root), the instance's load_repo hook gets its GitRepo.
+        """
+        module = self.load(walker)
+        target = getattr(module, func, None)
+        if not callable(target):
+            target = None
+            for value in vars(module).values():
+                if (
+                    isinstance(value, type)
+                    and value.__module__ == module.__name__
+                    and callable(getattr(value, func, None))
+                ):
+                    instance = value()
+                    if repo and callable(getattr(instance, 'load_repo', None)):
+                        instance.load_repo(self.open_repo(repo))
+                    target = getattr(instance, func)
+                    break
+        if target is None:
+            raise AttributeError(f'{walker} has no function or walker method {func!r}')
+        return target(**(args or {}))
+
+    def call_entry(self, call, repo=None):
+        """Run one call of a batch, catching its error into the entry."""
+        try:
+            return {'ok': True, 'result': self.call(call['walker'], call['func'], call.get('args'), repo)}
+        except Exception as err:
+            return {'ok': False, 'error': f'{type(err).__name__}: {err}'}
+
+    def batch(self, calls, repo=None):
+        """Run a batch of calls concurrently; one entry per call, in order."""
+        # Import each walker once up front rather than racing in the threads
+        for walker in dict.fromkeys(call.get('walker') for call in calls):
+            try:
+                self.load(walker)
+            except Exception:
+                # Reported by each call that uses it
+                pass
+        if len(calls) <= 1:
+            return [self.call_entry(call, repo) for call in calls]
+        with ThreadPoolExecutor(max_workers=min(len(calls), BATCH_THREADS)) as executor:
+            return list(executor.map(self.call_entry, calls, [repo] * len(calls)))
+
+    def compile(self, path):
+        """Code object for a .jac or .py file."""
+        if self.cache is not None:
+            return self.cache.load(path)
+        if path.endswith('.jac'):
+            if jaclang is None:
+                raise ImportError('jaclang is not installed in the worker interpreter')
+            return JacMachine.program.get_bytecode(full_target=path)
+        with open(path, encoding='utf-8') as f:
+            return compile(f.read(), path, 'exec')
+
+    def run(self, file, args=None):
+        """
+        Execute a file's top level (its `with entry` blocks), like `jac run`.
+        `args` are set as globals of the file before it runs.
+        """
+        path = file if os.path.isabs(file) else os.path.join(os.getcwd(), file)
+        if not os.path.exists(path):
+            path = os.path.join(self.workspace, os.path.basename(file))
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'Jac file {file} not found')
+
+        code = self.compile(path)
+        name = '__jac_run__'
+        module = types.ModuleType(name)
+        module.__file__ = path
+        module.__dict__.update(args or {})
+        # Archetypes look their module up in sys.modules while being defined
+        sys.modules[name] = module
+        if jaclang is not None and path.endswith('.jac'):
+            JacMachineInterface.load_module(name, module)
+        try:
+            exec(code, module.__dict__)
+        finally:
+            sys.modules.pop(name, None)
+        return None
+
+    def warm(self):
+        """Precompile every workspace module into the cache: path -> status."""
+        if self.cache is None:
+            raise ValueError('No cache directory configured')
+        return self.cache.warm(_jac_cache().workspace_modules(self.workspace))
+
+    def handle(self, request):
+        """Execute one request and return its response dict."""
+        response = {'id': request.get('id')}
+        stdout = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                op = request.get('op', 'call')
+                if op == 'call':
+                    result = self.call(request['walker'], request['func'], request.get('args'), request.get('repo'))
+                elif op == 'batch':
+                    result = self.batch(request['calls'], request.get('repo'))
+                elif op == 'run':
+                    result = self.run(request['file'], request.get('args'))
+                elif op == 'warm':
+                    result = self.warm()
+                elif op == 'ping':
+                    result = {'pid': os.getpid(), 'modules': sorted(self.modules)}
+                else:
+                    raise ValueError(f'Unknown op {op!r}')
+            response.update(ok=True, result=result)
+        except Exception as err:
+            response.update(ok=False, error=f'{type(err).__name__}: {err}', traceback=traceback.format_exc())
+        response['stdout'] = stdout.getvalue()
+        return response
+
+    def serve(self, instream, outstream):
+        """Answer JSON-line requests until `instream` closes."""
+        for line in instream:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as err:
+                request = {}
+                response = {'id': None, 'ok': False, 'error': f'Invalid request: {err}'}
+            else:
+                response = self.handle(request)
+            try:
+                data = json.dumps(response, default=_json_default)
+            except (TypeError, ValueError) as err:
+                data = json.dumps({'id': request.get('id'), 'ok': False, 'error': f'Unserializable result: {err}'})
+            outstream.write(data + '\n')
+            outstream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve Jac walker calls as JSON lines on stdin/stdout')
+    parser.add_argument('--workspace', default=os.path.join(PROJECT_ROOT, 'aider', 'jac'))
+    parser.add_argument('--preload', nargs='*', default=[], help='Walker modules to import at startup')
+    parser.add_argument('--cache-dir', help='Compiled module cache directory')
+    parser.add_argument('--warm', action='store_true', help='Precompile all workspace modules and exit')
+    args = parser.parse_args(argv)
+
+    if args.warm:
+        worker = JacWorker(args.workspace, args.cache_dir or DEFAULT_CACHE_DIR)
+        status = worker.warm()
+        for path, state in status.items():
+            print(f'{os.path.relpath(path)}: {state}')
+        return 0 if all(state in ('cached', 'compiled') for state in status.values()) else 1
+
+    # Keep the protocol stream clean: stray prints go to stderr
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    worker = JacWorker(args.workspace, args.cache_dir)
+    for name in args.preload:
+        try:
+            worker.load(name)
+        except Exception as err:
+            print(f'Failed to preload {name}: {err}', file=sys.stderr)
+    worker.serve(sys.stdin, protocol)
+
+
+# ==========================================
+# Client side
+# ==========================================
+
+
+def _resolve(future, response=None, error=None):
+    # The caller may have cancelled the future (async callers do)
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+    except InvalidStateError:
+        pass
+
+
+class _Request:
+    """A request's message, its future, and the worker it was sent to (None while queued)."""
+
+    __slots__ = ('message', 'future', 'worker')
+
+    def __init__(self, message):
+        self.message = message
+        self.future = Future()
+        self.worker = None
+
+
+class _WorkerProcess:
+    """One worker subprocess and the request it is running."""
+
+    def __init__(self, command, cwd, on_idle):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+        )
+        self.current = None
+        self.exited = False
+        self.on_idle = on_idle
+        self.lock = threading.Lock()
+        self.stderr_tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self.stderr_reader = threading.Thread(target=self._read_stderr, daemon=True)
+        self.stderr_reader.start()
+        self.reader = threading.Thread(target=self._read_responses, daemon=True)
+        self.reader.start()
+
+    @property
+    def alive(self):
+        # poll() can't tell while another thread waits on the process; the
+        # reader marks the worker exited when its stdout closes
+        return not self.exited and self.process.poll() is None
+
+    @property
+    def busy(self):
+        return self.current is not None
+
+    def send(self, request):
+        with self.lock:
+            self.current = request
+            request.worker = self
+            try:
+                self.process.stdin.write(json.dumps(request.message, default=_json_default) + '\n')
+                self.process.stdin.flush()
+            except (OSError, ValueError) as err:
+                self.current = None
+                _resolve(request.future, error=JacWorkerError(f'Jac worker is not running: {err}'))
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self.stderr_tail.append(line)
+
+    def _read_responses(self):
+        for line in self.process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self.lock:
+                request = self.current
+                if request is None or request.message['id'] != response.get('id'):
+                    continue
+                self.current = None
+            _resolve(request.future, response)
+            self.on_idle()
+
+        with self.lock:
+            self.exited = True
+            request, self.current = self.current, None
+        if request is not None:
+            _resolve(request.future, error=self.exit_error())
+        self.on_idle()
+
+    def exit_error(self):
+        """JacWorkerError for a dead worker, with the end of its stderr."""
+        self.stderr_reader.join(timeout=1.0)
+        message = 'Jac worker exited'
+        try:
+            message += f' with status {self.process.wait(timeout=1.0)}'
+        except subprocess.TimeoutExpired:
+            pass
+        stderr = ''.join(self.stderr_tail).strip()
+        if stderr:
+            message += f':\n{stderr}'
+        return JacWorkerError(message)
+
+    def close(self, timeout=5.0):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+
+
+class JacWorkerPool:
+    """
+    A pool of persistent Jac workers with multiplexed, id-tagged requests.
+
+    Workers start lazily, up to `size`, and run one request at a time.
+    Requests wait in a queue until a worker is idle. A worker that dies or
+    times out is replaced for the queued requests; a call that times out
+    while still queued is dropped without touching any worker.
+    """
+
+    def __init__(
+        self,
+        workspace,
+        size=DEFAULT_POOL_SIZE,
+        command=None,
+        preload=None,
+        timeout=DEFAULT_TIMEOUT,
+        cache_dir=DEFAULT_CACHE_DIR,
+        repo_root=None,
+    ):
+        """
+        Initialize a pool.
+
+        Args:
+            workspace: Directory containing the walker modules
+            size: Maximum number of worker processes
+            command: Interpreter command for workers (default: default_worker_command())
+            preload: Walker modules to import at worker startup (default: every .jac in workspace)
+            timeout: Default seconds to wait for a call
+            cache_dir: Compiled module cache shared by the workers (None to compile in memory)
+            repo_root: Git root whose GitRepo walkers' load_repo hooks get (None for no repo)
+        """
+        self.workspace = os.path.abspath(workspace)
+        self.size = max(1, size)
+        self.command = list(command) if command else default_worker_command()
+        if preload is None:
+            preload = sorted(
+                name[:-4] for name in os.listdir(self.workspace) if name.endswith('.jac')
+            ) if os.path.isdir(self.workspace) else []
+        self.preload = list(preload)
+        self.timeout = timeout
+        self.cache_dir = os.path.abspath(cache_dir) if cache_dir else None
+        self.repo_root = repo_root
+        self.workers = []
+        self._queue = collections.deque()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _worker_command(self):
+        command = self.command + [WORKER_SCRIPT, '--workspace', self.workspace]
+        if self.cache_dir:
+            command += ['--cache-dir', self.cache_dir]
+        if self.preload:
+            command += ['--preload'] + self.preload
+        return command
+
+    def _dispatch(self):
+        """
+        Send queued requests to idle workers, starting workers up to `size`.
+        A request no worker can be started for fails with the OSError.
+        """
+        with self._lock:
+            self.workers = [worker for worker in self.workers if worker.alive]
+            while self._queue:
+                request = self._queue[0]
+                if request.future.cancelled():
+                    self._queue.popleft()
+                    continue
+                worker = next((worker for worker in self.workers if not worker.busy), None)
+                if worker is None:
+                    if len(self.workers) >= self.size:
+                        break
+                    try:
+                        worker = _WorkerProcess(self._worker_command(), os.getcwd(), self._dispatch)
+                    except OSError as err:
+                        # The worker could not be started (e.g. no such interpreter)
+                        self._queue.popleft()
+                        _resolve(request.future, error=err)
+                        continue
+                    self.workers.append(worker)
+                self._queue.popleft()
+                worker.send(request)
+
+    def submit(self, op, **fields):
+        """
+        Queue a request without waiting.
+
+        Returns:
+            _Request: pass it to wait() or await_response()
+        """
+        if op in ('call', 'batch') and self.repo_root:
+            fields['repo'] = self.repo_root
+        request = _Request(dict(fields, op=op, id=next(self._ids)))
+        with self._lock:
+            self._queue.append(request)
+        self._dispatch()
+        return request
+
+    def _abandon(self, request):
+        """Drop a request the caller stopped waiting for; a worker running it is killed."""
+        request.future.cancel()
+        with self._lock:
+            if request in self._queue:
+                self._queue.remove(request)
+            worker = request.worker
+            stuck = worker is not None and worker.current is request
+        if stuck:
+            # The worker is stuck on this call; it is replaced on dispatch
+            worker.kill()
+
+    def wait(self, request, timeout=None):
+        """
+        Wait for a submitted request; returns its response or raises JacWorkerError
+        (OSError if no worker process could be started for it).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            response = request.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self._abandon(request)
+            raise JacWorkerError(f'Jac call timed out after {timeout}s')
+        if not response.get('ok'):
+            raise JacWorkerError(response.get('error', 'Jac call failed'))
+        return response
+
+    def call(self, walker, func, args=None, timeout=None):
+        """Call a walker function in a warm worker and return its result."""
+        request = self.submit('call', walker=walker, func=func, args=args or {})
+        return self.wait(request, timeout)['result']
+
+    def _submit_batch(self, calls):
+        """Split calls into one contiguous chunk per worker and send them."""
+        chunk_size = -(-len(calls) // min(self.size, len(calls)))
+        sent = []
+        for start in range(0, len(calls), chunk_size):
+            chunk = [
+                {'walker': call['walker'], 'func': call['func'], 'args': call.get('args') or {}}
+                for call in calls[start:start + chunk_size]
+            ]
+            sent.append((self.submit('batch', calls=chunk), len(chunk)))
+        return sent
+
+    def call_many(self, calls, timeout=None):
+        """
+        Run a batch of calls in one round trip per worker.
+
+        The batch is split into contiguous chunks across the pool's workers,
+        and each worker runs its chunk's calls concurrently.
+
+        Args:
+            calls: List of dicts with keys walker, func, args
+            timeout: Seconds to wait for the whole batch (default: the pool's timeout)
+
+        Returns:
+            list: {'ok': True, 'result': ...} or {'ok': False, 'error': ...} per call, in input order
+        """
+        if not calls:
+            return []
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        sent = self._submit_batch(calls)
+
+        results = []
+        for request, count in sent:
+            try:
+                response = self.wait(request, max(0.0, deadline - time.monotonic()))
+                results.extend(response['result'])
+            except (JacWorkerError, OSError) as err:
+                results.extend({'ok': False, 'error': str(err)} for _ in range(count))
+        return results
+
+    def run(self, jac_file, args=None, timeout=None):
+        """Execute a Jac file's entry blocks in a warm worker (`args` as its globals); returns its stdout."""
+        request = self.submit('run', file=jac_file, args=args or {})
+        return self.wait(request, timeout)['stdout']
+
+    def warm(self, timeout=None):
+        """Precompile every workspace module into the cache; returns path -> status."""
+        request = self.submit('warm')
+        return self.wait(request, timeout)['result']
+
+    def ping(self, timeout=None):
+        request = self.submit('ping')
+        return self.wait(request, timeout)['result']
+
+    # asyncio variants: requests are queued the same way, awaiting the
+    # response instead of blocking a thread. On a missed deadline the worker
+    # is replaced and asyncio.TimeoutError raised. Cancelling only abandons
+    # the response; the worker finishes the call and stays in the pool.
+
+    async def await_response(self, request, timeout=None):
+        """
+        Await a submitted request; returns its response or raises JacWorkerError
+        (OSError if no worker process could be started for it).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(request.future), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(request)
+            raise
+        if not response.get('ok'):
+            raise JacWorkerError(response.get('error', 'Jac call failed'))
+        return response
+
+    async def acall(self, walker, func, args=None, timeout=None):
+        """Async call(): await a walker function's result in a warm worker."""
+        request = self.submit('call', walker=walker, func=func, args=args or {})
+        return (await self.await_response(request, timeout))['result']
+
+    async def acall_many(self, calls, timeout=None):
+        """Async call_many(): one entry per call, in order; the deadline covers the whole batch."""
+        if not calls:
+            return []
+        sent = self._submit_batch(calls)
+        responses = await asyncio.gather(
+            *(self.await_response(request, timeout) for request, _ in sent),
+            return_exceptions=True,
+        )
+
+        results = []
+        for response, (_, count) in zip(responses, sent):
+            if isinstance(response, asyncio.TimeoutError):
+                raise response
+            if isinstance(response, BaseException):
+                if not isinstance(response, JacWorkerError):
+                    raise response
+                results.extend({'ok': False, 'error': str(response)} for _ in range(count))
+            else:
+                results.extend(response['result'])
+        return results
+
+    async def arun(self, jac_file, args=None, timeout=None):
+        """Async run(): a Jac file's entry block output."""
+        request = self.submit('run', file=jac_file, args=args or {})
+        return (await self.await_response(request, timeout))['stdout']
+
+    def close(self):
+        with self._lock:
+            workers, self.workers = self.workers, []
+            queued, self._queue = list(self._queue), collections.deque()
+        for request in queued:
+            _resolve(request.future, error=JacWorkerError('Jac worker pool closed'))
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
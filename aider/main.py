@@ -507,7 +507,7 @@ def initialize_genius_mode(args, io, main_model, repo, analytics):
         return None
 
 
-def initialize_jac_integration(args, io, analytics):
+def initialize_jac_integration(args, io, analytics, repo=None):
     """Initialize Jac integration if enabled"""
     if not getattr(args, 'jac_enabled', False):
         return None
@@ -521,23 +521,21 @@ def initialize_jac_integration(args, io, analytics):
             
         jac_config = {
             'jac_path': jac_path,
-            'jac_cache_dir': getattr(args, 'jac_cache_dir', '.jac_cache'),
+            'jac_cache_dir': getattr(args, 'jac_cache_dir', None),
             'jac_auto_compile': getattr(args, 'jac_auto_compile', True),
             'jac_debug': getattr(args, 'jac_debug', False),
         }
         
         jac = JacIntegration(
-            jac_path=jac_config['jac_path'],
+            jac_workspace=jac_config['jac_path'],
             cache_dir=jac_config['jac_cache_dir'],
-            auto_compile=jac_config['jac_auto_compile'],
-            debug=jac_config['jac_debug'],
-            io=io
+            repo=repo,
         )
         
         if getattr(args, 'verbose', False):
             io.tool_output("Jac integration initialized")
             io.tool_output(f"  Jac path: {jac_config['jac_path']}")
-            io.tool_output(f"  Cache dir: {jac_config['jac_cache_dir']}")
+            io.tool_output(f"  Cache dir: {jac.cache_dir}")
             io.tool_output(f"  Auto compile: {jac_config['jac_auto_compile']}")
             io.tool_output(f"  Debug mode: {jac_config['jac_debug']}")
             
@@ -966,7 +964,7 @@ def main(argv=None, input=None, output=None, force_git_root=None, return_coder=F
 
     # Initialize new features
     genius_mode = initialize_genius_mode(args, io, main_model, repo, analytics)
-    jac_integration = initialize_jac_integration(args, io, analytics)
+    jac_integration = initialize_jac_integration(args, io, analytics, repo)
     sendchat_manager = initialize_sendchat_manager(args, io, main_model, analytics)
     llm_manager = initialize_llm_manager(args, main_model, io, analytics)
 
@@ -0,0 +1,113 @@
+"""
+map_selection.py
+Token-budgeted selection of files for the repo map.
+
+Each candidate file can be shown in full, shown as a summary, or left out.
+Choosing among those under a single token budget is a multiple-choice
+knapsack. Options are taken greedily by value per token along each file's
+convex hull (summary first, then the upgrade to full), which is the
+LP-optimal order. A second pass then spends leftover budget on summaries of
+files whose full text did not fit.
+"""
+
+FULL = 'full'
+SUMMARY = 'summary'
+
+# Value of a file's summary relative to its full text
+SUMMARY_VALUE = 0.4
+
+# Files below this many tokens are only offered in full
+SUMMARY_MIN_TOKENS = 512
+
+# Summary token counts share the token cache under "<tokenizer id>#summary"
+SUMMARY_TOKENIZER_SUFFIX = '#summary'
+
+# Default ranking: bonus for structural importance (personalized PageRank over
+# the import graph, seeded by the chat files and scaled so the top file gets the
+# full weight) and for files with uncommitted changes
+PAGERANK_WEIGHT = 2.0
+DIRTY_WEIGHT = 0.5
+
+
+class FileCost:
+    """Ranking score and token costs of one candidate file."""
+
+    __slots__ = ('path', 'score', 'tokens', 'summary_tokens')
+
+    def __init__(self, path, score, tokens, summary_tokens=None):
+        """
+        Initialize a candidate.
+
+        Args:
+            path: Repo-relative file path
+            score: Ranking value of including the full file (> 0)
+            tokens: Token cost of the full file, or None if it may only be summarized
+            summary_tokens: Token cost of the summary, or None if there is none
+        """
+        self.path = path
+        self.score = score
+        self.tokens = tokens
+        self.summary_tokens = summary_tokens
+
+
+def _density(value, cost):
+    return value / max(cost, 1)
+
+
+def select_files(candidates, budget, summary_value=SUMMARY_VALUE):
+    """
+    Pick files and representations that fit within `budget` tokens.
+
+    Args:
+        candidates: Iterable of FileCost
+        budget: Total token budget
+        summary_value: Value of a summary as a fraction of the full file
+
+    Returns:
+        tuple: ({path: FULL or SUMMARY}, tokens used)
+    """
+    # Steps are (density, path, level, extra tokens, level required beforehand)
+    steps = []
+    summary_fallbacks = []
+    for cand in candidates:
+        has_summary = cand.summary_tokens is not None and (
+            cand.tokens is None or cand.summary_tokens < cand.tokens
+        )
+        summary_gain = cand.score * summary_value
+
+        if cand.tokens is None:
+            if has_summary:
+                density = _density(summary_gain, cand.summary_tokens)
+                steps.append((density, cand.path, SUMMARY, cand.summary_tokens, None))
+            continue
+
+        if has_summary:
+            summary_density = _density(summary_gain, cand.summary_tokens)
+            upgrade_cost = cand.tokens - cand.summary_tokens
+            upgrade_density = _density(cand.score - summary_gain, upgrade_cost)
+            if summary_density >= upgrade_density:
+                # Convex: take the summary first and upgrade it to full later
+                steps.append((summary_density, cand.path, SUMMARY, cand.summary_tokens, None))
+                steps.append((upgrade_density, cand.path, FULL, upgrade_cost, SUMMARY))
+                continue
+            summary_fallbacks.append((summary_density, cand.path, cand.summary_tokens))
+
+        steps.append((_density(cand.score, cand.tokens), cand.path, FULL, cand.tokens, None))
+
+    steps.sort(key=lambda step: (-step[0], step[1]))
+
+    chosen = {}
+    used = 0
+    for _, path, level, cost, requires in steps:
+        if chosen.get(path) != requires or used + cost > budget:
+            continue
+        chosen[path] = level
+        used += cost
+
+    summary_fallbacks.sort(key=lambda item: (-item[0], item[1]))
+    for _, path, cost in summary_fallbacks:
+        if path not in chosen and used + cost <= budget:
+            chosen[path] = SUMMARY
+            used += cost
+
+    return chosen, used
@@ -1,8 +1,11 @@
+import codecs
 import contextlib
 import os
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path, PurePosixPath
 import re
+import threading
 
 try:
     import git
@@ -17,11 +20,21 @@ except ImportError:
     git = None
     ANY_GIT_ERROR = []
 
-import pathspec
-
 from aider import prompts, utils
 
+from . import map_selection
 from .dump import dump  # noqa: F401
+from .ignore_matcher import OUTSIDE_REPO, IgnoreMatcher
+from .import_graph import ImportGraph, parse_import_specs
+from .repo_index import (
+    RepoIndex,
+    SYMBOL_RE,
+    RepoIndexError,
+    extract_symbols,
+    git_blob_oid_for_file,
+)
+from .repo_tree import RepoTree
+from .token_counter import TokenCounter
 from .waiting import WaitingSpinner
 
 ANY_GIT_ERROR += [
@@ -36,6 +49,27 @@ ANY_GIT_ERROR += [
 ]
 ANY_GIT_ERROR = tuple(ANY_GIT_ERROR)
 
+# Large-file summaries read at most this much from each end of the file
+SUMMARY_BLOCK_SIZE = 64 * 1024
+SUMMARY_MAX_BYTES = 256 * 1024
+SUMMARY_LINE_LIMIT = 4096
+# Outlines scan at most this much of the omitted middle, and only for source files
+SUMMARY_OUTLINE_BYTES = 4 * 1024 * 1024
+OUTLINE_EXTENSIONS = frozenset({
+    '.py', '.pyi', '.jac', '.js', '.jsx', '.mjs', '.ts', '.tsx', '.go', '.rs', '.java',
+    '.kt', '.scala', '.swift', '.c', '.h', '.cc', '.cpp', '.hpp', '.cs', '.php', '.rb',
+})
+SYMBOL_BYTES_RE = re.compile(SYMBOL_RE.pattern.encode(), re.MULTILINE)
+
+# Larger files only ever appear in the map as summaries
+MAX_CONTENT_BYTES = 1024 * 1024
+# Token counting streams files in chunks of about this size, and sends
+# chunks to the tokenizer in batches of up to TOKEN_BATCH_BYTES
+TOKEN_CHUNK_SIZE = 1024 * 1024
+TOKEN_BATCH_BYTES = 8 * 1024 * 1024
+# Like git, a NUL byte this close to the start marks a file as binary
+BINARY_SNIFF_BYTES = 8000
+
 
 @contextlib.contextmanager
 def set_git_env(var_name, value, original_value):
@@ -50,6 +84,57 @@ def set_git_env(var_name, value, original_value):
             del os.environ[var_name]
 
 
+class RepoStatus:
+    """Point-in-time view of which paths are tracked, staged or modified."""
+
+    def __init__(self, tracked, staged, unstaged):
+        self.tracked = frozenset(tracked)
+        self.staged = frozenset(staged)
+        self.unstaged = frozenset(unstaged)
+        self.dirty = self.staged | self.unstaged
+        self._normalize = None
+
+    @classmethod
+    def from_porcelain(cls, output, tracked, normalize=None):
+        """Parse `git status --porcelain -z` output."""
+        staged = set()
+        unstaged = set()
+
+        entries = output.split("\0")
+        i = 0
+        while i < len(entries):
+            entry = entries[i]
+            i += 1
+            if len(entry) < 4:
+                continue
+
+            index_status, worktree_status, path = entry[0], entry[1], entry[3:]
+            if index_status in "RC":
+                # Renames and copies are followed by the original path
+                i += 1
+            if normalize:
+                path = normalize(path)
+
+            if index_status not in " ?!":
+                staged.add(path)
+            if worktree_status not in " ?!":
+                unstaged.add(path)
+
+        status = cls(tracked, staged, unstaged)
+        status._normalize = normalize
+        return status
+
+    def is_dirty(self, path=None):
+        """Match GitRepo.is_dirty: untracked paths count as dirty."""
+        if not path:
+            return bool(self.dirty)
+        if self._normalize:
+            path = self._normalize(path)
+        if path not in self.tracked:
+            return True
+        return path in self.dirty
+
+
 class GitRepo:
     repo = None
     aider_ignore_file = None
@@ -57,7 +142,6 @@ class GitRepo:
     aider_ignore_ts = 0
     aider_ignore_last_check = 0
     subtree_only = False
-    ignore_file_cache = {}
     git_repo_error = None
 
     def __init__(
@@ -80,12 +164,20 @@ class GitRepo:
         self.models = models
 
         self.normalized_path = {}
-        self.tree_files = {}
+        self.index_entries = None
+        self.tracked_files = frozenset()
+        self.tracked_files_key = None
 
         # Repo map caches
-        self.file_metadata_cache = {}
-        self.repo_structure_cache = None
-        self.repo_structure_cache_time = 0
+        self.repo_tree = None
+        self.import_graph = ImportGraph()
+        self.token_counter = None
+        self.repo_index = None
+        self.repo_index_error = None
+        self._repo_index_lock = threading.Lock()
+        self._status_snapshot = None
+        self.map_selection_cache = None
+        self.file_history = None
 
         self.attribute_author = attribute_author
         self.attribute_committer = attribute_committer
@@ -95,7 +187,8 @@ class GitRepo:
         self.commit_prompt = commit_prompt
         self.subtree_only = subtree_only
         self.git_commit_verify = git_commit_verify
-        self.ignore_file_cache = {}
+        self.ignore_matcher = IgnoreMatcher()
+        self.ignore_matcher_cwd = None
 
         if git_dname:
             check_fnames = [git_dname]
@@ -136,7 +229,15 @@ class GitRepo:
 
     # ========== REPO MAP METHODS ==========
 
-    def get_repo_map(self, current_files=None, include_content=True, max_tokens_per_file=None, extensions=None):
+    def get_repo_map(
+        self,
+        current_files=None,
+        include_content=True,
+        max_tokens_per_file=None,
+        extensions=None,
+        map_tokens=None,
+        ranks=None,
+    ):
         """
         Get structured repository map for LLM/editor integration.
         
@@ -145,6 +246,8 @@ class GitRepo:
             include_content: Whether to include file content or just metadata
             max_tokens_per_file: Token limit per file for LLM usage
             extensions: List of file extensions to filter by (e.g., ['.py', '.js'])
+            map_tokens: Token budget for all of 'other_files' (see select_map_files)
+            ranks: Optional {path: score} overriding the default file ranking
         
         Returns:
             dict: {
@@ -154,18 +257,37 @@ class GitRepo:
                 'metadata': {...}        # Repo metadata
             }
         """
+        with self.status_snapshot():
+            return self._get_repo_map(
+                current_files, include_content, max_tokens_per_file, extensions, map_tokens, ranks
+            )
+
+    def _get_repo_map(
+        self, current_files, include_content, max_tokens_per_file, extensions, map_tokens, ranks
+    ):
         current_files = current_files or []
-        all_files = self.get_tracked_files()
-        
-        if extensions:
-            all_files = [f for f in all_files if any(f.endswith(ext) for ext in extensions)]
-        
+        all_files = self._filter_map_files(extensions)
+
         current_file_set = set(self.normalize_path(f) for f in current_files)
         other_files = [f for f in all_files if f not in current_file_set]
-        
+        candidate_count = len(other_files)
+
+        summarize = None
+        selection = None
+        if include_content and map_tokens is not None:
+            selection = self.select_map_files(
+                other_files, current_files, map_tokens, max_tokens_per_file, ranks
+            )
+            other_files = [f for f in other_files if f in selection['files']]
+            summarize = {
+                f for f, level in selection['files'].items() if level == map_selection.SUMMARY
+            }
+
         repo_map = {
             'current_files': self._build_file_map(current_files, include_content, max_tokens_per_file),
-            'other_files': self._build_file_map(other_files, include_content, max_tokens_per_file),
+            'other_files': self._build_file_map(
+                other_files, include_content, max_tokens_per_file, summarize
+            ),
             'structure': self.get_repo_structure(),
             'metadata': {
                 'root': self.root,
@@ -175,200 +297,1077 @@ class GitRepo:
                 'dirty_files': self.get_dirty_files()
             }
         }
+
+        if selection is not None:
+            repo_map['metadata'].update({
+                'map_tokens': map_tokens,
+                'map_tokens_used': selection['tokens'],
+                'omitted_count': candidate_count - len(other_files),
+            })
         
         return repo_map
 
-    def _build_file_map(self, file_list, include_content=True, max_tokens_per_file=None):
-        """Build file map with content and metadata."""
-        file_map = {}
-        
-        for filepath in file_list:
-            try:
-                abs_path = self.abs_root_path(filepath)
-                if not abs_path.exists():
+    def select_map_files(
+        self, files, current_files=None, map_tokens=1024, max_tokens_per_file=None, ranks=None
+    ):
+        """
+        Choose which files fit in the repo map, and at what detail, under a token budget.
+
+        Files are ranked (personalized PageRank over the import graph, seeded by
+        the current files, plus a bonus for dirty files), costed with cached full and summary token
+        counts, and selected by value per token. Files above
+        `max_tokens_per_file` may only appear as summaries. The last result is
+        kept, so a turn with the same blobs, chat files and budget reuses it;
+        when only the chat files change, costs come from the caches and just
+        the ranking and the greedy pass are redone.
+
+        Args:
+            files: Candidate paths relative to the repo root
+            current_files: Files in the chat, which steer the ranking
+            map_tokens: Total token budget
+            max_tokens_per_file: Files above this many tokens are summary-only
+            ranks: Optional {path: score} overriding the default ranking
+
+        Returns:
+            dict: {'files': {path: 'full' or 'summary'}, 'tokens': tokens used}
+        """
+        current_files = [self.normalize_path(f) for f in current_files or []]
+
+        with self.status_snapshot() as snapshot:
+            blob_oids = self.get_blob_oids()
+            pairs = []
+            for filepath in files:
+                try:
+                    oid = self._file_oid(filepath, snapshot, blob_oids)
+                except (OSError, ValueError):
                     continue
-                
-                file_info = {
-                    'path': filepath,
-                    'abs_path': str(abs_path),
-                    'size': abs_path.stat().st_size,
-                    'modified': abs_path.stat().st_mtime,
-                    'extension': abs_path.suffix,
-                    'is_dirty': self.is_dirty(filepath)
-                }
-                
-                if include_content:
-                    if max_tokens_per_file:
-                        token_count = self.estimate_file_tokens(filepath)
-                        if token_count > max_tokens_per_file:
-                            file_info['content'] = self.get_file_summary(filepath)
-                            file_info['is_summary'] = True
-                            file_info['full_token_count'] = token_count
-                        else:
-                            file_info['content'] = self.get_file_content_safe(filepath)
-                            file_info['is_summary'] = False
-                    else:
-                        file_info['content'] = self.get_file_content_safe(filepath)
-                        file_info['is_summary'] = False
-                    
-                    file_info['token_count'] = self.estimate_file_tokens(filepath)
-                
-                file_map[filepath] = file_info
-                
-            except (OSError, ValueError) as e:
-                self.io.tool_warning(f"Error processing file {filepath}: {e}")
+                if oid:
+                    pairs.append((filepath, oid))
+
+            counter = self.get_token_counter()
+            key = (
+                frozenset(pairs),
+                frozenset(current_files),
+                map_tokens,
+                max_tokens_per_file,
+                counter.tokenizer_id,
+                tuple(sorted(ranks.items())) if ranks else None,
+            )
+            if self.map_selection_cache is not None and self.map_selection_cache[0] == key:
+                return self.map_selection_cache[1]
+
+            token_counts = self._count_blob_tokens(pairs)
+            needs_summary = []
+            for filepath, oid in pairs:
+                tokens = token_counts.get(oid, 0)
+                if tokens > map_selection.SUMMARY_MIN_TOKENS or (
+                    max_tokens_per_file and tokens > max_tokens_per_file
+                ):
+                    needs_summary.append((filepath, oid))
+            summary_counts = self._count_summary_tokens(needs_summary)
+
+            if ranks is None:
+                ranks = self._rank_map_files([f for f, _ in pairs], current_files, snapshot)
+
+        candidates = []
+        for filepath, oid in pairs:
+            tokens = token_counts.get(oid, 0)
+            if max_tokens_per_file and tokens > max_tokens_per_file:
+                tokens = None
+            candidates.append(map_selection.FileCost(
+                filepath, ranks.get(filepath, 1.0), tokens, summary_counts.get(oid)
+            ))
+
+        chosen, used = map_selection.select_files(candidates, map_tokens)
+        selection = {'files': chosen, 'tokens': used}
+        self.map_selection_cache = (key, selection)
+        self._flush_repo_index()
+        return selection
+
+    def _rank_map_files(self, files, current_files, snapshot):
+        """Default map ranking: PageRank over imports seeded by the chat files, plus dirtiness."""
+        ranks = {filepath: 1.0 for filepath in files}
+
+        graph = self.get_import_graph()
+        seeds = [f.replace(os.sep, "/") for f in current_files if f.endswith(".py")]
+        structure = graph.pagerank(seeds)
+        if structure:
+            top = max(structure.values())
+            for path, score in structure.items():
+                path = self.normalize_path(path)
+                if path in ranks and top > 0:
+                    ranks[path] += map_selection.PAGERANK_WEIGHT * score / top
+
+        for filepath in snapshot.dirty:
+            if filepath in ranks:
+                ranks[filepath] += map_selection.DIRTY_WEIGHT
+        return ranks
+
+    def _count_summary_tokens(self, pairs):
+        """Return {oid: summary token count} for (filepath, oid) pairs, cached like file counts."""
+        if not pairs:
+            return {}
+
+        counter = self.get_token_counter()
+        tokenizer_id = counter.tokenizer_id + map_selection.SUMMARY_TOKENIZER_SUFFIX
+        counts = {}
+        repo_index = self.get_repo_index()
+        if repo_index:
+            try:
+                counts = repo_index.get_token_counts((oid for _, oid in pairs), tokenizer_id)
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+                repo_index = None
+
+        missing = {}
+        for filepath, oid in pairs:
+            if oid in counts or oid in missing:
                 continue
-        
+            record = self._get_file_record(filepath, oid)
+            missing[oid] = self._get_indexed_summary(filepath, oid, record)
+
+        if missing:
+            oids = list(missing)
+            fresh = dict(zip(oids, counter.count_batch(missing[oid] for oid in oids)))
+            counts.update(fresh)
+            if repo_index:
+                try:
+                    repo_index.put_token_counts(fresh, tokenizer_id)
+                except RepoIndexError as err:
+                    self._disable_repo_index(err)
+        return counts
+
+    def _filter_map_files(self, extensions=None):
+        all_files = sorted(self.get_status_snapshot().tracked)
+        if extensions:
+            all_files = [f for f in all_files if any(f.endswith(ext) for ext in extensions)]
+        return all_files
+
+    def iter_repo_map(
+        self,
+        current_files=None,
+        include_content=True,
+        max_tokens_per_file=None,
+        extensions=None,
+        token_budget=None,
+        max_workers=8,
+    ):
+        """
+        Stream repo map entries as they are built.
+
+        Files are read, decoded and tokenized on a bounded thread pool, so slow
+        file systems overlap their I/O. Current files are scheduled first.
+        Entries are yielded in completion order, each with an extra
+        'is_current' flag.
+
+        Args:
+            current_files: List of files being actively edited (prioritized)
+            include_content: Whether to include file content or just metadata
+            max_tokens_per_file: Token limit per file for LLM usage
+            extensions: List of file extensions to filter by (e.g., ['.py', '.js'])
+            token_budget: Stop once the next entry would exceed this many tokens
+            max_workers: Size of the thread pool
+
+        Yields:
+            dict: A file entry, shaped like the values of get_repo_map()'s file maps
+        """
+        current_files = list(current_files or [])
+        snapshot = self.get_status_snapshot()
+        blob_oids = self.get_blob_oids()
+        # Open shared state before the pool threads start using it
+        self.get_repo_index()
+        if include_content:
+            self.get_token_counter()
+
+        current_file_set = set(self.normalize_path(f) for f in current_files)
+        work = [(f, True) for f in current_files]
+        work += [
+            (f, False) for f in self._filter_map_files(extensions) if f not in current_file_set
+        ]
+        work = iter(work)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = {}
+
+        def submit_next():
+            for filepath, is_current in work:
+                future = executor.submit(
+                    self._build_file_entry,
+                    filepath,
+                    snapshot,
+                    blob_oids,
+                    include_content,
+                    max_tokens_per_file,
+                )
+                pending[future] = is_current
+                return
+
+        used_tokens = 0
+        try:
+            # Keep the queue bounded so huge repos don't materialize every future
+            for _ in range(max_workers * 2):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    is_current = pending.pop(future)
+                    submit_next()
+
+                    file_info = future.result()
+                    if file_info is None:
+                        continue
+
+                    if token_budget is not None:
+                        tokens = file_info.get('token_count', 0)
+                        if used_tokens + tokens > token_budget:
+                            return
+                        used_tokens += tokens
+
+                    file_info['is_current'] = is_current
+                    yield file_info
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self._flush_repo_index()
+
+    def _build_file_map(
+        self, file_list, include_content=True, max_tokens_per_file=None, summarize=None
+    ):
+        """Build file map with content and metadata; paths in `summarize` get summaries."""
+        with self.status_snapshot() as snapshot:
+            blob_oids = self.get_blob_oids()
+            token_counts = None
+            if include_content:
+                # Tokenize every uncached blob in one batch
+                pairs = []
+                for filepath in file_list:
+                    try:
+                        oid = self._file_oid(filepath, snapshot, blob_oids)
+                    except (OSError, ValueError):
+                        continue
+                    if oid:
+                        pairs.append((filepath, oid))
+                token_counts = self._count_blob_tokens(pairs)
+
+            file_map = {}
+            for filepath in file_list:
+                file_info = self._build_file_entry(
+                    filepath,
+                    snapshot,
+                    blob_oids,
+                    include_content,
+                    max_tokens_per_file,
+                    token_counts,
+                    force_summary=bool(summarize) and filepath in summarize,
+                )
+                if file_info is not None:
+                    file_map[filepath] = file_info
+
+        self._flush_repo_index()
         return file_map
 
-    def get_repo_structure(self):
-        """Get cached repository directory structure."""
-        current_time = time.time()
-        if (self.repo_structure_cache and 
-            current_time - self.repo_structure_cache_time < 30):  # Cache for 30 seconds
-            return self.repo_structure_cache
-        
-        structure = {}
-        all_files = self.get_tracked_files()
-        
-        for filepath in all_files:
-            parts = Path(filepath).parts
-            current_level = structure
-            
-            # Build nested structure
-            for part in parts[:-1]:  # All but the filename
-                if part not in current_level:
-                    current_level[part] = {'type': 'directory', 'children': {}}
-                current_level = current_level[part]['children']
-            
-            # Add the file
-            filename = parts[-1] if parts else filepath
-            current_level[filename] = {
-                'type': 'file',
+    def _build_file_entry(
+        self,
+        filepath,
+        snapshot,
+        blob_oids,
+        include_content,
+        max_tokens_per_file,
+        token_counts=None,
+        force_summary=False,
+    ):
+        """Build one file map entry; returns None for missing or unreadable files."""
+        try:
+            abs_path = Path(self.abs_root_path(filepath))
+            if not abs_path.exists():
+                return None
+
+            stat = abs_path.stat()
+            oid = self._file_oid(filepath, snapshot, blob_oids)
+            record = self._get_file_record(filepath, oid)
+
+            file_info = {
                 'path': filepath,
-                'extension': Path(filepath).suffix
+                'abs_path': str(abs_path),
+                'size': stat.st_size,
+                'modified': stat.st_mtime,
+                'extension': abs_path.suffix,
+                'is_dirty': snapshot.is_dirty(filepath),
+                'symbols': record['symbols'],
             }
-        
-        self.repo_structure_cache = structure
-        self.repo_structure_cache_time = current_time
-        return structure
 
-    def get_file_content_safe(self, filepath, max_size=1024*1024):  # 1MB default limit
-        """Safely read file content with error handling."""
+            if include_content:
+                if token_counts is None or oid not in token_counts:
+                    token_counts = self._count_blob_tokens([(filepath, oid)])
+                token_count = token_counts.get(oid, 0)
+                if (
+                    force_summary
+                    or (max_tokens_per_file and token_count > max_tokens_per_file)
+                    or stat.st_size > MAX_CONTENT_BYTES
+                ):
+                    file_info['content'] = self._get_indexed_summary(filepath, oid, record)
+                    file_info['is_summary'] = True
+                    file_info['full_token_count'] = token_count
+                else:
+                    file_info['content'] = self.get_file_content_safe(filepath)
+                    file_info['is_summary'] = False
+
+                file_info['token_count'] = token_count
+
+            return file_info
+
+        except (OSError, ValueError) as e:
+            self.io.tool_warning(f"Error processing file {filepath}: {e}")
+            return None
+
+    def _file_oid(self, filepath, snapshot, blob_oids):
+        """Blob OID of a file's current content: from the index if clean, else hashed."""
+        rel_path = self.normalize_path(filepath)
+        if rel_path not in snapshot.dirty:
+            oid = blob_oids.get(rel_path)
+            if oid:
+                return oid
+        abs_path = Path(self.abs_root_path(filepath))
+        if not abs_path.is_file():
+            return None
+        return git_blob_oid_for_file(abs_path)
+
+    def get_file_oids(self, filepaths=None):
+        """
+        Map files to the blob OIDs of their current content.
+
+        Clean files take their OID from the cached git index listing; only
+        dirty files are hashed.
+
+        Args:
+            filepaths: Paths relative to the repo root (default: all tracked files)
+
+        Returns:
+            dict: filepath -> blob OID (missing files are omitted)
+        """
+        with self.status_snapshot() as snapshot:
+            if filepaths is None:
+                filepaths = sorted(snapshot.tracked)
+            blob_oids = self.get_blob_oids()
+            file_oids = {}
+            for filepath in filepaths:
+                try:
+                    oid = self._file_oid(filepath, snapshot, blob_oids)
+                except (OSError, ValueError):
+                    continue
+                if oid:
+                    file_oids[filepath] = oid
+        return file_oids
+
+    def set_token_model(self, model):
+        """Count file tokens with `model`'s tokenizer from now on."""
+        self.token_counter = TokenCounter(model)
+
+    def get_token_counter(self):
+        if self.token_counter is None:
+            model = self.models[0] if self.models else None
+            self.token_counter = TokenCounter(model)
+        return self.token_counter
+
+    def count_file_tokens(self, filepaths):
+        """
+        Count tokens for many files with the active model's tokenizer.
+
+        Counts are cached in the repo index by (blob OID, tokenizer id), so a
+        file is only re-tokenized when its content or the tokenizer changes.
+        All uncached files are tokenized in a single batch.
+
+        Args:
+            filepaths: Iterable of paths relative to the repo root
+
+        Returns:
+            dict: filepath -> token count (missing files are omitted)
+        """
+        with self.status_snapshot() as snapshot:
+            blob_oids = self.get_blob_oids()
+            pairs = []
+            for filepath in filepaths:
+                try:
+                    oid = self._file_oid(filepath, snapshot, blob_oids)
+                except (OSError, ValueError):
+                    continue
+                if oid:
+                    pairs.append((filepath, oid))
+
+        counts = self._count_blob_tokens(pairs)
+        return {filepath: counts.get(oid, 0) for filepath, oid in pairs}
+
+    def _count_blob_tokens(self, pairs):
+        """Return {oid: token count} for (filepath, oid) pairs, tokenizing cache misses."""
+        counter = self.get_token_counter()
+        counts = {}
+        repo_index = self.get_repo_index()
+        if repo_index:
+            try:
+                counts = repo_index.get_token_counts(
+                    (oid for _, oid in pairs), counter.tokenizer_id
+                )
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+                repo_index = None
+
+        missing = {}
+        for filepath, oid in pairs:
+            if oid not in counts and oid not in missing:
+                missing[oid] = filepath
+
+        if missing:
+            fresh = self._tokenize_files(missing, counter)
+            counts.update(fresh)
+            if repo_index:
+                try:
+                    repo_index.put_token_counts(fresh, counter.tokenizer_id)
+                except RepoIndexError as err:
+                    self._disable_repo_index(err)
+        return counts
+
+    def _tokenize_files(self, files, counter):
+        """
+        Count tokens for {oid: filepath} from the files' raw content.
+
+        Files are streamed in newline-aligned chunks, and chunks from many
+        files share each tokenizer batch, so memory stays bounded however
+        large the files are. Binary and unreadable files count as 0.
+        """
+        counts = dict.fromkeys(files, 0)
+        batch = []
+        batch_bytes = 0
+        for oid, filepath in files.items():
+            for chunk in self._iter_text_chunks(filepath):
+                batch.append((oid, chunk))
+                batch_bytes += len(chunk)
+                if batch_bytes >= TOKEN_BATCH_BYTES:
+                    self._count_chunk_batch(batch, counter, counts)
+                    batch = []
+                    batch_bytes = 0
+        self._count_chunk_batch(batch, counter, counts)
+        return counts
+
+    @staticmethod
+    def _count_chunk_batch(batch, counter, counts):
+        if not batch:
+            return
+        tokens = counter.count_batch(chunk for _, chunk in batch)
+        for (oid, _), count in zip(batch, tokens):
+            counts[oid] += count
+
+    def _iter_text_chunks(self, filepath):
+        """
+        Yield a file's text in chunks of about TOKEN_CHUNK_SIZE, split after a newline.
+
+        Yields nothing for binary files (a NUL byte in the first
+        BINARY_SNIFF_BYTES) or unreadable ones. Invalid UTF-8 is replaced
+        rather than failing the file.
+        """
         try:
-            abs_path = self.abs_root_path(filepath)
-            if abs_path.stat().st_size > max_size:
-                return self.get_file_summary(filepath)
-            
-            # Try to read as text
+            f = open(self.abs_root_path(filepath), 'rb')
+        except OSError:
+            return
+
+        with f:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            carry = b''
+            first = True
+            while True:
+                try:
+                    block = f.read(TOKEN_CHUNK_SIZE)
+                except OSError:
+                    return
+                if first:
+                    first = False
+                    if b'\0' in block[:BINARY_SNIFF_BYTES]:
+                        return
+                if not block:
+                    break
+
+                data = carry + block
+                # Cut after the last newline so no token straddles two chunks;
+                # only a run of 4 chunks without one is cut mid-line
+                cut = data.rfind(b'\n') + 1
+                if cut == 0 and len(data) < 4 * TOKEN_CHUNK_SIZE:
+                    carry = data
+                    continue
+                if cut == 0:
+                    cut = len(data)
+                carry = data[cut:]
+                yield decoder.decode(data[:cut])
+
+            text = decoder.decode(carry, final=True)
+            if text:
+                yield text
+
+    def _disable_repo_index(self, err):
+        self.repo_index_error = err
+        self.repo_index = None
+        self.io.tool_warning(f"Repo index disabled: {err}")
+
+    def get_repo_index(self):
+        """Open the persistent blob-keyed repo index under .aider/, if possible."""
+        with self._repo_index_lock:
+            if self.repo_index is None and self.repo_index_error is None:
+                try:
+                    self.repo_index = RepoIndex(self.root)
+                except RepoIndexError as err:
+                    self.repo_index_error = err
+                    self.io.tool_warning(f"Repo index disabled: {err}")
+            return self.repo_index
+
+    def _flush_repo_index(self):
+        if not self.repo_index:
+            return
+        try:
+            self.repo_index.flush()
+        except RepoIndexError as err:
+            self._disable_repo_index(err)
+
+    def get_blob_oids(self):
+        """
+        Map each path in the git index to its blob OID.
+
+        Shares the cached `git ls-files -s -z` listing with get_tracked_file_set().
+        The OIDs describe the staged content, so callers must treat dirty paths
+        as unknown.
+        """
+        if not self.repo:
+            return {}
+
+        entries = self._get_index_entries()
+        if entries is None:
+            return {}
+        return dict(entries[1])
+
+    def _get_file_record(self, filepath, oid):
+        """Return size/summary/symbols for a blob, computing and indexing it on a miss."""
+        repo_index = self.get_repo_index()
+        if repo_index:
             try:
-                with open(abs_path, 'r', encoding='utf-8') as f:
+                record = repo_index.get(oid)
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+                repo_index = None
+                record = None
+            if record is not None:
+                return record
+
+        abs_path = Path(self.abs_root_path(filepath))
+        content = self.get_file_content_safe(filepath)
+        if content.startswith('<'):  # Binary or error content
+            symbols = []
+        else:
+            symbols = extract_symbols(content, filepath)
+
+        record = {
+            'size': abs_path.stat().st_size,
+            'summary': None,
+            'symbols': symbols,
+        }
+        if repo_index:
+            repo_index.put(oid, record['size'], symbols)
+        return record
+
+    def _get_indexed_summary(self, filepath, oid, record):
+        """Return the summary for a blob, generating and indexing it on first use."""
+        if record.get('summary') is not None:
+            return record['summary']
+
+        summary = self.get_file_summary(filepath, include_outline=True)
+        record['summary'] = summary
+        if self.repo_index:
+            try:
+                self.repo_index.set_summary(oid, summary)
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+        return summary
+
+    def get_repo_structure(self):
+        """
+        Get the repository directory structure as a lazy, read-only mapping.
+
+        The nested {'type': 'directory', 'children': ...} shape is rendered
+        on access from the compact tree, so no copy of the tree is built.
+        Call .to_dict() on it for plain dicts.
+        """
+        return self.get_repo_tree().view(path_sep=os.sep)
+
+    def get_repo_tree(self):
+        """
+        Get the compact tree of tracked paths, patched to match HEAD and the index.
+
+        The tree is rebuilt only on first use or when the ignore rules change.
+        Otherwise it is patched from `git diff-tree` between the cached commit
+        and HEAD plus `git diff-index --cached` for staged changes, so the
+        refresh cost scales with what changed.
+        """
+        state = self._repo_tree_state()
+        tree = self.repo_tree
+        if tree is not None and tree.state == state:
+            return tree
+
+        if tree is None or tree.state[-1] != state[-1] or not self._patch_repo_tree(tree, state[0]):
+            tree = RepoTree(self.get_tracked_file_set())
+            tree.commit = state[0]
+            staged = self._staged_changes(state[0]) or (frozenset(), frozenset())
+            tree.index_added, tree.index_removed = staged
+
+        tree.state = state
+        self.repo_tree = tree
+        return tree
+
+    def _repo_tree_state(self):
+        return self._index_state() + (self.get_ignore_matcher().version,)
+
+    def _patch_repo_tree(self, tree, head):
+        """Patch `tree` in place to reflect `head` plus the index; False if it can't."""
+        if not tree.commit or not head:
+            return False
+
+        try:
+            if tree.commit != head:
+                output = self.repo.git.diff_tree(
+                    "-r", "--name-status", "-z", "--no-renames", tree.commit, head
+                )
+                committed = self._parse_name_status(output)
+            else:
+                committed = []
+        except ANY_GIT_ERROR:
+            return False
+
+        staged = self._staged_changes(head)
+        if staged is None:
+            return False
+        index_added, index_removed = staged
+
+        # Back out the previous staged changes so the tree matches tree.commit
+        removed = set(tree.index_added)
+        added = set(tree.index_removed)
+        for status, path in committed:
+            if status == "D":
+                removed.add(path)
+                added.discard(path)
+            elif status == "A":
+                added.add(path)
+                removed.discard(path)
+        added -= index_removed
+        removed |= index_removed
+        added |= index_added
+
+        tree.apply(
+            added=self.filter_ignored(added),
+            removed=removed - added,
+        )
+        tree.commit = head
+        tree.index_added = index_added
+        tree.index_removed = index_removed
+        return True
+
+    def _staged_changes(self, head):
+        """(added, removed) paths in the index relative to `head` (None on error)."""
+        if not head:
+            return None
+        try:
+            output = self.repo.git.diff_index(
+                "--cached", "--name-status", "-z", "--no-renames", head
+            )
+        except ANY_GIT_ERROR:
+            return None
+        changes = self._parse_name_status(output)
+        added = frozenset(path for status, path in changes if status == "A")
+        removed = frozenset(path for status, path in changes if status == "D")
+        return added, removed
+
+    def _parse_name_status(self, output):
+        """Parse `--name-status -z` output into (status, normalized path) pairs."""
+        fields = output.split("\0")
+        changes = []
+        for i in range(0, len(fields) - 1, 2):
+            status, path = fields[i], fields[i + 1]
+            if status and path:
+                changes.append((status[0], self.normalize_path(path)))
+        return changes
+
+    def _read_text(self, filepath, max_size):
+        """File text (a summary past max_size), None if binary; raises OSError."""
+        abs_path = Path(self.abs_root_path(filepath))
+        if abs_path.stat().st_size > max_size:
+            return self.get_file_summary(filepath)
+
+        for encoding in ['utf-8', 'latin-1', 'cp1252']:
+            try:
+                with open(abs_path, 'r', encoding=encoding) as f:
                     return f.read()
             except UnicodeDecodeError:
-                # Try with different encodings
-                for encoding in ['latin-1', 'cp1252']:
-                    try:
-                        with open(abs_path, 'r', encoding=encoding) as f:
-                            return f.read()
-                    except UnicodeDecodeError:
-                        continue
-                
-                # If all encodings fail, treat as binary
-                return f"<Binary file: {filepath}>"
-                
-        except (OSError, IOError) as e:
+                continue
+        return None
+
+    def get_file_text(self, filepath, max_size=MAX_CONTENT_BYTES):
+        """
+        File content as text, or None if it can't be read or decoded.
+
+        Unlike get_file_content_safe, failures never come back as text that
+        could be mistaken for a file's real content.
+        """
+        try:
+            return self._read_text(filepath, max_size)
+        except OSError:
+            return None
+
+    def get_file_content_safe(self, filepath, max_size=MAX_CONTENT_BYTES):
+        """Safely read file content with error handling."""
+        try:
+            content = self._read_text(filepath, max_size)
+        except OSError as e:
             return f"<Error reading file: {e}>"
+        if content is None:
+            return f"<Binary file: {filepath}>"
+        return content
 
-    def get_file_summary(self, filepath, max_lines=50):
-        """Get truncated summary of large files."""
+    def get_file_summary(self, filepath, max_lines=50, include_outline=False):
+        """
+        Get truncated summary of large files.
+
+        Files up to 2 * SUMMARY_MAX_BYTES are read whole and the cut is
+        reported in lines. Larger files only have their head and tail blocks
+        read (the tail by seeking back from the end) and the cut is reported
+        in bytes, so multi-hundred MB files are never scanned. With
+        include_outline, top-level definitions from the first
+        SUMMARY_OUTLINE_BYTES of a source file's omitted middle are listed in
+        its place.
+        """
         try:
-            abs_path = self.abs_root_path(filepath)
-            with open(abs_path, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            if len(lines) <= max_lines:
-                return ''.join(lines)
-            
-            # Take first and last portions
-            first_part = max_lines // 2
-            last_part = max_lines - first_part
-            
-            summary_lines = (
-                lines[:first_part] + 
-                [f"\n... ({len(lines) - max_lines} lines omitted) ...\n\n"] +
-                lines[-last_part:]
-            )
-            
-            return ''.join(summary_lines)
-            
-        except (OSError, UnicodeDecodeError):
+            abs_path = Path(self.abs_root_path(filepath))
+            with open(abs_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                total_lines = None
+                if size <= 2 * SUMMARY_MAX_BYTES:
+                    data = f.read()
+                    total_lines = self._count_lines(data)
+                    if total_lines <= max_lines:
+                        return self._decode_summary(data)
+
+                first_part = max_lines // 2
+                last_part = max_lines - first_part
+                head = self._read_head(f, first_part)
+                tail_start, tail = self._read_tail(f, size, last_part)
+                tail_start = max(tail_start, len(head))
+                tail = tail[len(tail) - (size - tail_start):] if size > tail_start else b''
+
+                outline = []
+                if include_outline and abs_path.suffix.lower() in OUTLINE_EXTENSIONS:
+                    outline = self._read_outline(f, len(head), tail_start, head.count(b'\n'))
+
+        except OSError:
             return f"<Unable to summarize file: {filepath}>"
 
+        omitted_lines = 0
+        if total_lines is not None:
+            omitted_lines = total_lines - head.count(b'\n') - tail.count(b'\n')
+            if tail and not tail.endswith(b'\n'):
+                omitted_lines -= 1
+        if omitted_lines > 0:
+            marker = f"\n... ({omitted_lines} lines omitted) ...\n\n"
+        else:
+            omitted_bytes = max(tail_start - len(head), 0)
+            marker = f"\n... ({omitted_bytes} bytes omitted) ...\n\n"
+
+        if outline:
+            marker += "".join(f"{lineno}: {line}\n" for lineno, line in outline) + "\n"
+
+        return self._decode_summary(head) + marker + self._decode_summary(tail)
+
+    @staticmethod
+    def _decode_summary(data):
+        return data.decode('utf-8', errors='ignore')
+
+    @staticmethod
+    def _count_lines(data):
+        """Count lines the way readlines() would."""
+        count = data.count(b'\n')
+        if data and not data.endswith(b'\n'):
+            count += 1
+        return count
+
+    @staticmethod
+    def _read_head(f, num_lines):
+        """Read the first `num_lines` lines (capped at SUMMARY_MAX_BYTES)."""
+        f.seek(0)
+        buf = b''
+        while buf.count(b'\n') < num_lines and len(buf) < SUMMARY_MAX_BYTES:
+            block = f.read(SUMMARY_BLOCK_SIZE)
+            if not block:
+                break
+            buf += block
+
+        end = -1
+        for _ in range(num_lines):
+            end = buf.find(b'\n', end + 1)
+            if end == -1:
+                break
+        if end != -1:
+            buf = buf[:end + 1]
+        return buf[:SUMMARY_MAX_BYTES]
+
+    @staticmethod
+    def _read_tail(f, size, num_lines):
+        """Read the last `num_lines` lines by seeking back from the end of the file."""
+        pos = size
+        buf = b''
+        while pos > 0 and buf.count(b'\n') <= num_lines and len(buf) < SUMMARY_MAX_BYTES:
+            step = min(SUMMARY_BLOCK_SIZE, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+        # A trailing newline ends the last line; it does not start a new one
+        search_end = len(buf) - 1 if buf.endswith(b'\n') else len(buf)
+        start = search_end
+        for _ in range(num_lines):
+            start = buf.rfind(b'\n', 0, start)
+            if start == -1:
+                break
+        if start != -1:
+            buf = buf[start + 1:]
+        buf = buf[-SUMMARY_MAX_BYTES:]
+        return size - len(buf), buf
+
+    @staticmethod
+    def _read_outline(f, start, end, start_lineno, max_entries=100):
+        """
+        Collect top-level definitions between two offsets.
+
+        At most SUMMARY_OUTLINE_BYTES are read, in blocks searched with a
+        bytes regex, so no Python-level loop runs per line.
+        """
+        end = min(end, start + SUMMARY_OUTLINE_BYTES)
+        f.seek(start)
+        offset = start
+        # Lines before `buf`, which always starts at a line start
+        lineno = start_lineno
+        buf = b''
+        outline = []
+        while offset < end and len(outline) < max_entries:
+            block = f.read(min(SUMMARY_BLOCK_SIZE, end - offset))
+            if not block:
+                break
+            offset += len(block)
+            buf += block
+
+            cut = len(buf) if offset >= end else buf.rfind(b'\n') + 1
+            if cut == 0:
+                # Inside one very long line: only its start can begin a definition
+                buf = buf[:SUMMARY_LINE_LIMIT]
+                continue
+            lines, buf = buf[:cut], buf[cut:]
+
+            pos = 0
+            for match in SYMBOL_BYTES_RE.finditer(lines):
+                lineno += lines.count(b'\n', pos, match.start())
+                pos = match.start()
+                line_end = lines.find(b'\n', pos)
+                if line_end == -1:
+                    line_end = len(lines)
+                line = lines[pos:min(line_end, pos + SUMMARY_LINE_LIMIT)]
+                outline.append((lineno + 1, line.decode('utf-8', errors='ignore').rstrip()))
+                if len(outline) >= max_entries:
+                    break
+            lineno += lines.count(b'\n', pos)
+        return outline
+
     def estimate_file_tokens(self, filepath):
-        """Estimate token count for file (rough approximation)."""
-        cache_key = f"{filepath}:{self.abs_root_path(filepath).stat().st_mtime}"
-        
-        if cache_key in self.file_metadata_cache:
-            return self.file_metadata_cache[cache_key]['tokens']
-        
+        """Token count for a file, using the active model's tokenizer (cached by blob)."""
         try:
-            content = self.get_file_content_safe(filepath)
-            if content.startswith('<'):  # Binary or error content
-                tokens = 0
-            else:
-                # Rough token estimation: ~4 characters per token
-                tokens = len(content) // 4
-            
-            self.file_metadata_cache[cache_key] = {'tokens': tokens}
-            return tokens
-            
-        except Exception:
+            return self.count_file_tokens([filepath]).get(filepath, 0)
+        except (OSError, ValueError):
             return 0
 
-    def get_related_files(self, target_files, max_related=10):
-        """Find files related to target files based on imports and references."""
+    def get_related_files(self, target_files, max_related=10, max_depth=1):
+        """
+        Find files related to target files based on imports and references.
+
+        Python imports are resolved exactly through the import graph: files the
+        targets import come first, then files importing the targets, nearest
+        hops first. Quoted file references count only when they name a tracked
+        path.
+        """
         if not target_files:
             return []
-        
-        all_files = self.get_tracked_files()
-        related_files = set()
-        
-        # Extract imports and references from target files
-        patterns_to_find = set()
-        
+
+        graph = self.get_import_graph()
+        targets = [self.normalize_path(f) for f in target_files]
+        target_set = set(targets)
+
+        ranked = {}
+        for order, direction in enumerate(('forward', 'reverse')):
+            for target in targets:
+                closure = graph.closure(target.replace(os.sep, '/'), max_depth, direction)
+                for path, distance in closure.items():
+                    path = self.normalize_path(path)
+                    key = (distance, order, path)
+                    if path not in ranked or key < ranked[path]:
+                        ranked[path] = key
+
+        tracked_files = self.get_status_snapshot().tracked
         for target_file in target_files:
+            content = self.get_file_content_safe(target_file)
+            for ref in re.findall(r'["\']([^"\']*\.[a-zA-Z]{2,4})["\']', content):
+                try:
+                    path = self.normalize_path(ref)
+                except ValueError:
+                    continue
+                if path in tracked_files and path not in ranked:
+                    ranked[path] = (1, 2, path)
+
+        related = sorted(key for path, key in ranked.items() if path not in target_set)
+        return [path for _, _, path in related[:max_related]]
+
+    def get_import_graph(self):
+        """
+        Get the import graph for tracked Python files, updated to the working tree.
+
+        Import specs are cached per blob OID (in memory and in the repo index),
+        so only files whose content changed are parsed again.
+        """
+        with self.status_snapshot() as snapshot:
+            blob_oids = self.get_blob_oids()
+            file_oids = {}
+            for path in snapshot.tracked:
+                if not path.endswith(".py"):
+                    continue
+                oid = None if path in snapshot.dirty else blob_oids.get(path)
+                if oid is None:
+                    abs_path = Path(self.abs_root_path(path))
+                    if not abs_path.is_file():
+                        continue
+                    oid = git_blob_oid_for_file(abs_path)
+                file_oids[path.replace(os.sep, "/")] = oid
+
+        self.import_graph.update(file_oids, self._load_import_specs)
+        return self.import_graph
+
+    def _load_import_specs(self, missing):
+        """Load import specs for (path, oid) pairs from the repo index, parsing misses."""
+        specs_by_oid = {}
+        repo_index = self.get_repo_index()
+        if repo_index:
             try:
-                content = self.get_file_content_safe(target_file)
-                
-                # Python imports
-                import_matches = re.findall(r'from\s+(\S+)\s+import|import\s+(\S+)', content)
-                for match in import_matches:
-                    module = match[0] or match[1]
-                    if module:
-                        patterns_to_find.add(module.replace('.', '/'))
-                
-                # General file references (simple heuristic)
-                file_refs = re.findall(r'["\']([^"\']*\.[a-zA-Z]{2,4})["\']', content)
-                patterns_to_find.update(file_refs)
-                
-            except Exception:
-                continue
-        
-        # Find files matching patterns
-        for filepath in all_files:
-            if filepath in target_files:
+                specs_by_oid = repo_index.get_import_specs(oid for _, oid in missing)
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+                repo_index = None
+
+        parsed = {}
+        for path, oid in missing:
+            if oid in specs_by_oid or oid in parsed:
                 continue
-                
-            for pattern in patterns_to_find:
-                if pattern in filepath:
-                    related_files.add(filepath)
-                    if len(related_files) >= max_related:
-                        break
-            
-            if len(related_files) >= max_related:
-                break
-        
-        return list(related_files)
+            content = self.get_file_content_safe(path)
+            parsed[oid] = [] if content.startswith("<") else parse_import_specs(content)
+
+        if parsed and repo_index:
+            try:
+                repo_index.put_import_specs(parsed)
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+
+        specs_by_oid.update(parsed)
+        return specs_by_oid
+
+    def get_file_history(self):
+        """
+        Per-file last-touch time and change count over HEAD's history.
+
+        Both come from one streaming `git log --name-only` pass. The result is
+        persisted in the repo index with the commit it covers, so later calls
+        only scan commits newer than that tip (history is rescanned in full if
+        the tip is no longer an ancestor of HEAD).
+
+        Returns:
+            dict: path -> (last touch unix timestamp, number of commits touching it)
+        """
+        head = self.get_head_commit_sha()
+        if not head:
+            return {}
+        if self.file_history is not None and self.file_history[0] == head:
+            return self.file_history[1]
+
+        history = {}
+        tip = None
+        repo_index = self.get_repo_index()
+        if repo_index:
+            try:
+                history, tip = repo_index.get_file_history()
+            except RepoIndexError as err:
+                self._disable_repo_index(err)
+                repo_index = None
+
+        if tip != head:
+            incremental = bool(tip) and self._is_ancestor(tip, head)
+            if not incremental:
+                history = {}
+            fresh = self._scan_file_history(f"{tip}..{head}" if incremental else head)
+            if fresh is None:
+                return history
+
+            for path, (last_touch, changes) in fresh.items():
+                old = history.get(path)
+                if old:
+                    fresh[path] = (max(last_touch, old[0]), changes + old[1])
+            history.update(fresh)
+
+            if repo_index:
+                try:
+                    repo_index.put_file_history(fresh, head, replace=not incremental)
+                except RepoIndexError as err:
+                    self._disable_repo_index(err)
+
+        self.file_history = (head, history)
+        return history
+
+    def _is_ancestor(self, ancestor, commit):
+        try:
+            return self.repo.is_ancestor(ancestor, commit)
+        except ANY_GIT_ERROR:
+            return False
+
+    def _scan_file_history(self, rev_range):
+        """Stream `git log --name-only` over rev_range into {path: (last touch, changes)}."""
+        try:
+            proc = self.repo.git(c="core.quotepath=off").log(
+                "--name-only", "--no-renames", "--format=%x01%ct", rev_range, as_process=True
+            )
+        except ANY_GIT_ERROR as err:
+            self.io.tool_error(f"Unable to read git history: {err}")
+            return None
+
+        history = {}
+        timestamp = None
+        try:
+            for raw in proc.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                if line.startswith("\x01"):
+                    timestamp = int(line[1:])
+                    continue
+                if not line or timestamp is None:
+                    continue
+
+                path = self.normalize_path(line)
+                entry = history.get(path)
+                if entry is None:
+                    history[path] = [timestamp, 1]
+                else:
+                    entry[0] = max(entry[0], timestamp)
+                    entry[1] += 1
+            proc.wait()
+        except ANY_GIT_ERROR as err:
+            self.io.tool_error(f"Unable to read git history: {err}")
+            return None
+
+        return {path: (entry[0], entry[1]) for path, entry in history.items()}
 
     def filter_files_by_extension(self, extensions, exclude=False):
         """Filter tracked files by extensions."""
@@ -705,61 +1704,86 @@ class GitRepo:
         return diffs
 
     def get_tracked_files(self):
+        return list(self.get_tracked_file_set())
+
+    def get_tracked_file_set(self):
+        """
+        Tracked, non-ignored paths as a frozenset.
+
+        The set comes from one `git ls-files -s -z` call and is cached until
+        HEAD, the git index or the ignore matcher changes, so repeated calls
+        within a turn only stat the index file.
+        """
         if not self.repo:
-            return []
+            return frozenset()
+
+        entries = self._get_index_entries()
+        if entries is None:
+            return frozenset()
 
+        matcher = self.get_ignore_matcher()
+        key = (entries[0], matcher.version)
+        if self.tracked_files_key != key:
+            self.tracked_files = frozenset(matcher.filter_paths(entries[2]))
+            self.tracked_files_key = key
+        return self.tracked_files
+
+    def _index_state(self):
+        """(HEAD sha, index mtime_ns, index size): changes whenever ls-files could."""
         try:
-            commit = self.repo.head.commit
+            head = self.repo.head.commit.hexsha
         except ValueError:
-            commit = None
+            head = None
+
+        try:
+            st = (Path(self.repo.git_dir) / "index").stat()
+        except OSError:
+            return head, 0, 0
+        return head, st.st_mtime_ns, st.st_size
+
+    def _get_index_entries(self):
+        """
+        Return (state, {path: blob oid}, frozenset of paths) for the git index.
+
+        Stage-0 entries provide blob OIDs; unmerged paths are still tracked.
+        Returns None if git cannot be read.
+        """
+        try:
+            state = self._index_state()
         except ANY_GIT_ERROR as err:
             self.git_repo_error = err
             self.io.tool_error(f"Unable to list files in git repo: {err}")
             self.io.tool_output("Is your git repo corrupted?")
-            return []
+            return None
+
+        if self.index_entries is not None and self.index_entries[0] == state:
+            return self.index_entries
 
-        files = set()
-        if commit:
-            if commit in self.tree_files:
-                files = self.tree_files[commit]
-            else:
-                try:
-                    iterator = commit.tree.traverse()
-                    blob = None  # Initialize blob
-                    while True:
-                        try:
-                            blob = next(iterator)
-                            if blob.type == "blob":  # blob is a file
-                                files.add(blob.path)
-                        except IndexError:
-                            # Handle potential index error during tree traversal
-                            # without relying on potentially unassigned 'blob'
-                            self.io.tool_warning(
-                                "GitRepo: Index error encountered while reading git tree object."
-                                " Skipping."
-                            )
-                            continue
-                        except StopIteration:
-                            break
-                except ANY_GIT_ERROR as err:
-                    self.git_repo_error = err
-                    self.io.tool_error(f"Unable to list files in git repo: {err}")
-                    self.io.tool_output("Is your git repo corrupted?")
-                    return []
-                files = set(self.normalize_path(path) for path in files)
-                self.tree_files[commit] = set(files)
-
-        # Add staged files
-        index = self.repo.index
         try:
-            staged_files = [path for path, _ in index.entries.keys()]
-            files.update(self.normalize_path(path) for path in staged_files)
+            output = self.repo.git.ls_files("-s", "-z")
         except ANY_GIT_ERROR as err:
-            self.io.tool_error(f"Unable to read staged files: {err}")
+            self.git_repo_error = err
+            self.io.tool_error(f"Unable to list files in git repo: {err}")
+            self.io.tool_output("Is your git repo corrupted?")
+            return None
 
-        res = [fname for fname in files if not self.ignored_file(fname)]
+        oids = {}
+        paths = set()
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            # <mode> SP <oid> SP <stage> TAB <path>
+            meta, _, path = entry.partition("\t")
+            parts = meta.split()
+            if len(parts) != 3:
+                continue
+            path = self.normalize_path(path)
+            paths.add(path)
+            if parts[2] == "0":
+                oids[path] = parts[1]
 
-        return res
+        self.index_entries = (state, oids, frozenset(paths))
+        return self.index_entries
 
     def normalize_path(self, path):
         orig_path = path
@@ -782,17 +1806,45 @@ class GitRepo:
         self.aider_ignore_last_check = current_time
 
         if not self.aider_ignore_file.is_file():
+            if self.aider_ignore_ts:
+                self.aider_ignore_ts = 0
+                self.ignore_matcher.set_patterns(())
+                self.aider_ignore_spec = None
             return
 
         mtime = self.aider_ignore_file.stat().st_mtime
         if mtime != self.aider_ignore_ts:
             self.aider_ignore_ts = mtime
-            self.ignore_file_cache = {}
             lines = self.aider_ignore_file.read_text().splitlines()
-            self.aider_ignore_spec = pathspec.PathSpec.from_lines(
-                pathspec.patterns.GitWildMatchPattern,
-                lines,
-            )
+            self.ignore_matcher.set_patterns(lines)
+            self.aider_ignore_spec = self.ignore_matcher.spec
+
+    def get_ignore_matcher(self):
+        """
+        Return the compiled aiderignore/subtree matcher, refreshed if needed.
+
+        The cwd prefix for --subtree-only is resolved once per cwd rather than
+        once per path.
+        """
+        self.refresh_aider_ignore()
+
+        if self.subtree_only:
+            cwd = os.getcwd()
+            if cwd != self.ignore_matcher_cwd:
+                try:
+                    subtree = Path(cwd).resolve().relative_to(Path(self.root).resolve())
+                    subtree = subtree.as_posix()
+                except ValueError:
+                    # Issue #1524: cwd is not under the repo root, so every path is ignored
+                    subtree = OUTSIDE_REPO
+                self.ignore_matcher.set_subtree(subtree)
+                self.ignore_matcher_cwd = cwd
+
+        return self.ignore_matcher
+
+    def filter_ignored(self, paths):
+        """Drop aiderignored (and out-of-subtree) paths in one pass."""
+        return self.get_ignore_matcher().filter_paths(paths)
 
     def git_ignored_file(self, path):
         if not self.repo:
@@ -804,39 +1856,12 @@ class GitRepo:
             return False
 
     def ignored_file(self, fname):
-        self.refresh_aider_ignore()
-
-        if fname in self.ignore_file_cache:
-            return self.ignore_file_cache[fname]
-
-        result = self.ignored_file_raw(fname)
-        self.ignore_file_cache[fname] = result
-        return result
-
-    def ignored_file_raw(self, fname):
-        if self.subtree_only:
-            try:
-                fname_path = Path(self.normalize_path(fname))
-                cwd_path = Path.cwd().resolve().relative_to(Path(self.root).resolve())
-            except ValueError:
-                # Issue #1524
-                # ValueError: 'C:\\dev\\squid-certbot' is not in the subpath of
-                # 'C:\\dev\\squid-certbot'
-                # Clearly, fname is not under cwd... so ignore it
-                return True
-
-            if cwd_path not in fname_path.parents and fname_path != cwd_path:
-                return True
-
-        if not self.aider_ignore_file or not self.aider_ignore_file.is_file():
-            return False
-
+        matcher = self.get_ignore_matcher()
         try:
             fname = self.normalize_path(fname)
         except ValueError:
             return True
-
-        return self.aider_ignore_spec.match_file(fname)
+        return matcher.is_ignored(fname)
 
     def path_in_repo(self, path):
         if not self.repo:
@@ -844,31 +1869,68 @@ class GitRepo:
         if not path:
             return
 
-        tracked_files = set(self.get_tracked_files())
+        if self._status_snapshot is not None:
+            tracked_files = self._status_snapshot.tracked
+        else:
+            tracked_files = self.get_tracked_file_set()
         return self.normalize_path(path) in tracked_files
 
     def abs_root_path(self, path):
         res = Path(self.root) / path
         return utils.safe_abs_path(res)
 
-    def get_dirty_files(self):
+    def get_status_snapshot(self):
         """
-        Returns a list of all files which are dirty (not committed), either staged or in the working
-        directory.
+        Return the active status snapshot, or take a fresh one.
+
+        A snapshot costs one `git status --porcelain -z` call plus one pass over
+        the tracked files, no matter how many paths are queried against it.
         """
-        dirty_files = set()
+        if self._status_snapshot is not None:
+            return self._status_snapshot
 
-        # Get staged files
-        staged_files = self.repo.git.diff("--name-only", "--cached").splitlines()
-        dirty_files.update(staged_files)
+        try:
+            output = self.repo.git.status("--porcelain", "-z", "--untracked-files=no")
+        except ANY_GIT_ERROR as err:
+            self.io.tool_error(f"Unable to read git status: {err}")
+            output = ""
 
-        # Get unstaged files
-        unstaged_files = self.repo.git.diff("--name-only").splitlines()
-        dirty_files.update(unstaged_files)
+        return RepoStatus.from_porcelain(
+            output,
+            tracked=self.get_tracked_file_set(),
+            normalize=self.normalize_path,
+        )
 
-        return list(dirty_files)
+    @contextlib.contextmanager
+    def status_snapshot(self):
+        """
+        Share one status snapshot for the duration of a request.
+
+        Inside the block, `is_dirty`, `get_dirty_files` and `path_in_repo` answer
+        from the snapshot instead of spawning git or re-listing tracked files.
+        Nested blocks reuse the outermost snapshot.
+        """
+        if self._status_snapshot is not None:
+            yield self._status_snapshot
+            return
+
+        self._status_snapshot = self.get_status_snapshot()
+        try:
+            yield self._status_snapshot
+        finally:
+            self._status_snapshot = None
+
+    def get_dirty_files(self):
+        """
+        Returns a list of all files which are dirty (not committed), either staged or in the working
+        directory.
+        """
+        return sorted(self.get_status_snapshot().dirty)
 
     def is_dirty(self, path=None):
+        if self._status_snapshot is not None:
+            return self._status_snapshot.is_dirty(path)
+
         if path and not self.path_in_repo(path):
             return True
 
@@ -0,0 +1,366 @@
+"""
+repo_index.py
+Persistent, blob-keyed index of per-file repo map metadata.
+
+Entries are keyed by git blob OID, so a record stays valid for as long as the
+file content it describes exists anywhere in the repository history. A warm
+start only has to read files whose blob changed since the last run.
+"""
+
+import ast
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+INDEX_DIRNAME = '.aider'
+INDEX_FILENAME = 'repo_index.db'
+SCHEMA_VERSION = 3
+
+SYMBOL_RE = re.compile(
+    r'^(?:export\s+)?(?:pub\s+)?(?:async\s+)?'
+    r'(?:def|class|function|func|fn|struct|interface|trait|enum|walker|node|edge|obj)\s+'
+    r'([A-Za-z_][A-Za-z0-9_]*)',
+    re.MULTILINE,
+)
+
+
+def git_blob_oid(data):
+    """Return the git blob OID of ``data`` (what ``git hash-object`` prints)."""
+    digest = hashlib.sha1()
+    digest.update(b'blob %d\0' % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def git_blob_oid_for_file(path, chunk_size=1024 * 1024):
+    """Return the git blob OID of a file on disk without loading it at once."""
+    path = Path(path)
+    digest = hashlib.sha1()
+    digest.update(b'blob %d\0' % path.stat().st_size)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def extract_symbols(content, filepath):
+    """
+    Extract top-level symbol names (functions, classes, ...) from source text.
+
+    Python files are parsed with ``ast``; everything else falls back to a
+    line-anchored regex that covers the common declaration keywords.
+    """
+    if str(filepath).endswith('.py'):
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            pass
+        else:
+            return [
+                node.name
+                for node in tree.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+            ]
+
+    return SYMBOL_RE.findall(content)
+
+
+class RepoIndexError(Exception):
+    """Raised when the on-disk repo index cannot be opened or used."""
+    pass
+
+
+class RepoIndex:
+    """
+    SQLite-backed store of file metadata keyed by git blob OID.
+
+    Each record holds the file size, an optional summary and the extracted
+    top-level symbols. Token counts live in their own table keyed by
+    (blob OID, tokenizer id), so switching models never invalidates the rest.
+    Per-path commit history is kept alongside, tagged with the commit it
+    covers. Writes are buffered and committed by ``flush()`` so a full map
+    build costs a single transaction.
+    """
+
+    def __init__(self, root, path=None):
+        """
+        Open (or create) the index for a repository.
+
+        Args:
+            root: Repository working tree root
+            path: Optional explicit database path (defaults to .aider/repo_index.db)
+        """
+        self.path = Path(path) if path else Path(root) / INDEX_DIRNAME / INDEX_FILENAME
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._init_schema()
+        except (OSError, sqlite3.Error) as err:
+            raise RepoIndexError(f'Unable to open repo index {self.path}: {err}')
+
+    def _init_schema(self):
+        # One write transaction, so concurrent openers (threads or processes)
+        # wait for each other instead of dropping tables mid-creation
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._create_tables()
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def _create_tables(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        self.conn.execute('DROP TABLE IF EXISTS blobs')
+        self.conn.execute('DROP TABLE IF EXISTS imports')
+        self.conn.execute('DROP TABLE IF EXISTS tokens')
+        self.conn.execute('DROP TABLE IF EXISTS history')
+        self.conn.execute('DROP TABLE IF EXISTS meta')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS blobs ('
+            ' oid TEXT PRIMARY KEY,'
+            ' size INTEGER NOT NULL,'
+            ' summary TEXT,'
+            ' symbols TEXT NOT NULL'
+            ')'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS imports (oid TEXT PRIMARY KEY, specs TEXT NOT NULL)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS tokens ('
+            ' oid TEXT NOT NULL,'
+            ' tokenizer TEXT NOT NULL,'
+            ' count INTEGER NOT NULL,'
+            ' PRIMARY KEY (oid, tokenizer)'
+            ')'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS history ('
+            ' path TEXT PRIMARY KEY,'
+            ' last_touch INTEGER NOT NULL,'
+            ' changes INTEGER NOT NULL'
+            ')'
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    @staticmethod
+    def _row_to_record(row):
+        size, summary, symbols = row
+        return {
+            'size': size,
+            'summary': summary,
+            'symbols': json.loads(symbols),
+        }
+
+    def get(self, oid):
+        """Return the record for a blob OID, or None if it is not indexed."""
+        with self._lock:
+            if oid in self._pending:
+                return dict(self._pending[oid])
+            try:
+                row = self.conn.execute(
+                    'SELECT size, summary, symbols FROM blobs WHERE oid = ?', (oid,)
+                ).fetchone()
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to read repo index: {err}')
+        return self._row_to_record(row) if row else None
+
+    def get_many(self, oids):
+        """Return a dict of OID -> record for every indexed OID in ``oids``."""
+        oids = [oid for oid in set(oids) if oid]
+        found = {}
+        with self._lock:
+            for oid in oids:
+                if oid in self._pending:
+                    found[oid] = dict(self._pending[oid])
+
+            missing = [oid for oid in oids if oid not in found]
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                try:
+                    rows = self.conn.execute(
+                        'SELECT oid, size, summary, symbols FROM blobs'
+                        f' WHERE oid IN ({placeholders})',
+                        chunk,
+                    ).fetchall()
+                except sqlite3.Error as err:
+                    raise RepoIndexError(f'Unable to read repo index: {err}')
+                for row in rows:
+                    found[row[0]] = self._row_to_record(row[1:])
+        return found
+
+    def put(self, oid, size, symbols, summary=None):
+        """Buffer a record for ``oid``; it is written on the next ``flush()``."""
+        with self._lock:
+            self._pending[oid] = {
+                'size': size,
+                'summary': summary,
+                'symbols': list(symbols),
+            }
+
+    def set_summary(self, oid, summary):
+        """Attach a summary to an already indexed (or pending) record."""
+        record = self.get(oid)
+        if record is None:
+            return
+        record['summary'] = summary
+        with self._lock:
+            self._pending[oid] = record
+
+    def flush(self):
+        """Commit all buffered records in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [
+                (oid, rec['size'], rec['summary'], json.dumps(rec['symbols']))
+                for oid, rec in self._pending.items()
+            ]
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO blobs (oid, size, summary, symbols)'
+                        ' VALUES (?, ?, ?, ?)',
+                        rows,
+                    )
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to write repo index: {err}')
+            self._pending = {}
+
+    def get_token_counts(self, oids, tokenizer_id):
+        """Return {oid: token count} for every OID counted with ``tokenizer_id``."""
+        oids = [oid for oid in set(oids) if oid]
+        found = {}
+        with self._lock:
+            for start in range(0, len(oids), 500):
+                chunk = oids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                try:
+                    rows = self.conn.execute(
+                        'SELECT oid, count FROM tokens'
+                        f' WHERE tokenizer = ? AND oid IN ({placeholders})',
+                        [tokenizer_id] + chunk,
+                    ).fetchall()
+                except sqlite3.Error as err:
+                    raise RepoIndexError(f'Unable to read repo index: {err}')
+                found.update(rows)
+        return found
+
+    def put_token_counts(self, counts, tokenizer_id):
+        """Store {oid: token count} for ``tokenizer_id``."""
+        rows = [(oid, tokenizer_id, count) for oid, count in counts.items()]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO tokens (oid, tokenizer, count) VALUES (?, ?, ?)',
+                        rows,
+                    )
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to write repo index: {err}')
+
+    def get_import_specs(self, oids):
+        """Return {oid: import specs} for every OID with cached import specs."""
+        oids = [oid for oid in set(oids) if oid]
+        found = {}
+        with self._lock:
+            for start in range(0, len(oids), 500):
+                chunk = oids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                try:
+                    rows = self.conn.execute(
+                        f'SELECT oid, specs FROM imports WHERE oid IN ({placeholders})', chunk
+                    ).fetchall()
+                except sqlite3.Error as err:
+                    raise RepoIndexError(f'Unable to read repo index: {err}')
+                for oid, specs in rows:
+                    found[oid] = [
+                        (module, tuple(names), level) for module, names, level in json.loads(specs)
+                    ]
+        return found
+
+    def put_import_specs(self, specs_by_oid):
+        """Store import specs for a batch of blobs."""
+        rows = [(oid, json.dumps(specs)) for oid, specs in specs_by_oid.items()]
+        if not rows:
+            return
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO imports (oid, specs) VALUES (?, ?)', rows
+                    )
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to write repo index: {err}')
+
+    def get_file_history(self):
+        """Return ({path: (last touch timestamp, change count)}, history tip commit)."""
+        with self._lock:
+            try:
+                rows = self.conn.execute(
+                    'SELECT path, last_touch, changes FROM history'
+                ).fetchall()
+                tip = self.conn.execute(
+                    "SELECT value FROM meta WHERE key = 'history_tip'"
+                ).fetchone()
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to read repo index: {err}')
+        history = {path: (last_touch, changes) for path, last_touch, changes in rows}
+        return history, tip[0] if tip else None
+
+    def put_file_history(self, history, tip, replace=False):
+        """
+        Store per-file history rows and the commit they are current as of.
+
+        Args:
+            history: {path: (last touch timestamp, change count)} to write
+            tip: Commit the stored history now covers
+            replace: Drop all existing rows first (after a full rescan)
+        """
+        rows = [(path, last_touch, changes) for path, (last_touch, changes) in history.items()]
+        with self._lock:
+            try:
+                with self.conn:
+                    if replace:
+                        self.conn.execute('DELETE FROM history')
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO history (path, last_touch, changes)'
+                        ' VALUES (?, ?, ?)',
+                        rows,
+                    )
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('history_tip', ?)",
+                        (tip,),
+                    )
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to write repo index: {err}')
+
+    def count(self):
+        """Return the number of indexed blobs (flushing pending writes first)."""
+        self.flush()
+        with self._lock:
+            try:
+                return self.conn.execute('SELECT COUNT(*) FROM blobs').fetchone()[0]
+            except sqlite3.Error as err:
+                raise RepoIndexError(f'Unable to read repo index: {err}')
+
+    def close(self):
+        """Flush pending records and close the database."""
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
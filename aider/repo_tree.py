@@ -0,0 +1,210 @@
+"""
+repo_tree.py
+Compact, incrementally patched tree of tracked repository paths.
+
+Path components are interned, so repeated directory names share one string.
+Directories are __slots__ nodes and files are stored as bare names, which keeps
+the tree far smaller than a dict-of-dicts with a Path object per file.
+"""
+
+import posixpath
+import sys
+from collections.abc import Mapping
+
+
+class DirNode:
+    """A directory: sub-directories by name plus a set of file names."""
+
+    __slots__ = ('dirs', 'files')
+
+    def __init__(self):
+        self.dirs = {}
+        self.files = set()
+
+    def is_empty(self):
+        return not self.dirs and not self.files
+
+
+def split_path(path):
+    """Split a repo-relative path into interned components."""
+    path = str(path).replace('\\', '/')
+    return [sys.intern(part) for part in path.split('/') if part and part != '.']
+
+
+class RepoTree:
+    """
+    Tree of tracked paths that can be patched in place.
+
+    `version` increases on every change, so callers can cache derived data
+    and rebuild it only when needed. view() exposes the legacy nested-dict
+    structure lazily, without copying the tree.
+    """
+
+    def __init__(self, paths=()):
+        self.root = DirNode()
+        self.size = 0
+        self.version = 0
+        # Git state the tree currently reflects (set by the owner)
+        self.commit = None
+        self.state = None
+        self.index_added = frozenset()
+        self.index_removed = frozenset()
+
+        for path in paths:
+            self._add(path)
+        self.version += 1
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, path):
+        parts = split_path(path)
+        if not parts:
+            return False
+        node = self._find_dir(parts[:-1])
+        return node is not None and parts[-1] in node.files
+
+    def _find_dir(self, parts):
+        node = self.root
+        for part in parts:
+            node = node.dirs.get(part)
+            if node is None:
+                return None
+        return node
+
+    def _add(self, path):
+        parts = split_path(path)
+        if not parts:
+            return False
+
+        node = self.root
+        for part in parts[:-1]:
+            child = node.dirs.get(part)
+            if child is None:
+                child = node.dirs[part] = DirNode()
+            node = child
+
+        if parts[-1] in node.files:
+            return False
+        node.files.add(parts[-1])
+        self.size += 1
+        return True
+
+    def _remove(self, path):
+        parts = split_path(path)
+        if not parts:
+            return False
+
+        trail = [self.root]
+        for part in parts[:-1]:
+            child = trail[-1].dirs.get(part)
+            if child is None:
+                return False
+            trail.append(child)
+
+        if parts[-1] not in trail[-1].files:
+            return False
+        trail[-1].files.discard(parts[-1])
+        self.size -= 1
+
+        # Prune directories left empty by the removal
+        for depth in range(len(trail) - 1, 0, -1):
+            if not trail[depth].is_empty():
+                break
+            del trail[depth - 1].dirs[parts[depth - 1]]
+        return True
+
+    def add(self, path):
+        """Add a file path; returns True if the tree changed."""
+        changed = self._add(path)
+        if changed:
+            self.version += 1
+        return changed
+
+    def remove(self, path):
+        """Remove a file path; returns True if the tree changed."""
+        changed = self._remove(path)
+        if changed:
+            self.version += 1
+        return changed
+
+    def apply(self, added=(), removed=()):
+        """Apply a batch of additions and removals; returns the number of changes."""
+        changes = 0
+        for path in removed:
+            changes += self._remove(path)
+        for path in added:
+            changes += self._add(path)
+        if changes:
+            self.version += 1
+        return changes
+
+    def iter_paths(self):
+        """Yield every file path in the tree (posix separators)."""
+        stack = [('', self.root)]
+        while stack:
+            prefix, node = stack.pop()
+            for name in node.files:
+                yield prefix + name
+            for name, child in node.dirs.items():
+                stack.append((prefix + name + '/', child))
+
+    def view(self, path_sep='/'):
+        """Return a lazy StructureView of the whole tree."""
+        return StructureView(self.root, '', path_sep)
+
+    def to_dict(self, path_sep='/'):
+        """Render the legacy nested structure as plain dicts (see StructureView)."""
+        return self.view(path_sep).to_dict()
+
+
+class StructureView(Mapping):
+    """
+    Read-only view of a directory in the legacy nested structure.
+
+    Directories map to {'type': 'directory', 'children': <view>} and files to
+    {'type': 'file', 'path': ..., 'extension': ...}. Entries are rendered on
+    access from the live tree, so a view costs nothing up front and always
+    reflects the latest patches.
+    """
+
+    __slots__ = ('node', 'prefix', 'path_sep')
+
+    def __init__(self, node, prefix='', path_sep='/'):
+        self.node = node
+        self.prefix = prefix
+        self.path_sep = path_sep
+
+    def __getitem__(self, name):
+        child = self.node.dirs.get(name)
+        if child is not None:
+            return {
+                'type': 'directory',
+                'children': StructureView(child, self.prefix + name + self.path_sep, self.path_sep),
+            }
+        if name in self.node.files:
+            return {
+                'type': 'file',
+                'path': self.prefix + name,
+                'extension': posixpath.splitext(name)[1],
+            }
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self.node.dirs or name in self.node.files
+
+    def __iter__(self):
+        yield from list(self.node.dirs)
+        yield from list(self.node.files)
+
+    def __len__(self):
+        return len(self.node.dirs) + len(self.node.files)
+
+    def to_dict(self):
+        """Materialize this directory and everything below it as plain dicts."""
+        structure = {}
+        for name, entry in self.items():
+            if entry['type'] == 'directory':
+                entry = dict(entry, children=entry['children'].to_dict())
+            structure[name] = entry
+        return structure
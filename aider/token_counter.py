@@ -0,0 +1,91 @@
+"""
+token_counter.py
+Tokenizer-backed token counting with a batch API.
+
+Counts come from the active model's tokenizer. When the model maps onto a
+tiktoken encoding, whole batches are encoded in one call. Each counter exposes
+a stable `tokenizer_id` so cached counts can be keyed by tokenizer.
+"""
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+FALLBACK_TOKENIZER_ID = 'chars/4'
+
+
+class TokenCounter:
+    """
+    Count tokens for a model, falling back to ~4 characters per token.
+    """
+
+    def __init__(self, model=None):
+        """
+        Initialize a counter.
+
+        Args:
+            model: Optional aider Model; None uses the character estimate
+        """
+        self.model = model
+        self.encoding = None
+        self.tokenizer_id = FALLBACK_TOKENIZER_ID
+
+        name = getattr(model, 'name', None)
+        if not name:
+            return
+
+        encoding = self._tiktoken_encoding(name)
+        if encoding is not None:
+            self.encoding = encoding
+            # Models sharing an encoding share cached counts
+            self.tokenizer_id = f'tiktoken:{encoding.name}'
+        elif callable(getattr(model, 'tokenizer', None)):
+            self.tokenizer_id = f'model:{name}'
+
+    @staticmethod
+    def _tiktoken_encoding(model_name):
+        if tiktoken is None:
+            return None
+        # Strip provider prefixes like "openai/" or "openrouter/openai/"
+        base_name = model_name.split('/')[-1]
+        try:
+            return tiktoken.encoding_for_model(base_name)
+        except Exception:
+            return None
+
+    def count(self, text):
+        """Count tokens in a single string."""
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts):
+        """
+        Count tokens for many strings in one call.
+
+        Args:
+            texts: Iterable of strings
+
+        Returns:
+            List of token counts, in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        if self.encoding is not None:
+            try:
+                return [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+            except Exception:
+                pass
+
+        if self.tokenizer_id.startswith('model:'):
+            counts = []
+            for text in texts:
+                try:
+                    counts.append(len(self.model.tokenizer(text)))
+                except Exception:
+                    counts.append(len(text) // CHARS_PER_TOKEN)
+            return counts
+
+        return [len(text) // CHARS_PER_TOKEN for text in texts]
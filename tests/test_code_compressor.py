@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for tiered code compression - NO MOCKING!
+Every test compresses real source text and parses the result.
+"""
+
+import ast
+import os
+import sys
+import tempfile
+import unittest
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.code_compressor import (
+    BODIES,
+    COMMENTS,
+    DOCSTRINGS,
+    OUTLINE,
+    ORIGINAL,
+    TRUNCATE,
+    compress_file,
+    compress_source,
+    compress_to_budget,
+)
+
+SOURCE = '''"""Module docstring."""
+import os  # used below
+
+URL = "https://example.com/#section"  # not part of the URL
+
+
+class Config:
+    """Only a docstring."""
+
+
+class Loader:
+    """Loads things."""
+    retries = 3
+
+    @staticmethod
+    def load(path,
+             mode="r"):
+        """Read a file."""
+        template = """keep # this
+        line"""
+        return open(path, mode).read() + template
+
+
+def main():
+    return Loader.load(os.devnull)
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+class TestCodeCompressor(unittest.TestCase):
+    """Each compression level keeps the source valid and strictly smaller"""
+
+    def test_levels_keep_strings_and_stay_parseable(self):
+        """Comments go, "#" inside strings stays, every level parses"""
+        sizes = []
+        for level in (ORIGINAL, COMMENTS, DOCSTRINGS, BODIES, OUTLINE):
+            text = compress_source(SOURCE, level)
+            ast.parse(text)
+            sizes.append(len(text))
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+        self.assertEqual(len(set(sizes)), len(sizes))
+
+        stripped = compress_source(SOURCE, COMMENTS)
+        self.assertIn('"https://example.com/#section"', stripped)
+        self.assertIn("keep # this", stripped)
+        self.assertNotIn("used below", stripped)
+        self.assertEqual(ast.dump(ast.parse(stripped)), ast.dump(ast.parse(SOURCE)))
+
+        no_docs = compress_source(SOURCE, DOCSTRINGS)
+        self.assertNotIn("Read a file", no_docs)
+        self.assertIn("class Config:\n    ...\n", no_docs)
+
+        bodies = compress_source(SOURCE, BODIES)
+        self.assertIn('    @staticmethod\n    def load(path,\n             mode="r"):\n        ...\n', bodies)
+        self.assertIn("def main():\n    ...\n", bodies)
+
+        outline = compress_source(SOURCE, OUTLINE)
+        self.assertNotIn("retries", outline)
+        self.assertNotIn("__main__", outline)
+
+    def test_budget_stops_at_first_level_that_fits(self):
+        """compress_to_budget honors the target with the least compression"""
+        count = len
+        text, level = compress_to_budget(SOURCE, len(SOURCE), count)
+        self.assertEqual((text, level), (SOURCE, ORIGINAL))
+
+        target = len(compress_source(SOURCE, DOCSTRINGS))
+        text, level = compress_to_budget(SOURCE, target, count)
+        self.assertEqual(level, DOCSTRINGS)
+        self.assertEqual(text, compress_source(SOURCE, DOCSTRINGS))
+
+        text, level = compress_to_budget(SOURCE, 60, count)
+        self.assertEqual(level, TRUNCATE)
+        self.assertLessEqual(len(text), 60)
+        self.assertIn("lines omitted", text)
+
+        # Prose does not tokenize as Python and is only ever truncated
+        prose = "Don't # strip this\n" * 20
+        text, level = compress_to_budget(prose, 1000, count)
+        self.assertEqual(text, prose)
+
+    def test_compress_file_streams_large_files(self):
+        """Files are compressed while streaming and match in-memory results"""
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+            f.write(SOURCE * 200)
+            path = f.name
+        try:
+            target = len(compress_source(SOURCE * 200, BODIES))
+            text, level = compress_file(path, target, len)
+            self.assertEqual(level, BODIES)
+            self.assertEqual(text, compress_source(SOURCE * 200, BODIES))
+
+            text, level = compress_file(path, len(SOURCE) * 200, len)
+            self.assertEqual((text, level), (SOURCE * 200, ORIGINAL))
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for edit validation - NO MOCKING!
+Every test validates real source text against a real import graph.
+"""
+
+import os
+import sys
+import unittest
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.code_validator import CodeValidator
+from aider.import_graph import ImportGraph, parse_import_specs
+
+
+def build_graph(sources):
+    graph = ImportGraph()
+    graph.update(
+        {path: path for path in sources},
+        lambda missing: {oid: parse_import_specs(sources[path]) for path, oid in missing},
+    )
+    return graph
+
+
+class TestCodeValidator(unittest.TestCase):
+    """Syntax, import and structure checks with a content-keyed cache"""
+
+    def setUp(self):
+        self.graph = build_graph({
+            "app/__init__.py": "",
+            "app/models.py": "class User:\n    pass\n",
+        })
+        self.validator = CodeValidator(self.graph, max_workers=2)
+
+    def test_reports_each_kind_of_error(self):
+        """Each check fails on its own kind of problem and reports the line"""
+        results = self.validator.validate({
+            "app/ok.py": "import os\nfrom .models import User\nfrom app import models\n",
+            "app/syntax.py": "def broken(:\n    pass\n",
+            "app/outside.py": "return 1\n",
+            "app/imports.py": "import app.missing\nimport no_such_module_xyz\n"
+                              "try:\n    import also_missing_xyz\nexcept ImportError:\n    pass\n",
+            "app/dupes.py": "def f():\n    pass\n\n\ndef f():\n    pass\n",
+            "README.md": "not python (\n",
+        })
+
+        self.assertTrue(results["app/ok.py"]["valid"])
+        self.assertTrue(results["README.md"]["valid"])
+        self.assertFalse(results["app/syntax.py"]["syntax"])
+        self.assertFalse(results["app/outside.py"]["syntax"])
+        self.assertIn("'return' outside function", results["app/outside.py"]["errors"][0])
+
+        imports = results["app/imports.py"]
+        self.assertFalse(imports["imports"])
+        # Third-party imports need not be installed where aider runs
+        self.assertEqual(imports["errors"], ["app/imports.py:1: unresolved import 'app.missing'"])
+
+        dupes = results["app/dupes.py"]
+        self.assertTrue(dupes["syntax"])
+        self.assertFalse(dupes["structure"])
+        self.assertEqual(dupes["errors"], ["app/dupes.py:5: duplicate definition of 'f' (first at line 1)"])
+
+    def test_external_imports_are_checked_on_request(self):
+        """check_external also requires non-repo imports to be installed here"""
+        source = {"app/deps.py": "import os\nimport no_such_module_xyz\nfrom app.models import User\n"}
+        self.assertTrue(self.validator.validate(source)["app/deps.py"]["valid"])
+
+        strict = CodeValidator(self.graph, max_workers=1, check_external=True)
+        self.assertEqual(
+            strict.validate(source)["app/deps.py"]["errors"],
+            ["app/deps.py:2: unresolved import 'no_such_module_xyz'"],
+        )
+
+    def test_repo_imports_are_skipped_without_an_import_graph(self):
+        """With no module index, other repo modules can't be judged missing"""
+        validator = CodeValidator(max_workers=1)
+        results = validator.validate({
+            "aider/foo.py": "from aider.repo import GitRepo\nfrom . import sibling\nimport os\n",
+            "aider/deep.py": "from ... import up\n",
+        })
+        self.assertTrue(results["aider/foo.py"]["valid"])
+        self.assertEqual(results["aider/deep.py"]["errors"],
+                         ["aider/deep.py:1: relative import '...' beyond top-level package"])
+
+    def test_only_changed_content_is_rechecked(self):
+        """A large batch is checked once; later batches re-check only edited files"""
+        edit = {"app/__init__.py": ""}
+        for i in range(40):
+            edit[f"app/gen_{i}.py"] = f"from . import gen_{(i + 1) % 40}\nVALUE = {i}\n"
+
+        results = self.validator.validate(edit)
+        self.assertTrue(all(result["valid"] for result in results.values()))
+        # Modules added by the edit resolve each other's imports
+        self.assertEqual(self.validator.checked_count, 41)
+
+        edit["app/gen_3.py"] = "from . import gen_4\nfrom .nowhere import x\n"
+        results = self.validator.validate(edit)
+        self.assertEqual(self.validator.checked_count, 42)
+        self.assertEqual(results["app/gen_3.py"]["errors"], ["app/gen_3.py:2: unresolved import '.nowhere'"])
+        self.assertTrue(results["app/gen_4.py"]["valid"])
+
+
+if __name__ == "__main__":
+    unittest.main()
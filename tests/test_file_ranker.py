@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for concept ranking over the tracked-file index - NO MOCKING!
+Every test ranks files of a real temporary git repository.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import git
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.file_ranker import FileRanker, word_tokens
+from aider.io import InputOutput
+from aider.repo import GitRepo
+
+
+class TestFileRanker(unittest.TestCase):
+    """Ranking covers every tracked file and reads each blob once"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+
+        self.git = git.Repo.init(self.test_dir)
+        with self.git.config_writer() as cfg:
+            cfg.set_value("user", "name", "Test User")
+            cfg.set_value("user", "email", "test@example.com")
+
+        self.write(".gitignore", "build/\n")
+        self.write("main.py", "from parser import parseConfig\n\n\ndef main():\n    parseConfig()\n")
+        self.write("parser.py", "def parseConfig():\n    return {}\n")
+        for i in range(30):
+            self.write(f"pkg/mod_{i:02d}.py", f"VALUE = {i}\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="initial")
+        # Ignored and untracked: never ranked
+        self.write("build/config_parser.py", "def parseConfig():\n    pass\n")
+
+        self.repo = GitRepo(InputOutput(pretty=False, yes=True), None, self.test_dir)
+        self.ranker = FileRanker(max_workers=4)
+
+    def tearDown(self):
+        if self.repo.repo_index:
+            self.repo.repo_index.close()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content):
+        path = Path(self.test_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def rank(self, concept):
+        return self.ranker.rank(concept, self.repo.get_file_oids(), self.repo.get_file_text)
+
+    def test_word_tokens_split_identifiers(self):
+        self.assertEqual(
+            word_tokens("getOSPRanking file_editor HTTP2"),
+            {"getospranking", "get", "osp", "ranking", "file_editor", "file", "editor", "http2"},
+        )
+
+    def test_ranks_all_tracked_files_reading_each_blob_once(self):
+        """Files past the first few still rank; re-ranking reads only changed blobs"""
+        ranked = self.rank("parse")
+        self.assertEqual(len(ranked), 33)
+        self.assertNotIn("build/config_parser.py", [entry["path"] for entry in ranked])
+        self.assertEqual(
+            [(entry["path"], entry["relevance"]) for entry in ranked[:3]],
+            [("parser.py", 0.8), ("main.py", 0.3), (".gitignore", 0.0)],
+        )
+        self.assertEqual(self.ranker.read_count, 33)
+
+        self.assertEqual(self.rank("mod_29")[0]["path"], "pkg/mod_29.py")
+        self.assertEqual(self.ranker.read_count, 33)
+
+        self.write("pkg/mod_07.py", "def parse_rows():\n    return []\n")
+        ranked = self.rank("parse")
+        self.assertEqual(self.ranker.read_count, 34)
+        self.assertEqual(ranked[2], {"path": "pkg/mod_07.py", "relevance": 0.3, "lines": 3, "size": 32})
+
+    def test_markup_ranks_and_unreadable_files_do_not(self):
+        """Content starting with "<" is real text; only unreadable files have no words"""
+        self.write("widget.html", "<div>widget</div>\n")
+        self.write("gone.py", "")
+        file_oids = dict(self.repo.get_file_oids(), **{"widget.html": "w1", "gone.py": "g1"})
+        os.remove(os.path.join(self.test_dir, "gone.py"))
+
+        ranked = {entry["path"]: entry for entry in self.ranker.rank("widget", file_oids, self.repo.get_file_text)}
+        self.assertEqual(ranked["widget.html"], {"path": "widget.html", "relevance": 0.8, "lines": 2, "size": 18})
+        self.assertEqual(ranked["gone.py"], {"path": "gone.py", "relevance": 0.0, "lines": 0, "size": 0})
+        self.assertIsNone(self.repo.get_file_text("gone.py"))
+        self.assertTrue(self.repo.get_file_content_safe("gone.py").startswith("<Error reading file: "))
+
+    def test_structure_is_blended_in(self):
+        """Structural importance splits equal matches, scaled to the top file"""
+        structure = {"pkg/mod_01.py": 0.02, "pkg/mod_02.py": 0.01, "main.py": 0.0}
+        ranked = self.ranker.rank("value", self.repo.get_file_oids(), self.repo.get_file_text, structure)
+        self.assertEqual(
+            [(entry["path"], entry["relevance"]) for entry in ranked[:3]],
+            [("pkg/mod_01.py", 0.5), ("pkg/mod_02.py", 0.4), ("pkg/mod_00.py", 0.3)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled Jac module cache - NO MOCKING!
+Every test compiles real module files into a real cache directory.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.jac_cache import JacModuleCache
+
+
+class TestJacModuleCache(unittest.TestCase):
+    """Artifacts are keyed by source hash and runtime tag"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmpdir, 'cache')
+        self.paths = []
+        for name in ('alpha', 'beta'):
+            path = os.path.join(self.tmpdir, f'{name}.py')
+            self.write(path, f'NAME = {name!r}\n')
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, source):
+        with open(path, 'w') as f:
+            f.write(source)
+
+    def run_code(self, code):
+        namespace = {}
+        exec(code, namespace)
+        return namespace['NAME']
+
+    def test_only_stale_modules_are_recompiled(self):
+        """A new process reuses artifacts; an edit recompiles only that module"""
+        first = JacModuleCache(self.cache_dir, tag='test-1')
+        self.assertEqual(first.warm(self.paths), {path: 'compiled' for path in self.paths})
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+        second = JacModuleCache(self.cache_dir, tag='test-1')
+        self.assertEqual(self.run_code(second.load(self.paths[0])), 'alpha')
+        self.assertEqual(second.compiled, [])
+
+        self.write(self.paths[0], 'NAME = "edited"\n')
+        self.assertFalse(second.is_fresh(self.paths[0]))
+        self.assertEqual(self.run_code(second.load(self.paths[0])), 'edited')
+        self.assertEqual(self.run_code(second.load(self.paths[1])), 'beta')
+        self.assertEqual(second.compiled, [self.paths[0]])
+        # The edited module's old artifact was replaced, not kept alongside
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+        # Another runtime version never reuses these artifacts
+        upgraded = JacModuleCache(self.cache_dir, tag='test-2')
+        self.assertEqual(upgraded.warm(self.paths), {path: 'compiled' for path in self.paths})
+
+    def test_bad_modules_and_artifacts(self):
+        """Compile errors are reported per module; corrupt artifacts are rebuilt"""
+        cache = JacModuleCache(self.cache_dir, tag='test-1')
+        self.write(self.paths[1], 'def broken(:\n')
+        status = cache.warm(self.paths)
+        self.assertEqual(status[self.paths[0]], 'compiled')
+        self.assertTrue(status[self.paths[1]].startswith('SyntaxError'))
+
+        artifact = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        with open(artifact, 'wb') as f:
+            f.write(b'\x00garbage')
+        self.assertEqual(self.run_code(cache.load(self.paths[0])), 'alpha')
+        self.assertEqual(cache.compiled, [self.paths[0], self.paths[0]])
+
+    def test_unwritable_cache_compiles_in_memory(self):
+        """A cache directory that can't be written still loads modules; warm() reports it"""
+        # A file where the cache directory should be (permissions don't stop root)
+        self.write(self.cache_dir, '')
+        cache = JacModuleCache(self.cache_dir, tag='test-1')
+        self.assertEqual(self.run_code(cache.load(self.paths[0])), 'alpha')
+        self.assertEqual(cache.compiled, [self.paths[0]])
+        status = cache.warm(self.paths)
+        self.assertTrue(status[self.paths[0]].startswith(('FileExistsError', 'NotADirectoryError')))
+
+
+if __name__ == '__main__':
+    unittest.main()
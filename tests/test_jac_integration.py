@@ -10,10 +10,25 @@ import sys
 import tempfile
 import shutil
 
+import git
+
 # Add aider to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from aider.jac_integration import JacIntegration
+from aider.io import InputOutput
+from aider.jac_integration import JacIntegration, JacIntegrationError, process_with_jac
+from aider.jac_worker import DEFAULT_CACHE_DIR, PROJECT_ROOT
+from aider.repo import GitRepo
+from aider.token_counter import TokenCounter
+
+LARGE_SOURCE = ''.join(
+    f'def handler_{i}(request):\n'
+    f'    """Handle request number {i} and return its response."""\n'
+    f'    # validate before dispatching\n'
+    f'    response = dispatch(request, {i})\n'
+    f'    return response\n\n\n'
+    for i in range(20)
+)
 
 
 class TestJacIntegrationAuthentic(unittest.TestCase):
@@ -33,12 +48,24 @@ class TestJacIntegrationAuthentic(unittest.TestCase):
             f.write('def helper(): return True')
         with open('config.json', 'w') as f:
             f.write('{"key": "value"}')
-            
+
+        # Real git repo for the session, as aider's main passes it in
+        repo = git.Repo.init(self.test_dir)
+        with repo.config_writer() as cfg:
+            cfg.set_value("user", "name", "Test User")
+            cfg.set_value("user", "email", "test@example.com")
+        repo.git.add(A=True)
+        repo.git.commit(m="initial")
+        self.repo = GitRepo(InputOutput(pretty=False, yes=True), None, self.test_dir)
+
         # Initialize real integration
-        self.integration = JacIntegration()
+        self.integration = JacIntegration(repo=self.repo)
     
     def tearDown(self):
         """Clean up real test files"""
+        self.integration.close()
+        if self.repo.repo_index:
+            self.repo.repo_index.close()
         os.chdir(self.original_cwd)
         shutil.rmtree(self.test_dir)
     
@@ -56,6 +83,16 @@ class TestJacIntegrationAuthentic(unittest.TestCase):
         self.assertIsNotNone(self.integration.jac_workspace)
         self.assertTrue(os.path.exists(os.path.dirname(self.integration.jac_workspace)))
     
+    def test_cache_dir_is_absolute_and_per_user_by_default(self):
+        """The compiled module cache stays out of the (possibly read-only) install directory"""
+        self.assertEqual(self.integration.cache_dir, DEFAULT_CACHE_DIR)
+        self.assertFalse(self.integration.cache_dir.startswith(PROJECT_ROOT + os.sep))
+
+        integration = JacIntegration(cache_dir=os.path.join('build', '..', 'cache'))
+        self.assertEqual(integration.cache_dir, os.path.join(os.getcwd(), 'cache'))
+        self.assertEqual(integration.bridge.cache_dir, integration.cache_dir)
+        integration.close()
+
     def test_real_command_handling(self):
         """Test command handling with real Jac commands"""
         # Real command processing - no mocking
@@ -146,6 +183,49 @@ class TestJacIntegrationAuthentic(unittest.TestCase):
         file_count = len([f for f in os.listdir('.') if f.endswith('.py')])
         self.assertEqual(file_count, 2)  # main.py and utils.py
 
+    def test_ranking_covers_the_session_repo(self):
+        """Ranking works over the loaded repo's tracked files, not aider's own tree"""
+        rankings = self.integration.get_repo_ranking(None, "helper")
+        self.assertEqual(sorted(rankings), ['config.json', 'main.py', 'utils.py'])
+        self.assertEqual(max(rankings, key=rankings.get), 'utils.py')
+
+    def test_optimize_command_honors_target(self):
+        """/jac optimize compresses a real file to its token target"""
+        with open('large.py', 'w') as f:
+            f.write(LARGE_SOURCE)
+        original_tokens = TokenCounter().count(LARGE_SOURCE)
+
+        result = self.integration.handle_command('/jac optimize large.py 300')
+        self.assertTrue(result['success'], result)
+        optimized = result['result']
+        self.assertEqual(optimized['original_tokens'], original_tokens)
+        self.assertLessEqual(optimized['optimized_tokens'], 300)
+        self.assertTrue(optimized['within_target'])
+        self.assertEqual(optimized['compression_level'], 'bodies')
+        self.assertIn('def handler_19(request):', optimized['optimized_content'])
+        self.assertNotIn('validate before dispatching', optimized['optimized_content'])
+
+        unchanged = self.integration.optimize_token_usage(LARGE_SOURCE, original_tokens)
+        self.assertEqual(unchanged['compression_level'], 'original')
+        self.assertEqual(unchanged['optimized_content'], LARGE_SOURCE)
+
+    def test_command_errors(self):
+        """Malformed commands come back as errors rather than exceptions"""
+        self.assertIn('Usage', self.integration.handle_command('/jac optimize large.py')['error'])
+        self.assertIn('Usage', self.integration.handle_command('/jac')['error'])
+        self.assertIn('Unknown Jac command', self.integration.handle_command('/jac frobnicate')['error'])
+        self.assertIn('Not a Jac command', self.integration.handle_command('/help')['error'])
+        self.assertIn('Optimization failed', self.integration.handle_command('/jac optimize missing.py 10')['error'])
+
+    def test_process_with_jac(self):
+        """Prompts are compressed only when given a target; responses pass through"""
+        self.assertEqual(process_with_jac(LARGE_SOURCE, mode='postprocess'), LARGE_SOURCE)
+        self.assertEqual(process_with_jac(LARGE_SOURCE, mode='preprocess'), LARGE_SOURCE)
+        compressed = process_with_jac(LARGE_SOURCE, mode='preprocess', target_tokens=300)
+        self.assertLessEqual(TokenCounter().count(compressed), 300)
+        with self.assertRaises(JacIntegrationError):
+            process_with_jac(LARGE_SOURCE, mode='translate')
+
 
 if __name__ == '__main__':
     print("🔥 Running 100% AUTHENTIC Jac Integration Tests - NO MOCKING!")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Tests for the OSP and MTP interfaces and their asyncio variants - NO MOCKING!
+Every test runs against a real temporary git repository.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import git
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.integration import JacBridge, MTPInterface, OSPInterface
+from aider.integration.osp_interface import OSPInterfaceError
+from aider.io import InputOutput
+from aider.jac_worker import default_worker_command
+from aider.repo import GitRepo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JAC_DIR = os.path.join(ROOT, "aider", "jac")
+
+
+def worker_can_import(modules):
+    return subprocess.run(
+        default_worker_command() + ["-c", f"import {modules}"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ).returncode == 0
+
+
+HAS_JACLANG = worker_can_import("jaclang")
+# Walkers' load_repo hooks open a GitRepo inside the worker
+HAS_JACLANG_AND_AIDER = HAS_JACLANG and worker_can_import("jaclang, aider.repo")
+
+JAC_OPS = """
+def double(n: int) -> int {
+    return n * 2;
+}
+
+def fail() -> int {
+    raise ValueError("boom");
+}
+"""
+
+
+class TestJacInterfaces(unittest.TestCase):
+    """Ranking, planning and validation, blocking and awaited"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+
+        self.git = git.Repo.init(self.test_dir)
+        with self.git.config_writer() as cfg:
+            cfg.set_value("user", "name", "Test User")
+            cfg.set_value("user", "email", "test@example.com")
+
+        self.write("app/__init__.py", "")
+        self.write("app/models.py", "class User:\n    pass\n\n\ndef load_user():\n    return User()\n")
+        self.write("app/views.py", "from app.models import load_user\n\n\ndef show():\n    return load_user()\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="initial")
+
+        self.repo = GitRepo(InputOutput(pretty=False, yes=True), None, self.test_dir)
+        self.bridge = JacBridge(self.test_dir)
+        self.bridge.load_repo(self.repo)
+        self.osp = OSPInterface(bridge=self.bridge)
+        self.mtp = MTPInterface(bridge=self.bridge)
+
+    def tearDown(self):
+        self.bridge.close()
+        if self.repo.repo_index:
+            self.repo.repo_index.close()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content):
+        path = Path(self.test_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def test_sync_interfaces(self):
+        scores = self.osp.rank_files(context="load_user", files=["app/views.py", "nope.py"])
+        self.assertEqual(scores["nope.py"], 0.0)
+        # A content match, plus a little structural weight for an unimported leaf
+        self.assertGreater(scores["app/views.py"], 0.3)
+        self.assertLess(scores["app/views.py"], 0.5)
+        self.assertEqual(self.osp.get_dependencies("app/views.py"), ["app/models.py"])
+        self.assertEqual(self.osp.list_functions("app/models.py"), ["User", "load_user"])
+        self.assertEqual(self.osp.search_nodes("user", "ClassNode"),
+                         [{"type": "ClassNode", "name": "User", "file": "app/models.py", "line": 1}])
+
+        self.write("app/views.py", "from app.missing import thing\n")
+        validation = self.mtp.validate_changes()
+        self.assertFalse(validation["valid"])
+        self.assertEqual(validation["errors"], ["app/views.py:1: unresolved import 'app.missing'"])
+        self.assertEqual(self.mtp.plan_task("fix the bug", "ctx")["context"], "ctx")
+
+    def test_no_ranking_without_a_loaded_repo(self):
+        # The workspace is inside a git repo, but only a loaded repo is ranked
+        bridge = JacBridge(self.test_dir)
+        result = bridge.call_walker("file_analysis", "get_osp_ranking", {"concept": "models"})
+        self.assertEqual(result["ranked_files"], [])
+        self.assertEqual(result["error"], "No git repository loaded")
+        with self.assertRaisesRegex(OSPInterfaceError, "No git repository loaded"):
+            OSPInterface(bridge=bridge).rank_files(context="models")
+
+    def test_call_many_keeps_order_and_isolates_errors(self):
+        results = self.bridge.call_many([
+            {"walker": "token_optimizer", "func": "optimize_prompt", "args": {"code": "x = 1  # one\n"}},
+            {"walker": "planning", "func": "autonomous_plan", "args": {"objective": None}},
+            {"walker": "no_such_walker", "func": "run"},
+            {"walker": "planning", "func": "autonomous_plan", "args": {"objective": "fix it"}},
+        ])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]["optimized_code"], "x = 1\n")
+        self.assertFalse(results[1]["success"])
+        self.assertIn("lower", results[1]["error"])
+        self.assertEqual(results[2], {"error": "Jac file no_such_walker.jac not found", "success": False})
+        self.assertEqual(results[3]["complexity"], "moderate")
+        self.assertEqual(self.bridge.call_many([]), [])
+
+    def test_walker_errors_when_no_worker_can_start(self):
+        self.write("ops.jac", JAC_OPS)
+        original = os.environ.get("AIDER_JAC_PYTHON")
+        os.environ["AIDER_JAC_PYTHON"] = os.path.join(self.test_dir, "no-python")
+        try:
+            bridge = JacBridge(self.test_dir)
+            result = bridge.call_walker("ops", "double", {"n": 2})
+        finally:
+            if original is None:
+                del os.environ["AIDER_JAC_PYTHON"]
+            else:
+                os.environ["AIDER_JAC_PYTHON"] = original
+        bridge.close()
+        self.assertFalse(result["success"])
+        self.assertIn("no-python", result["error"])
+
+    @unittest.skipUnless(HAS_JACLANG, "worker interpreter has no jaclang")
+    def test_call_many_interleaves_jac_and_python_calls(self):
+        self.write("ops.jac", JAC_OPS)
+        bridge = JacBridge(self.test_dir, cache_dir=os.path.join(self.test_dir, ".jac_cache"))
+        try:
+            results = bridge.call_many([
+                {"walker": "ops", "func": "double", "args": {"n": 1}},
+                {"walker": "planning", "func": "autonomous_plan", "args": {"objective": "fix it"}},
+                {"walker": "ops", "func": "fail"},
+                {"walker": "ops", "func": "double", "args": {"n": 2}},
+                {"walker": "ops", "func": "missing"},
+                {"walker": "ops", "func": "double", "args": {"n": 3}},
+            ], timeout=120)
+        finally:
+            bridge.close()
+
+        self.assertEqual([results[i] for i in (0, 3, 5)], [{"result": n, "success": True} for n in (2, 4, 6)])
+        self.assertEqual(results[1]["complexity"], "moderate")
+        self.assertFalse(results[2]["success"])
+        self.assertIn("ValueError: boom", results[2]["error"])
+        self.assertFalse(results[4]["success"])
+        self.assertIn("no function or walker method", results[4]["error"])
+
+    @unittest.skipUnless(HAS_JACLANG_AND_AIDER, "worker interpreter lacks jaclang or aider's dependencies")
+    def test_walkers_work_on_the_loaded_repo(self):
+        bridge = JacBridge(JAC_DIR, cache_dir=os.path.join(self.test_dir, ".jac_cache"))
+        bridge.load_repo(self.repo)
+        try:
+            gathered, dependents, recency, validated = bridge.call_many([
+                {"walker": "context_gatherer", "func": "gather_context",
+                 "args": {"query": "models", "max_items": 5}},
+                {"walker": "impact_analyzer", "func": "find_dependents", "args": {"file_path": "app/models.py"}},
+                {"walker": "ranking_algorithms", "func": "rank_by_recency",
+                 "args": {"items": ["nope.py", "app/models.py"]}},
+                {"walker": "validation_walker", "func": "validate_batch", "args": {"edits": [
+                    {"file": "app/new.py", "changes": {"content": "from app.models import User\n"}},
+                    {"file": "app/bad.py", "changes": {"content": "from app.missing import thing\n"}},
+                ]}},
+            ], timeout=120)
+        finally:
+            bridge.close()
+
+        self.assertEqual(gathered["result"], ["app/models.py"])
+        self.assertEqual(dependents["result"], {"app/views.py": 1})
+        # Only tracked files have history
+        self.assertEqual([entry["item"] for entry in recency["result"]], ["app/models.py", "nope.py"])
+        self.assertGreater(recency["result"][0]["score"], 0.0)
+        # Repo imports resolve against the loaded repo's module index
+        self.assertEqual([entry["errors"] for entry in validated["result"]],
+                         [[], ["app/bad.py:1: unresolved import 'app.missing'"]])
+
+    def test_async_variants_overlap_and_honor_deadlines(self):
+        async def scenario():
+            rankings, plan, validation, slept = await asyncio.gather(
+                self.osp.arank_files(context="models"),
+                self.mtp.aplan_task("create a user page"),
+                self.mtp.avalidate_changes(["app/views.py"]),
+                asyncio.sleep(0.2),
+            )
+            # Path match plus the full structural weight: views.py imports it
+            self.assertEqual(rankings["app/models.py"], 0.7)
+            self.assertEqual(plan["complexity"], "complex")
+            self.assertTrue(validation["valid"])
+
+            start = time.monotonic()
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.bridge.arun(time.sleep, 1.0, timeout=0.1)
+            self.assertLess(time.monotonic() - start, 0.5)
+
+            results = await self.bridge.acall_many([
+                {"walker": "planning", "func": "autonomous_plan", "args": {"objective": "fix it"}},
+                {"walker": "no_such_walker", "func": "run"},
+            ])
+            self.assertEqual(results[0]["complexity"], "moderate")
+            self.assertFalse(results[1]["success"])
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Tests for the Jac walkers - NO MOCKING!
+Every scenario runs the real .jac modules inside a Jac worker process.
+Skipped when the worker interpreter has no jaclang (set AIDER_JAC_PYTHON).
+"""
+
+import math
+import os
+import shutil
+import subprocess
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.jac_worker import JacWorkerError, JacWorkerPool, default_worker_command
+
+JAC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'aider', 'jac')
+
+WORKER_COMMAND = default_worker_command()
+HAS_JACLANG = subprocess.run(
+    WORKER_COMMAND + ['-c', 'import jaclang'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+).returncode == 0
+
+# Scenario functions run inside the worker, next to the walker modules
+SCENARIOS = '''
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, {jac_dir!r})
+
+from aider.import_graph import ImportGraph, parse_import_specs
+from aider.repo_index import git_blob_oid
+from context_gatherer import ContextGatherer
+from editing_walker import EditingWalker
+from file_nodes import file_graph_builder
+from planning_walker import PlanningWalker
+from ranking_algorithms import RankingWalker
+
+
+def read(base_dir, name):
+    with open(os.path.join(base_dir, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def edit(base_dir, tasks):
+    walker = EditingWalker(base_dir=base_dir)
+    for task in tasks:
+        walker.add_edit_task(**task)
+    dispatched = walker.apply_all()
+    return {{
+        "order": [task["id"] for task in dispatched],
+        "status": {{task["id"]: [task["status"], task.get("error")] for task in dispatched}},
+        "leftovers": sorted(name for name in os.listdir(base_dir) if ".tmp." in name),
+    }}
+
+
+def direct_edit(base_dir, file_path, code, search=""):
+    walker = EditingWalker(base_dir=base_dir)
+    task = walker.apply_edit_task(walker.add_edit_task(file_path, code, "direct", search=search))
+    return [task["status"], task.get("error")]
+
+
+class TrackedRepo:
+    # What load_repo uses of GitRepo: git's tracked files and a token count table
+    def __init__(self, root, costs):
+        self.root = root
+        self.costs = costs
+        self.requested = []
+
+    def get_tracked_file_set(self):
+        return set(subprocess.check_output(["git", "ls-files"], cwd=self.root, text=True).split())
+
+    def count_file_tokens(self, files):
+        self.requested.append(sorted(files))
+        return {{file: self.costs[file] for file in files}}
+
+
+def gather(base_dir, costs, query, max_items, token_budget):
+    repo = TrackedRepo(base_dir, costs)
+    walker = ContextGatherer()
+    walker.load_repo(repo)
+    scored = walker.score_candidates(walker.generate_candidates(), query)
+    return {{
+        "files": walker.files,
+        "scored": {{item["file"]: [item["score"], walker.calculate_relevance_score(item["file"], query)] for item in scored}},
+        "selected": walker.gather_context(query, max_items, token_budget),
+        "requested": repo.requested,
+    }}
+
+
+def indexed(docs):
+    walker = RankingWalker()
+    for path in sorted(docs):
+        walker.index_file(path, docs[path])
+    return walker
+
+
+def rank(docs, query, k=0):
+    walker = indexed(docs)
+    return {{
+        "scores": walker.index.bm25_scores(query),
+        "ranked": [entry["item"] for entry in walker.rank_by_relevance(sorted(docs), query, k)],
+    }}
+
+
+def reindex(docs, changes, removed, queries):
+    walker = indexed(docs)
+    for path in sorted(changes):
+        walker.index_file(path, changes[path])
+    for path in removed:
+        walker.remove_file(path)
+    final = dict(docs, **changes)
+    for path in removed:
+        del final[path]
+
+    def state(index):
+        return {{
+            "bm25": {{query: index.bm25_scores(query) for query in queries}},
+            "cosine": {{query: index.cosine_scores(query) for query in queries}},
+            "postings": index.postings,
+            "total_length": index.total_length,
+        }}
+
+    return {{"incremental": state(walker.index), "rebuilt": state(indexed(final).index)}}
+
+
+def plan(tasks, dependencies=None, int_keys=False):
+    # JSON object keys are always strings; int_keys restores integer ids
+    if int_keys:
+        dependencies = {{int(key): value for key, value in dependencies.items()}}
+    result = PlanningWalker().generate_plan(tasks, dependencies or {{}})
+    result["phases"] = [[task.get("name", task.get("id")) for task in phase["tasks"]] for phase in result["phases"]]
+    return result
+
+
+def plan_steps(tasks, dependencies=None):
+    # Each analysis on its own, and how often generate_plan builds the graph
+    walker = PlanningWalker()
+    build = walker.build_dependency_graph
+    builds = []
+    walker.build_dependency_graph = lambda *args: builds.append(1) or build(*args)
+    result = walker.generate_plan(tasks, dependencies or {{}})
+    standalone = PlanningWalker()
+    return {{
+        "graph_builds": len(builds),
+        "plan": [result["critical_path"], result["cycles"], result["risk_assessment"], len(result["phases"])],
+        "standalone": [
+            standalone.critical_path(tasks, dependencies)["tasks"],
+            standalone.find_cycles(tasks, dependencies),
+            standalone.assess_risk(tasks, dependencies),
+            len(standalone.organize_into_phases(tasks, dependencies)),
+        ],
+    }}
+
+
+class DirectoryRepo:
+    # What build_from_repo uses of GitRepo: a real ImportGraph over the directory's .py files
+    def __init__(self, root):
+        self.root = root
+        self.graph = ImportGraph()
+
+    def get_import_graph(self):
+        file_oids = {{name: git_blob_oid(read(self.root, name).encode()) for name in os.listdir(self.root)}}
+        self.graph.update(file_oids, lambda missing: {{oid: parse_import_specs(read(self.root, path)) for path, oid in missing}})
+        return self.graph
+
+
+def switch_graphs(base_dir, sources):
+    repo = DirectoryRepo(base_dir)
+    builder = file_graph_builder()
+    built = [builder.build_from_repo(repo)]
+    repo_edges = sorted(repo.graph.imports_of("a.py"))
+    built.append(builder.build_from_sources(sources))
+    return {{
+        "built": built,
+        "imports": {{path: builder.imports_of(path) for path in sorted(sources)}},
+        "repo_graph_untouched": sorted(repo.graph.imports_of("a.py")) == repo_edges,
+    }}
+'''
+
+
+@unittest.skipUnless(HAS_JACLANG, 'worker interpreter has no jaclang')
+class JacWalkerTestCase(unittest.TestCase):
+    """Shares one warm worker across a class's scenarios"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workspace = tempfile.mkdtemp()
+        with open(os.path.join(cls.workspace, 'scenarios.py'), 'w') as f:
+            f.write(SCENARIOS.format(jac_dir=JAC_DIR))
+        cls.pool = JacWorkerPool(cls.workspace, size=1, command=WORKER_COMMAND, cache_dir=None, timeout=120)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        shutil.rmtree(cls.workspace)
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content):
+        path = Path(self.test_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def read(self, name):
+        return (Path(self.test_dir) / name).read_text()
+
+    def scenario(self, func, **args):
+        return self.pool.call('scenarios', func, args)
+
+
+class TestEditingWalker(JacWalkerTestCase):
+    """Same-file edits combine in priority order; the highest priority wins"""
+
+    def test_search_replace_edits_combine_per_file(self):
+        self.write('app.py', 'def a():\n    return 1\n\n\ndef b():\n    return 2\n')
+        self.write('notes.txt', 'old\n')
+        result = self.scenario('edit', base_dir=self.test_dir, tasks=[
+            {'file_path': 'app.py', 'code': 'return 10', 'description': 'a', 'search': 'return 1\n', 'priority': 1},
+            {'file_path': 'app.py', 'code': 'return 20', 'description': 'b', 'search': 'return 2', 'priority': 3},
+            {'file_path': 'notes.txt', 'code': 'new\n', 'description': 'notes', 'priority': 2},
+        ])
+        self.assertEqual(result['order'], ['edit_1', 'edit_2', 'edit_0'])
+        self.assertEqual({status for status, error in result['status'].values()}, {'completed'})
+        self.assertEqual(self.read('app.py'), 'def a():\n    return 10\n\ndef b():\n    return 20\n')
+        self.assertEqual(self.read('notes.txt'), 'new\n')
+        self.assertEqual(result['leftovers'], [])
+
+    def test_highest_priority_edit_wins(self):
+        self.write('app.py', 'VALUE = 1\n')
+        result = self.scenario('edit', base_dir=self.test_dir, tasks=[
+            {'file_path': 'app.py', 'code': 'VALUE = 2\n', 'description': 'low', 'priority': 1},
+            {'file_path': 'app.py', 'code': 'VALUE = 3', 'description': 'high', 'search': 'VALUE = 1', 'priority': 5},
+            {'file_path': 'app.py', 'code': 'VALUE = 4', 'description': 'mid', 'search': 'VALUE = 1', 'priority': 2},
+            {'file_path': 'app.py', 'code': 'def broken(:\n', 'description': 'bad', 'search': 'VALUE', 'priority': 9},
+        ])
+        self.assertEqual(self.read('app.py'), 'VALUE = 3\n')
+        self.assertEqual(result['status'], {
+            'edit_3': ['failed', 'Validation failed'],
+            'edit_1': ['completed', None],
+            'edit_2': ['failed', 'Search text not found'],
+            'edit_0': ['failed', 'Superseded by a higher-priority edit'],
+        })
+
+    def test_edits_keep_line_endings_and_permissions(self):
+        path = self.write('run.sh', '')
+        path.write_bytes(b'#!/bin/sh\r\necho old\r\n')
+        path.chmod(0o755)
+        self.assertEqual(
+            self.scenario('direct_edit', base_dir=self.test_dir, file_path='run.sh', code='echo new', search='echo old'),
+            ['completed', None],
+        )
+        self.assertEqual(path.read_bytes(), b'#!/bin/sh\r\necho new\r\n')
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o755)
+
+    def test_failed_write_leaves_no_temp_file(self):
+        self.write('target/keep.txt', 'x\n')
+        # A directory where the file should be: os.replace fails after the temp file is written
+        self.assertEqual(
+            self.scenario('direct_edit', base_dir=self.test_dir, file_path='target', code='content\n')[0], 'failed'
+        )
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ['target'])
+
+        self.assertEqual(self.scenario('direct_edit', base_dir=self.test_dir, file_path='new/file.txt',
+                                       code='hello\n'), ['completed', None])
+        self.assertEqual(self.read('new/file.txt'), 'hello\n')
+
+
+class TestPlanningWalker(JacWalkerTestCase):
+    """Tasks are phased by dependencies; unschedulable tasks are reported"""
+
+    def test_integer_ids_keep_their_edges(self):
+        tasks = [{'id': 1}, {'id': 2, 'dependencies': [1]}, {'id': 3}, {'id': 4}]
+        result = self.scenario('plan', tasks=tasks, dependencies={'4': [2, 3]}, int_keys=True)
+        self.assertEqual(result['phases'], [[1, 3], [2], [4]])
+        self.assertEqual(result['critical_path'], ['1', '2', '4'])
+        self.assertEqual(result['dependency_count'], 3)
+        self.assertEqual(result['blocked_tasks'], [])
+
+    def test_cyclic_and_downstream_tasks_are_reported(self):
+        tasks = [
+            {'name': 'setup'},
+            {'name': 'a', 'dependencies': ['setup', 'b']},
+            {'name': 'b', 'dependencies': ['a']},
+            {'name': 'deploy', 'dependencies': ['b']},
+            {'name': 'docs', 'dependencies': ['setup']},
+        ]
+        result = self.scenario('plan', tasks=tasks)
+        self.assertEqual(result['phases'], [['setup'], ['docs']])
+        self.assertEqual(result['blocked_tasks'], ['a', 'b', 'deploy'])
+        self.assertEqual(result['cycles'], [['a', 'b', 'a']])
+        self.assertEqual(result['risk_assessment'], 'critical')
+
+    def test_plan_builds_the_graph_once(self):
+        tasks = [{'name': 'a'}, {'name': 'b', 'dependencies': ['a', 'c']}, {'name': 'c', 'dependencies': ['b']}]
+        result = self.scenario('plan_steps', tasks=tasks, dependencies={'a': ['c']})
+        self.assertEqual(result['graph_builds'], 1)
+        self.assertEqual(result['plan'], result['standalone'])
+        self.assertEqual(result['plan'][1], [['a', 'c', 'b', 'a']])
+        # Without a dependency map, only the tasks' own lists count
+        self.assertEqual(self.scenario('plan_steps', tasks=tasks)['standalone'], [['a'], [['b', 'c', 'b']], 'critical', 1])
+
+    def test_duplicate_names_are_rejected(self):
+        with self.assertRaisesRegex(JacWorkerError, 'Duplicate task name: build'):
+            self.scenario('plan', tasks=[{'name': 'build'}, {'id': 'build'}])
+
+
+class TestContextGatherer(JacWalkerTestCase):
+    """Tracked files are scored against the query and picked best-first within the budget"""
+
+    COSTS = {
+        'api/auth.py': 100,
+        'core/auth.py': 900,
+        'docs/auth.md': 5000,
+        'main_auth.py': 300,
+        'utils.py': 10,
+        'zz/auth_extra.py': 50,
+    }
+
+    def setUp(self):
+        super().setUp()
+        for name in self.COSTS:
+            self.write(name, '# ' + name + '\n')
+        self.write('scratch_auth.py', '# untracked\n')
+        subprocess.run(['git', 'init', '-q', self.test_dir], check=True)
+        subprocess.run(['git', 'add', *self.COSTS], cwd=self.test_dir, check=True)
+
+    def gather(self, max_items, token_budget):
+        return self.scenario('gather', base_dir=self.test_dir, costs=self.COSTS, query='AUTH',
+                             max_items=max_items, token_budget=token_budget)
+
+    def test_scores_tracked_matches(self):
+        result = self.gather(3, 1500)
+        self.assertEqual(result['files'], sorted(self.COSTS))
+        # Matches score 0.8, plus 0.2 for "main" or "core"; the inlined
+        # scoring agrees with calculate_relevance_score
+        self.assertEqual(result['scored'], {
+            'api/auth.py': [0.8, 0.8],
+            'core/auth.py': [1.0, 1.0],
+            'docs/auth.md': [0.8, 0.8],
+            'main_auth.py': [1.0, 1.0],
+            'zz/auth_extra.py': [0.8, 0.8],
+        })
+
+    def test_top_k_costs_only_what_it_pops(self):
+        # Best first, ties by path; only the first max_items are costed
+        result = self.gather(3, 1500)
+        self.assertEqual(result['selected'], ['core/auth.py', 'main_auth.py', 'api/auth.py'])
+        self.assertEqual(result['requested'], [['api/auth.py', 'core/auth.py', 'main_auth.py']])
+
+    def test_over_budget_items_are_skipped(self):
+        # main_auth.py and docs/auth.md don't fit; the next batch fills the gap
+        result = self.gather(3, 1100)
+        self.assertEqual(result['selected'], ['core/auth.py', 'api/auth.py', 'zz/auth_extra.py'])
+        self.assertEqual(result['requested'], [
+            ['api/auth.py', 'core/auth.py', 'main_auth.py'],
+            ['docs/auth.md', 'zz/auth_extra.py'],
+        ])
+        # Popping continues until something fits
+        self.assertEqual(self.gather(2, 50)['selected'], ['zz/auth_extra.py'])
+
+
+class TestRankingWalker(JacWalkerTestCase):
+    """BM25 over the inverted index, kept current one file at a time"""
+
+    # Each document is its path plus content: lengths 4, 3 and 5, average 4
+    DOCS = {
+        'one': 'apple apple banana',
+        'two': 'apple cherry',
+        'three': 'banana cherry cherry cherry',
+    }
+
+    def assertScores(self, actual, expected):
+        self.assertEqual(sorted(actual), sorted(expected))
+        for doc in expected:
+            self.assertAlmostEqual(actual[doc], expected[doc], places=9)
+
+    def test_bm25_matches_hand_computed_scores(self):
+        # apple and cherry each appear in 2 of 3 documents: idf = ln(1 + 1.5 / 2.5)
+        idf = math.log(1.6)
+
+        def term(tf, length, k1=1.2, b=0.75):
+            return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / 4))
+
+        result = self.scenario('rank', docs=self.DOCS, query='apple')
+        self.assertScores(result['scores'], {'one': term(2, 4), 'two': term(1, 3)})
+        self.assertEqual(result['ranked'], ['one', 'two'])
+
+        # two matches both terms once; three's cherry x3 is damped by its length
+        result = self.scenario('rank', docs=self.DOCS, query='Apple cherry')
+        self.assertScores(result['scores'], {
+            'one': term(2, 4),
+            'two': term(1, 3) * 2,
+            'three': term(3, 5),
+        })
+        self.assertEqual(result['ranked'], ['two', 'three', 'one'])
+        self.assertEqual(self.scenario('rank', docs=self.DOCS, query='cherry apple', k=2)['ranked'], ['two', 'three'])
+
+    def test_incremental_updates_match_a_rebuild(self):
+        result = self.scenario(
+            'reindex',
+            docs=self.DOCS,
+            changes={'two': 'banana banana durian', 'four': 'apple durian fetchApple'},
+            removed=['three'],
+            queries=['apple', 'banana durian', 'cherry', 'fetch three'],
+        )
+        incremental, rebuilt = result['incremental'], result['rebuilt']
+        self.assertEqual(incremental['postings'], rebuilt['postings'])
+        self.assertEqual(incremental['total_length'], rebuilt['total_length'])
+        for kind in ('bm25', 'cosine'):
+            for query, scores in rebuilt[kind].items():
+                self.assertScores(incremental[kind][query], scores)
+        self.assertEqual(rebuilt['bm25']['cherry'], {})
+        self.assertEqual(sorted(rebuilt['bm25']['apple']), ['four', 'one'])
+
+
+class TestFileGraphBuilder(JacWalkerTestCase):
+    """Switching from a repo's graph to in-memory sources re-reads unchanged files"""
+
+    def test_sources_after_repo(self):
+        self.write('a.py', 'import b\n')
+        self.write('b.py', 'x = 1\n')
+        self.write('c.py', 'import a\n')
+        result = self.scenario('switch_graphs', base_dir=self.test_dir, sources={
+            'a.py': 'import c\n', 'b.py': 'x = 1\n', 'c.py': 'import a\n',
+        })
+        self.assertEqual(result['built'], [3, 1])
+        self.assertEqual(result['imports'], {'a.py': ['c.py'], 'b.py': [], 'c.py': ['a.py']})
+        self.assertTrue(result['repo_graph_untouched'])
+
+
+if __name__ == '__main__':
+    unittest.main()
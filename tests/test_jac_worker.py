@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent Jac worker pool - NO MOCKING!
+Every test talks to real worker processes over the JSON-lines protocol.
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import git
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.jac_worker import JacWorkerError, JacWorkerPool
+
+# Plain Python modules load through the same path as compiled Jac modules
+WALKER_SOURCE = '''
+import os
+import sys
+import time
+
+CALLS = []
+
+print("entry output")
+
+
+def add(a, b):
+    CALLS.append((a, b))
+    return {"sum": a + b, "pid": os.getpid(), "calls": len(CALLS), "tags": {"x"}}
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def crash(message):
+    sys.stderr.write(message + "\\n")
+    sys.stderr.flush()
+    os._exit(3)
+
+
+class RepoProbe:
+    def __init__(self):
+        self.repo = None
+
+    def load_repo(self, repo):
+        self.repo = repo
+
+    def tracked(self):
+        if self.repo is None:
+            return None
+        return {"files": sorted(self.repo.get_tracked_file_set()), "repo_id": id(self.repo)}
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def bump(self, times=1):
+        self.count += times
+        return self.count
+'''
+
+
+class TestJacWorkerPool(unittest.TestCase):
+    """Warm workers answer id-tagged calls and survive errors"""
+
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        with open(os.path.join(self.workspace, 'sample.py'), 'w') as f:
+            f.write(WALKER_SOURCE)
+        with open(os.path.join(self.workspace, 'greet.py'), 'w') as f:
+            f.write('print("hello " + name)\n')
+        self.pool = JacWorkerPool(self.workspace, size=1, command=[sys.executable], preload=['sample'], cache_dir=None)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.workspace)
+
+    def test_calls_reuse_a_warm_worker(self):
+        """Module state persists across calls; walker instances are fresh per call"""
+        first = self.pool.call('sample', 'add', {'a': 1, 'b': 2})
+        second = self.pool.call('sample', 'add', {'a': 3, 'b': 4})
+        self.assertEqual(first['sum'], 3)
+        self.assertEqual(first['tags'], ['x'])
+        self.assertEqual(second['pid'], first['pid'])
+        self.assertEqual(second['calls'], 2)
+
+        self.assertEqual(self.pool.call('sample', 'bump', {'times': 2}), 2)
+        self.assertEqual(self.pool.call('sample', 'bump'), 1)
+        self.assertEqual(self.pool.run('sample.py'), 'entry output\n')
+        self.assertEqual(self.pool.run('greet.py', {'name': 'jac'}), 'hello jac\n')
+
+    def test_errors_and_timeouts(self):
+        """Failed calls raise without killing the worker; stuck workers are replaced"""
+        with self.assertRaisesRegex(JacWorkerError, 'no function or walker method'):
+            self.pool.call('sample', 'missing')
+        with self.assertRaisesRegex(JacWorkerError, 'TypeError'):
+            self.pool.call('sample', 'add', {'a': 1})
+        pid = self.pool.call('sample', 'add', {'a': 0, 'b': 0})['pid']
+
+        with self.assertRaisesRegex(JacWorkerError, 'timed out'):
+            self.pool.call('sample', 'sleep', {'seconds': 30}, timeout=0.5)
+        self.assertNotEqual(self.pool.call('sample', 'add', {'a': 0, 'b': 0})['pid'], pid)
+
+    def test_walkers_get_the_repo(self):
+        """With a repo root, load_repo hooks get one GitRepo kept by the worker"""
+        self.assertIsNone(self.pool.call('sample', 'tracked'))
+
+        repo_dir = os.path.join(self.workspace, 'project')
+        os.makedirs(os.path.join(repo_dir, 'app'))
+        for name in ('app/a.py', 'b.py'):
+            with open(os.path.join(repo_dir, name), 'w') as f:
+                f.write('x = 1\n')
+        repo = git.Repo.init(repo_dir)
+        repo.index.add(['app/a.py', 'b.py'])
+
+        self.pool.repo_root = repo_dir
+        first = self.pool.call('sample', 'tracked')
+        self.assertEqual(first['files'], ['app/a.py', 'b.py'])
+        batch = self.pool.call_many([{'walker': 'sample', 'func': 'tracked'}] * 2)
+        self.assertEqual([entry['result'] for entry in batch], [first, first])
+
+    def test_timeout_only_fails_its_own_call(self):
+        """Calls queue behind a busy worker and survive another call's timeout"""
+        pid = self.pool.call('sample', 'add', {'a': 0, 'b': 0})['pid']
+        results = {}
+
+        def stuck():
+            try:
+                self.pool.call('sample', 'sleep', {'seconds': 30}, timeout=0.5)
+            except JacWorkerError as err:
+                results['stuck'] = err
+
+        thread = threading.Thread(target=stuck)
+        thread.start()
+        time.sleep(0.2)
+        results['queued'] = self.pool.call('sample', 'add', {'a': 1, 'b': 2})
+        thread.join()
+
+        self.assertIn('timed out', str(results['stuck']))
+        self.assertEqual(results['queued']['sum'], 3)
+        self.assertNotEqual(results['queued']['pid'], pid)
+        self.assertEqual(len(self.pool.workers), 1)
+
+    def test_worker_stderr_is_reported(self):
+        """A worker that dies reports its exit status and the end of its stderr"""
+        with self.assertRaisesRegex(JacWorkerError, r'exited with status 3:\n.*fatal: disk on fire'):
+            self.pool.call('sample', 'crash', {'message': 'fatal: disk on fire'})
+        self.assertEqual(self.pool.call('sample', 'add', {'a': 1, 'b': 1})['sum'], 2)
+
+    def test_worker_that_cannot_start_fails_its_requests(self):
+        """Starting a worker raises OSError: the request fails instead of staying queued"""
+        pool = JacWorkerPool(self.workspace, size=1, command=[os.path.join(self.workspace, 'no-python')])
+        try:
+            with self.assertRaises(FileNotFoundError):
+                pool.call('sample', 'add', {'a': 1, 'b': 2}, timeout=5)
+            results = pool.call_many([{'walker': 'sample', 'func': 'add', 'args': {'a': 1, 'b': 2}}], timeout=5)
+            self.assertFalse(results[0]['ok'])
+            self.assertIn('no-python', results[0]['error'])
+            self.assertEqual(len(pool._queue), 0)
+            self.assertEqual(pool.workers, [])
+        finally:
+            pool.close()
+
+    def test_worker_runs_without_aider_dependencies(self):
+        """The worker and its module cache need only the standard library (-S: no site-packages)"""
+        cache_dir = tempfile.mkdtemp()
+        pool = JacWorkerPool(self.workspace, size=1, command=[sys.executable, '-S'], cache_dir=cache_dir)
+        try:
+            self.assertEqual(pool.call('sample', 'add', {'a': 1, 'b': 2})['sum'], 3)
+        finally:
+            pool.close()
+            shutil.rmtree(cache_dir)
+
+    def test_batch_runs_concurrently_in_one_round_trip(self):
+        """Results come back in input order, with errors in place"""
+        calls = [{'walker': 'sample', 'func': 'sleep', 'args': {'seconds': 0.5}} for _ in range(4)]
+        calls.insert(1, {'walker': 'sample', 'func': 'missing'})
+        calls.append({'walker': 'no_such_walker', 'func': 'add', 'args': {'a': 1, 'b': 1}})
+        calls.append({'walker': 'sample', 'func': 'add', 'args': {'a': 2, 'b': 3}})
+
+        self.pool.call('sample', 'add', {'a': 0, 'b': 0})
+        start = time.monotonic()
+        results = self.pool.call_many(calls)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+        self.assertEqual([entry['ok'] for entry in results], [True, False, True, True, True, False, True])
+        self.assertEqual(results[0]['result'], 0.5)
+        self.assertIn('no function or walker method', results[1]['error'])
+        self.assertIn('ModuleNotFoundError', results[5]['error'])
+        self.assertEqual(results[6]['result']['sum'], 5)
+        self.assertEqual(self.pool.call_many([]), [])
+
+    def test_async_calls_deadlines_and_cancellation(self):
+        """Awaited calls overlap; cancelling keeps the worker, a missed deadline replaces it"""
+        async def scenario():
+            pid = (await self.pool.acall('sample', 'add', {'a': 1, 'b': 1}))['pid']
+
+            start = time.monotonic()
+            slept = await asyncio.gather(*(
+                self.pool.acall_many([{'walker': 'sample', 'func': 'sleep', 'args': {'seconds': 0.4}}] * 2)
+                for _ in range(2)
+            ))
+            self.assertLess(time.monotonic() - start, 1.2)
+            self.assertEqual([entry['result'] for batch in slept for entry in batch], [0.4] * 4)
+
+            task = asyncio.ensure_future(self.pool.acall('sample', 'sleep', {'seconds': 0.3}))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual((await self.pool.acall('sample', 'add', {'a': 0, 'b': 0}))['pid'], pid)
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.pool.acall('sample', 'sleep', {'seconds': 30}, timeout=0.3)
+            self.assertNotEqual((await self.pool.acall('sample', 'add', {'a': 0, 'b': 0}))['pid'], pid)
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+"""
+Tests for GitRepo repo map support - NO MOCKING!
+Every test runs against a real temporary git repository.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import git
+
+# Add aider to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aider.import_graph import ImportGraph, parse_import_specs
+from aider.io import InputOutput
+from aider.repo import GitRepo
+from aider.repo_index import RepoIndex, RepoIndexError, git_blob_oid
+
+
+class WordModel:
+    """A model whose tokenizer counts whitespace-separated words"""
+
+    name = "word-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def tokenizer(self, text):
+        self.calls += 1
+        return text.split()
+
+
+class TestRepoMap(unittest.TestCase):
+    """Repo map behaviour against real git repositories"""
+
+    def setUp(self):
+        """Create a real git repo with a few committed files"""
+        self.test_dir = tempfile.mkdtemp()
+        self.original_cwd = os.getcwd()
+        os.chdir(self.test_dir)
+
+        self.git = git.Repo.init(self.test_dir)
+        with self.git.config_writer() as cfg:
+            cfg.set_value("user", "name", "Test User")
+            cfg.set_value("user", "email", "test@example.com")
+
+        self.write("main.py", "import utils\n\n\ndef main():\n    utils.helper()\n")
+        self.write("utils.py", "def helper():\n    return True\n\n\nclass Config:\n    pass\n")
+        self.write("docs/notes.md", "# Notes\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="initial")
+
+        self.io = InputOutput(pretty=False, yes=True)
+        self.repo = GitRepo(self.io, None, self.test_dir)
+
+    def tearDown(self):
+        """Clean up the real repository"""
+        if self.repo.repo_index:
+            self.repo.repo_index.close()
+        os.chdir(self.original_cwd)
+        shutil.rmtree(self.test_dir)
+
+    def write(self, name, content):
+        path = Path(self.test_dir) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        return path
+
+    def test_blob_oids_match_git(self):
+        """Blob OIDs come straight from the git index"""
+        oids = self.repo.get_blob_oids()
+        self.assertEqual(set(oids), {"main.py", "utils.py", str(Path("docs/notes.md"))})
+
+        content = Path(self.test_dir, "utils.py").read_bytes()
+        self.assertEqual(oids["utils.py"], git_blob_oid(content))
+        self.assertEqual(oids["utils.py"], self.git.git.hash_object("utils.py"))
+
+    def test_repo_map_is_persisted_by_blob(self):
+        """A second GitRepo reuses the on-disk index instead of re-reading files"""
+        repo_map = self.repo.get_repo_map(include_content=False)
+        info = repo_map["other_files"]["utils.py"]
+        self.assertEqual(info["symbols"], ["helper", "Config"])
+
+        index_path = Path(self.test_dir) / ".aider" / "repo_index.db"
+        self.assertTrue(index_path.exists())
+
+        oid = self.repo.get_blob_oids()["utils.py"]
+        self.repo.repo_index.close()
+        self.repo.repo_index = None
+
+        index = RepoIndex(self.test_dir)
+        try:
+            record = index.get(oid)
+        finally:
+            index.close()
+        self.assertIsNotNone(record)
+        self.assertEqual(record["symbols"], ["helper", "Config"])
+        self.assertEqual(record["size"], len(Path(self.test_dir, "utils.py").read_bytes()))
+
+    def test_dirty_file_is_reindexed(self):
+        """Editing a file changes its blob, so fresh metadata is computed"""
+        self.repo.get_repo_map(include_content=False)
+        self.write("utils.py", "def other():\n    return False\n")
+
+        repo_map = self.repo.get_repo_map(include_content=False)
+        self.assertEqual(repo_map["other_files"]["utils.py"]["symbols"], ["other"])
+
+    def test_status_snapshot_matches_git(self):
+        """Snapshot answers agree with per-path git queries"""
+        self.write("main.py", "print('changed')\n")
+        self.write("utils.py", "def helper():\n    return False\n")
+        self.git.git.add("utils.py")
+        self.write("scratch.py", "x = 1\n")
+
+        expected = {
+            name: self.repo.is_dirty(name)
+            for name in ["main.py", "utils.py", "docs/notes.md", "scratch.py"]
+        }
+        self.assertEqual(sorted(self.repo.get_dirty_files()), ["main.py", "utils.py"])
+
+        with self.repo.status_snapshot() as snapshot:
+            self.assertIn("utils.py", snapshot.staged)
+            self.assertIn("main.py", snapshot.unstaged)
+            for name, dirty in expected.items():
+                self.assertEqual(self.repo.is_dirty(name), dirty, name)
+            self.assertTrue(self.repo.is_dirty())
+            self.assertFalse(self.repo.path_in_repo("scratch.py"))
+
+    def test_repo_map_uses_one_snapshot(self):
+        """is_dirty inside a map build never falls back to git subprocesses"""
+        self.write("main.py", "print('changed')\n")
+        calls = []
+        original = self.repo.get_status_snapshot
+
+        def counting_snapshot():
+            if self.repo._status_snapshot is None:
+                calls.append(1)
+            return original()
+
+        self.repo.get_status_snapshot = counting_snapshot
+        repo_map = self.repo.get_repo_map(include_content=False)
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(repo_map["other_files"]["main.py"]["is_dirty"])
+        self.assertFalse(repo_map["other_files"]["utils.py"]["is_dirty"])
+        self.assertEqual(repo_map["metadata"]["dirty_files"], ["main.py"])
+
+    def test_iter_repo_map_matches_repo_map(self):
+        """Streaming entries carry the same data as the full map"""
+        repo_map = self.repo.get_repo_map(current_files=["main.py"])
+        entries = {
+            info["path"]: info
+            for info in self.repo.iter_repo_map(current_files=["main.py"], max_workers=2)
+        }
+
+        self.assertEqual(set(entries), {"main.py", "utils.py", str(Path("docs/notes.md"))})
+        self.assertTrue(entries["main.py"]["is_current"])
+        self.assertFalse(entries["utils.py"]["is_current"])
+        self.assertEqual(entries["utils.py"]["content"], repo_map["other_files"]["utils.py"]["content"])
+        self.assertEqual(entries["main.py"]["token_count"], repo_map["current_files"]["main.py"]["token_count"])
+
+    def test_cold_iter_repo_map_indexes_every_blob(self):
+        """Pool threads share one index opened up front; every blob gets indexed"""
+        for i in range(200):
+            self.write(f"pkg/mod_{i}.py", f"def f_{i}():\n    return {i}\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="modules")
+
+        entries = list(self.repo.iter_repo_map(max_workers=8))
+        self.assertEqual(len(entries), 203)
+        self.assertIsNone(self.repo.repo_index_error)
+        oids = set(self.repo.get_blob_oids().values())
+        self.assertEqual(len(self.repo.repo_index.get_many(oids)), len(oids))
+
+        # Separate connections creating a fresh database wait for each other
+        errors = []
+
+        def open_index():
+            try:
+                RepoIndex(self.test_dir, path=Path(self.test_dir, "fresh.db")).close()
+            except RepoIndexError as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=open_index) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_iter_repo_map_stops_at_token_budget(self):
+        """The generator stops as soon as the token budget would be exceeded"""
+        for i in range(30):
+            self.write(f"pkg/mod_{i}.py", "x = 1\n" * 40)
+        self.git.git.add(A=True)
+        self.git.git.commit(m="modules")
+
+        budget = 200
+        entries = list(self.repo.iter_repo_map(token_budget=budget, max_workers=4))
+        used = sum(info["token_count"] for info in entries)
+
+        self.assertLessEqual(used, budget)
+        self.assertLess(len(entries), 33)
+
+    def test_repo_tree_is_patched_incrementally(self):
+        """Commits and staged files patch the cached tree instead of rebuilding it"""
+        tree = self.repo.get_repo_tree()
+        self.assertEqual(len(tree), 3)
+        structure = self.repo.get_repo_structure()
+        self.assertEqual(structure["docs"]["type"], "directory")
+        self.assertEqual(structure["docs"]["children"]["notes.md"]["path"], os.path.join("docs", "notes.md"))
+        self.assertEqual(structure["utils.py"]["extension"], ".py")
+        self.assertEqual(structure.to_dict(), tree.to_dict(path_sep=os.sep))
+
+        self.write("pkg/new.py", "y = 2\n")
+        self.git.git.add("pkg/new.py")
+        self.assertIs(self.repo.get_repo_tree(), tree)
+        self.assertIn("pkg/new.py", tree)
+
+        self.git.git.rm("docs/notes.md")
+        self.git.git.commit(m="move things")
+        self.assertIs(self.repo.get_repo_tree(), tree)
+        self.assertNotIn("docs/notes.md", tree)
+        self.assertIn("pkg/new.py", tree)
+        # The structure is a view of the patched tree, not a stale copy
+        self.assertNotIn("docs", structure)
+        self.assertEqual(structure["pkg"]["children"]["new.py"]["type"], "file")
+
+        self.write("staged.py", "z = 3\n")
+        self.git.git.add("staged.py")
+        self.repo.get_repo_tree()
+        self.git.git.rm("--cached", "staged.py")
+        self.repo.get_repo_tree()
+        self.assertNotIn("staged.py", tree)
+
+        self.assertEqual(sorted(tree.iter_paths()), sorted(
+            p.replace(os.sep, "/") for p in self.repo.get_tracked_files()
+        ))
+
+    def test_tracked_files_cached_by_index_state(self):
+        """The tracked set is reused until HEAD or the index changes"""
+        tracked = self.repo.get_tracked_file_set()
+        self.assertEqual(tracked, {"main.py", "utils.py", str(Path("docs/notes.md"))})
+        self.assertIs(self.repo.get_tracked_file_set(), tracked)
+        tree = self.repo.get_repo_tree()
+
+        # Editing the work tree does not touch the index
+        self.write("main.py", "print('changed')\n")
+        self.assertIs(self.repo.get_tracked_file_set(), tracked)
+
+        self.write("new.py", "n = 1\n")
+        self.git.git.add("new.py")
+        self.git.git.rm("--cached", "utils.py")
+        tracked = self.repo.get_tracked_file_set()
+        self.assertIn("new.py", tracked)
+        self.assertNotIn("utils.py", tracked)
+        self.assertFalse(self.repo.path_in_repo("utils.py"))
+        self.assertIs(self.repo.get_repo_tree(), tree)
+        self.assertEqual(set(tree.iter_paths()), {
+            p.replace(os.sep, "/") for p in tracked
+        })
+
+    def test_ignore_matcher_filters_in_bulk(self):
+        """aiderignore and subtree-only rules apply to whole listings"""
+        ignore_file = self.write(".aiderignore", "docs/\n")
+        repo = GitRepo(self.io, None, self.test_dir, aider_ignore_file=str(ignore_file))
+        self.assertEqual(sorted(repo.get_tracked_file_set()), ["main.py", "utils.py"])
+
+        matcher = repo.get_ignore_matcher()
+        paths = [f"pkg/mod_{i}.py" for i in range(1000)] + ["docs/a.md", "build/x.o"]
+        matcher.set_patterns(["docs/", "*.o"])
+        self.assertEqual(matcher.filter_paths(paths), paths[:1000])
+        self.assertTrue(matcher.is_ignored("build/x.o"))
+
+        # Appending patterns keeps ignored results; negations reset them
+        matcher.set_patterns(["docs/", "*.o", "pkg/mod_1.py"])
+        self.assertEqual(matcher._cache["build/x.o"], True)
+        self.assertNotIn("pkg/mod_2.py", matcher._cache)
+        matcher.set_patterns(["docs/", "*.o", "!build/x.o"])
+        self.assertEqual(matcher._cache, {})
+        self.assertFalse(matcher.is_ignored("build/x.o"))
+
+        subtree = GitRepo(self.io, None, self.test_dir, subtree_only=True)
+        os.chdir(Path(self.test_dir) / "docs")
+        self.assertEqual(sorted(subtree.get_tracked_file_set()), [str(Path("docs/notes.md"))])
+        self.assertTrue(subtree.ignored_file("main.py"))
+        os.chdir(self.test_dir)
+        self.assertFalse(subtree.ignored_file("main.py"))
+
+    def test_file_history_is_scanned_incrementally(self):
+        """History comes from one git log pass and later runs scan only new commits"""
+        self.write("utils.py", "def helper():\n    return 1\n")
+        self.git.git.commit("-am", "touch utils")
+
+        history = self.repo.get_file_history()
+        self.assertEqual(history["utils.py"][1], 2)
+        self.assertEqual(history["main.py"][1], 1)
+        self.assertGreaterEqual(history["utils.py"][0], history["main.py"][0])
+
+        self.write("main.py", "print('again')\n")
+        self.git.git.commit("-am", "touch main")
+        head = self.repo.get_head_commit_sha()
+
+        scanned = []
+        original = self.repo._scan_file_history
+
+        def recording_scan(rev_range):
+            scanned.append(rev_range)
+            return original(rev_range)
+
+        # A fresh GitRepo resumes from the persisted tip
+        self.repo.repo_index.close()
+        repo = GitRepo(self.io, None, self.test_dir)
+        repo._scan_file_history = recording_scan
+        history = repo.get_file_history()
+        repo.repo_index.close()
+
+        self.assertEqual(len(scanned), 1)
+        self.assertTrue(scanned[0].endswith(".." + head))
+        self.assertEqual(history["main.py"][1], 2)
+        self.assertEqual(history["utils.py"][1], 2)
+        self.repo.repo_index = None
+
+    def test_related_files_use_exact_imports(self):
+        """Imports resolve to real modules, with no substring false positives"""
+        self.write("docs/os_notes.md", "# os\n")
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/core.py", "import os\nfrom . import helpers\nfrom .models import Model\n")
+        self.write("pkg/helpers.py", "def assist():\n    pass\n")
+        self.write("pkg/models.py", "class Model:\n    pass\n")
+        self.write("app.py", "from pkg.core import run\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="package")
+
+        related = self.repo.get_related_files(["pkg/core.py"])
+        self.assertEqual(related[:2], [str(Path("pkg/helpers.py")), str(Path("pkg/models.py"))])
+        self.assertIn("app.py", related)
+        self.assertNotIn(str(Path("docs/os_notes.md")), related)
+
+        graph = self.repo.get_import_graph()
+        self.assertEqual(graph.importers_of("pkg/core.py"), {"app.py"})
+        self.assertEqual(
+            graph.closure("app.py", max_depth=2),
+            {"pkg/core.py": 1, "pkg/helpers.py": 2, "pkg/models.py": 2},
+        )
+        self.assertEqual(graph.closure("app.py", max_depth=1), {"pkg/core.py": 1})
+
+    def test_import_graph_reparses_only_changed_blobs(self):
+        """Unchanged files are not parsed again after an edit"""
+        self.repo.get_import_graph()
+        self.assertEqual(self.repo.import_graph.imports_of("main.py"), {"utils.py"})
+
+        self.write("main.py", "def main():\n    pass\n")
+        parsed = []
+        original = self.repo._load_import_specs
+
+        def recording_loader(missing):
+            parsed.extend(path for path, _ in missing)
+            return original(missing)
+
+        self.repo._load_import_specs = recording_loader
+        self.repo.get_import_graph()
+
+        self.assertEqual(parsed, ["main.py"])
+        self.assertEqual(self.repo.import_graph.imports_of("main.py"), set())
+        self.assertEqual(self.repo.import_graph.importers_of("utils.py"), set())
+
+    def test_closure_cache_drops_only_touched_nodes(self):
+        """Editing one file's imports keeps unrelated memoized closures"""
+        self.write("other.py", "import json\n")
+        self.write("reader.py", "import other\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="more")
+
+        graph = self.repo.get_import_graph()
+        self.assertEqual(graph.closure("utils.py", 3, "reverse"), {"main.py": 1})
+        self.assertEqual(graph.closure("other.py", 3, "reverse"), {"reader.py": 1})
+
+        self.write("main.py", "def main():\n    pass\n")
+        graph = self.repo.get_import_graph()
+        self.assertIn(("other.py", 3, "reverse"), graph._closure_cache)
+        self.assertNotIn(("utils.py", 3, "reverse"), graph._closure_cache)
+        self.assertEqual(graph.closure("utils.py", 3, "reverse"), {})
+
+    def test_new_module_reresolves_only_its_importers(self):
+        """Adding a file patches the graph and re-resolves only files that looked it up"""
+        self.write("pkg/__init__.py", "")
+        self.write("pkg/a.py", "from . import b\n")
+        self.write("app.py", "import pkg.a\n")
+        self.git.git.add(A=True)
+        graph = self.repo.get_import_graph()
+        self.assertEqual(graph.imports_of("pkg/a.py"), {"pkg/__init__.py"})
+        forward = graph.forward
+        graph.closure("main.py", 3)
+
+        self.write("pkg/b.py", "x = 1\n")
+        self.git.git.add(A=True)
+        graph = self.repo.get_import_graph()
+        self.assertIs(graph.forward, forward)
+        self.assertEqual(graph.imports_of("pkg/a.py"), {"pkg/b.py"})
+        self.assertEqual(graph.importers_of("pkg/b.py"), {"pkg/a.py"})
+        self.assertIn(("main.py", 3, "forward"), graph._closure_cache)
+
+        # Nothing looked up pkg.c, so only the new file is resolved
+        self.assertEqual(graph.update(dict(graph.file_oids, **{"pkg/c.py": "c"}), lambda missing: {}), 1)
+        # Removing pkg/b.py re-resolves its importer, which falls back to the package
+        self.assertEqual(graph.remove_file("pkg/b.py"), 1)
+        self.assertEqual(graph.imports_of("pkg/a.py"), {"pkg/__init__.py"})
+
+    def test_single_file_patches_match_a_rebuild(self):
+        """set_file/remove_file leave the graph exactly as a full update() would"""
+        sources = {
+            "app.py": "import pkg.a\nfrom pkg import b, c\n",
+            "pkg/__init__.py": "",
+            "pkg/a.py": "from . import b\nfrom .sub import deep\n",
+            "pkg/b.py": "import app\n",
+            "pkg/c.py": "from pkg.sub.deep import x\n",
+            "pkg/sub/__init__.py": "",
+            "pkg/sub/deep.py": "from ..b import y\n",
+        }
+        specs = {path: parse_import_specs(source) for path, source in sources.items()}
+
+        def load(missing):
+            return {oid: specs[oid] for _, oid in missing}
+
+        patched = ImportGraph()
+        steps = [(path, True) for path in sources] + [
+            ("pkg/b.py", False), ("pkg/sub/deep.py", False), ("pkg/b.py", True), ("pkg/__init__.py", False)
+        ]
+        present = set()
+        for path, add in steps:
+            if add:
+                patched.set_file(path, path, load)
+                present.add(path)
+            else:
+                patched.remove_file(path)
+                present.discard(path)
+
+            rebuilt = ImportGraph()
+            rebuilt.update({p: p for p in present}, load)
+            self.assertEqual(patched.forward, rebuilt.forward, (path, add))
+            self.assertEqual(patched.reverse, rebuilt.reverse, (path, add))
+            self.assertEqual(patched.modules, rebuilt.modules)
+
+    def test_pagerank_is_seeded_and_warm_started(self):
+        """Personalized PageRank favours what the seeds import and reuses its last vector"""
+        for i in range(20):
+            self.write(f"pkg/leaf_{i}.py", f"import utils\nimport pkg.leaf_{(i + 1) % 20}\n")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="leaves")
+
+        graph = self.repo.get_import_graph()
+        ranks = graph.pagerank(["main.py"])
+        self.assertAlmostEqual(sum(ranks.values()), 1.0)
+        self.assertGreater(ranks["utils.py"], ranks["pkg/leaf_3.py"])
+        cold = graph.pagerank_iterations
+
+        self.assertEqual(graph.pagerank(["main.py"]), ranks)
+
+        self.write("pkg/leaf_0.py", "import utils\n")
+        graph = self.repo.get_import_graph()
+        graph.pagerank(["main.py"])
+        self.assertLess(graph.pagerank_iterations, cold)
+
+    def test_token_counts_use_model_tokenizer(self):
+        """Counts come from the model tokenizer and are cached per tokenizer"""
+
+        model = WordModel()
+        self.repo.set_token_model(model)
+        counts = self.repo.count_file_tokens(["main.py", "utils.py", "docs/notes.md"])
+        self.assertEqual(counts, {"main.py": 5, "utils.py": 7, "docs/notes.md": 2})
+        self.assertEqual(model.calls, 3)
+
+        # Cached by blob: no further tokenizer calls
+        self.assertEqual(self.repo.estimate_file_tokens("utils.py"), 7)
+        repo_map = self.repo.get_repo_map(max_tokens_per_file=6)
+        self.assertEqual(model.calls, 3)
+        self.assertTrue(repo_map["other_files"]["utils.py"]["is_summary"])
+        self.assertFalse(repo_map["other_files"]["main.py"]["is_summary"])
+
+        # A different tokenizer gets its own counts
+        self.repo.set_token_model(None)
+        self.assertEqual(self.repo.estimate_file_tokens("utils.py"), len(
+            Path(self.test_dir, "utils.py").read_text()) // 4
+        )
+
+    def test_token_estimates_only_absorb_read_errors(self):
+        """Missing files count as 0; programming errors are not swallowed"""
+        self.assertEqual(self.repo.estimate_file_tokens("missing.py"), 0)
+        with self.assertRaises(TypeError):
+            self.repo.estimate_file_tokens(None)
+
+    def test_token_counts_read_raw_content(self):
+        """Huge, markup and binary files are counted from their bytes, not a summary"""
+        self.write("huge.py", "value = 1\n" * 200_000)
+        self.write("index.html", "<html>\n<body>hi there</body>\n</html>\n")
+        Path(self.test_dir, "logo.png").write_bytes(b"\x89PNG\r\n\x00\x00 not text")
+        self.git.git.add(A=True)
+        self.git.git.commit(m="assets")
+
+        self.repo.set_token_model(WordModel())
+        counts = self.repo.count_file_tokens(["huge.py", "index.html", "logo.png"])
+        self.assertEqual(counts, {"huge.py": 600_000, "index.html": 4, "logo.png": 0})
+
+        # Over the content limit, the map shows a summary but reports the real count
+        info = self.repo.get_repo_map()["other_files"]["huge.py"]
+        self.assertTrue(info["is_summary"])
+        self.assertIn("bytes omitted", info["content"])
+        self.assertEqual(info["token_count"], 600_000)
+
+    def test_summary_is_indexed_for_large_files(self):
+        """Files over the per-file budget are summarized once and reused"""
+        body = "".join(f"value_{i} = {i}\n" for i in range(200))
+        self.write("big.py", body)
+        self.git.git.add("big.py")
+        self.git.git.commit(m="big")
+
+        repo_map = self.repo.get_repo_map(max_tokens_per_file=50)
+        info = repo_map["other_files"]["big.py"]
+        self.assertTrue(info["is_summary"])
+        self.assertIn("lines omitted", info["content"])
+
+        oid = self.repo.get_blob_oids()["big.py"]
+        self.assertEqual(self.repo.repo_index.get(oid)["summary"], info["content"])
+
+    def test_repo_map_fits_global_token_budget(self):
+        """map_tokens bounds the whole map, preferring files related to the chat"""
+        self.write("big.py", "".join(f"value_{i} = {i}  # padding padding\n" for i in range(400)))
+        for i in range(10):
+            self.write(f"pkg/mod_{i}.py", f"x_{i} = {i}\n" * 20)
+        self.git.git.add(A=True)
+        self.git.git.commit(m="more files")
+
+        repo_map = self.repo.get_repo_map(current_files=["main.py"], map_tokens=300)
+        other = repo_map["other_files"]
+        metadata = repo_map["metadata"]
+
+        self.assertLessEqual(metadata["map_tokens_used"], 300)
+        self.assertEqual(metadata["omitted_count"], 13 - len(other))
+        self.assertGreater(metadata["omitted_count"], 0)
+        # utils.py is imported by the chat file, so it makes the cut in full
+        self.assertFalse(other["utils.py"]["is_summary"])
+
+        # With room to spare, the big file is summarized rather than dropped
+        selection = self.repo.select_map_files(
+            ["big.py", "utils.py"], ["main.py"], map_tokens=1500
+        )
+        self.assertEqual(selection["files"], {"big.py": "summary", "utils.py": "full"})
+        self.assertIs(
+            self.repo.select_map_files(["big.py", "utils.py"], ["main.py"], map_tokens=1500),
+            selection,
+        )
+
+        full = self.repo.count_file_tokens(["big.py"])["big.py"]
+        selection = self.repo.select_map_files(["big.py"], map_tokens=full)
+        self.assertEqual(selection["files"], {"big.py": "full"})
+
+    def test_file_summary_reads_head_and_tail(self):
+        """Summaries keep the head and tail and can outline the omitted middle"""
+        body = "".join(f"first_{i} = {i}\n" for i in range(100))
+        body += "def middle(a):\n    return a\n"
+        body += "".join(f"last_{i} = {i}\n" for i in range(100))
+        self.write("long.py", body)
+
+        lines = body.splitlines(keepends=True)
+        summary = self.repo.get_file_summary("long.py", max_lines=10)
+        expected = "".join(lines[:5]) + "\n... (192 lines omitted) ...\n\n" + "".join(lines[-5:])
+        self.assertEqual(summary, expected)
+
+        outlined = self.repo.get_file_summary("long.py", max_lines=10, include_outline=True)
+        self.assertIn("101: def middle(a):", outlined)
+        self.assertTrue(outlined.endswith("last_99 = 99\n"))
+
+        # Past the whole-read limit the cut is in bytes, and only the start
+        # of a source file's middle is outlined
+        near = "x = 1\n" * 200_000
+        far = "x = 1\n" * 800_000
+        source = near + "def found():\n    pass\n" + far + "def too_far():\n    pass\n" + near
+        self.write("gen.py", source)
+        self.write("gen.json", source)
+        summary = self.repo.get_file_summary("gen.py", include_outline=True)
+        self.assertIn("bytes omitted", summary)
+        self.assertIn("200001: def found():", summary)
+        self.assertNotIn("too_far", summary)
+        self.assertNotIn("found", self.repo.get_file_summary("gen.json", include_outline=True))
+
+        # A single huge line is cut by bytes rather than loaded whole
+        self.write("bundle.js", "x" * 2_000_000)
+        summary = self.repo.get_file_summary("bundle.js")
+        self.assertIn("bytes omitted", summary)
+        self.assertLess(len(summary), 1_000_000)
+
+
+if __name__ == "__main__":
+    unittest.main()